@@ -1,36 +1,125 @@
 import anthropic
-import os
+import asyncio
+import contextvars
 import logging
+import weakref
+from contextlib import asynccontextmanager, contextmanager
 from functools import wraps
-import time
-import random
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from ratelimit import limits, sleep_and_retry
 from dotenv import load_dotenv
-import tiktoken
-from typing import List
+import sqlite3
+import threading
+import tokenizer
+import time
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+from clients import get_client_registry
+from config import Config
+from hedging import hedged_call, hedged_call_async
+from llm_cache import ResponseCache
+from model_router import get_model_router
+from rate_limiter import get_rate_limiter, PRIORITY_WORKER
+from tracing import add_to_span, span
 
 load_dotenv()
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-CLAUDE_MODEL = "claude-3-opus-20240229"
+# Shared with every agent through the client registry, with pools sized to Config.HTTP_POOL_SIZE
+client = get_client_registry().anthropic_client()
+async_client = get_client_registry().async_anthropic_client()
+# Model for calls that name neither a model nor a routed call site
+CLAUDE_MODEL = Config.MANAGER_MODEL
 
 class AnthropicAPIError(Exception):
     pass
 
+class UsageStats:
+    """Thread-safe counters for the API calls made inside a track_usage() block."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_call(self, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0, cache_write_tokens: int = 0):
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cache_read_tokens += cache_read_tokens
+            self.cache_write_tokens += cache_write_tokens
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cached_calls += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "cached_calls": self.cached_calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "cache_read_tokens": self.cache_read_tokens,
+                "cache_write_tokens": self.cache_write_tokens
+            }
+
+_current_usage = contextvars.ContextVar("current_usage", default=None)
+
+@contextmanager
+def track_usage():
+    """
+    Attribute every API call made in this context (including asyncio tasks started from it) to one UsageStats.
+
+    Tracking blocks nest: calls are recorded on every enclosing UsageStats.
+    """
+    stats = UsageStats()
+    parents = _current_usage.get() or ()
+    token = _current_usage.set(parents + (stats,))
+    try:
+        yield stats
+    finally:
+        _current_usage.reset(token)
+
+def _record_usage(input_tokens: int = 0, output_tokens: int = 0, cached: bool = False, cache_read_tokens: int = 0,
+                  cache_write_tokens: int = 0):
+    if cached:
+        add_to_span("cached_calls")
+    else:
+        add_to_span("input_tokens", input_tokens)
+        add_to_span("output_tokens", output_tokens)
+        if cache_read_tokens or cache_write_tokens:
+            add_to_span("cache_read_tokens", cache_read_tokens)
+            add_to_span("cache_write_tokens", cache_write_tokens)
+    for stats in _current_usage.get() or ():
+        if cached:
+            stats.record_cache_hit()
+        else:
+            stats.record_call(input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+
+def _record_response_usage(usage):
+    # Prompt cache fields are absent, or None, when the request had no cache breakpoint
+    _record_usage(usage.input_tokens, usage.output_tokens,
+                  cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+                  cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0)
+
+def _note_retry(message: str):
+    logger.info(message)
+    add_to_span("retries")
+
 def rate_limited_api_call(func):
     @wraps(func)
-    @sleep_and_retry
-    @limits(calls=40, period=60)
     @retry(
         stop=stop_after_attempt(5),
         wait=wait_exponential(multiplier=1, min=4, max=60),
         retry=retry_if_exception_type(exception_types=(AnthropicAPIError, anthropic.RateLimitError)),
-        before_sleep=lambda retry_state: logger.info(f"Retrying API call, attempt {retry_state.attempt_number}")
+        reraise=True,
+        before_sleep=lambda retry_state: _note_retry(f"Retrying API call, attempt {retry_state.attempt_number}")
     )
     def wrapper(*args, **kwargs):
         try:
-            time.sleep(random.uniform(0.5, 1.5))
             return func(*args, **kwargs)
         except anthropic.RateLimitError as e:
             logger.warning(f"Rate limit reached: {str(e)}. Retrying after backoff.")
@@ -40,18 +129,210 @@ def rate_limited_api_call(func):
             raise AnthropicAPIError(f"API call failed: {str(e)}")
     return wrapper
 
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _response_cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            try:
+                _response_cache = ResponseCache(
+                    Config.LLM_CACHE_PATH,
+                    ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+                    max_entries=Config.LLM_CACHE_MAX_ENTRIES
+                )
+            except (OSError, sqlite3.Error) as e:
+                # Calls go uncached rather than failing; opening the cache is tried again on the next call
+                logger.warning(f"LLM cache unavailable: {str(e)}")
+                return None
+        return _response_cache
+
+def _build_request(system: str, messages: list, max_tokens: int, model: str, shared_context: str = None) -> dict:
+    request = dict(
+        model=model,
+        max_tokens=min(max_tokens, 4096),
+        temperature=0.7,
+        system=system,
+        messages=messages
+    )
+    if shared_context:
+        _prepend_shared_context(request, shared_context)
+    return request
+
+def prompt_cache_min_tokens(model: str) -> int:
+    """The smallest prompt prefix, in tokens, that model caches."""
+    minimums = Config.PROMPT_CACHE_MIN_TOKENS
+    return minimums.get(model, max(minimums.values()))
+
+def is_cacheable_context(shared_context: str, model: str) -> bool:
+    """Whether shared_context is long enough to be sent to model as a prompt cache breakpoint."""
+    # The same rough estimate as _estimate_input_tokens; a borderline context just goes uncached
+    return Config.PROMPT_CACHING_ENABLED and len(shared_context) // 4 >= prompt_cache_min_tokens(model)
+
+def _prepend_shared_context(request: dict, shared_context: str):
+    """
+    Put shared_context in front of the first user message as its own content block.
+
+    Calls that share the context and system prompt then share a prompt prefix. When the
+    context is long enough to be cached, the block is marked as a prompt cache breakpoint,
+    so after the first call the prefix is read from the cache instead of being processed
+    and billed in full again.
+    """
+    block = {"type": "text", "text": shared_context}
+    if is_cacheable_context(shared_context, request["model"]):
+        block["cache_control"] = {"type": "ephemeral"}
+        if Config.PROMPT_CACHING_BETA:
+            request["extra_headers"] = {"anthropic-beta": Config.PROMPT_CACHING_BETA}
+    first, *rest = request["messages"]
+    content = first["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    request["messages"] = [dict(first, content=[block, *content]), *rest]
+
+def _prompt_cache_prefix(request: dict) -> Optional[str]:
+    """Return a key for the request's cached prompt prefix, or None if it has no cache breakpoint."""
+    content = request["messages"][0]["content"]
+    if isinstance(content, str) or "cache_control" not in content[0]:
+        return None
+    return ResponseCache.make_key(model=request["model"], system=request["system"], prefix=content[0]["text"])
+
+class PromptCacheWarmup:
+    """
+    Holds back calls whose cacheable prompt prefix is being written by a call in flight.
+
+    A prompt cache entry can be read only once the call writing it has been answered, so
+    workers sending the same prefix at the same moment would each pay to write it. The first
+    call with a prefix goes ahead; the others wait, at most Config.PROMPT_CACHE_WARMUP_TIMEOUT
+    seconds, for it to finish and then read the prefix from the cache.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, key: str, event_factory: Callable):
+        with self._lock:
+            event = self._pending.get(key)
+            if event is None:
+                self._pending[key] = event_factory()
+                return None
+            return event
+
+    def _release(self, key: str):
+        with self._lock:
+            event = self._pending.pop(key)
+        event.set()
+
+    @contextmanager
+    def hold(self, prefix: Optional[str]):
+        event = self._claim(prefix, threading.Event) if prefix else None
+        if prefix is None or event is not None:
+            if event is not None:
+                waited = time.monotonic()
+                event.wait(Config.PROMPT_CACHE_WARMUP_TIMEOUT)
+                add_to_span("cache_warmup_wait", time.monotonic() - waited)
+            yield
+            return
+        try:
+            yield
+        finally:
+            self._release(prefix)
+
+    @asynccontextmanager
+    async def hold_async(self, prefix: Optional[str]):
+        key = (id(asyncio.get_running_loop()), prefix)
+        event = self._claim(key, asyncio.Event) if prefix else None
+        if prefix is None or event is not None:
+            if event is not None:
+                waited = time.monotonic()
+                try:
+                    await asyncio.wait_for(event.wait(), Config.PROMPT_CACHE_WARMUP_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+                add_to_span("cache_warmup_wait", time.monotonic() - waited)
+            yield
+            return
+        try:
+            yield
+        finally:
+            self._release(key)
+
+_prompt_cache_warmup = PromptCacheWarmup()
+
+def _cache_lookup(request: dict, use_cache: bool):
+    cache = get_response_cache() if use_cache else None
+    if cache is None:
+        return None, None, None
+    key = ResponseCache.make_key(**request)
+    try:
+        return cache, key, cache.get(key)
+    except sqlite3.Error as e:
+        logger.warning(f"LLM cache lookup failed: {str(e)}")
+        return None, None, None
+
+def _cache_store(cache: Optional[ResponseCache], key: str, text: str):
+    if cache is None:
+        return
+    try:
+        cache.set(key, text)
+    except sqlite3.Error as e:
+        logger.warning(f"LLM cache store failed: {str(e)}")
+
+def _estimate_input_tokens(request: dict) -> int:
+    # Rough character-based estimate; the scheduler is corrected with the real usage afterwards
+    return len(str(request["system"]) + str(request["messages"])) // 4
+
+def make_api_call(system: str, messages: list, max_tokens: int = 4096, use_cache: bool = True,
+                  priority: int = PRIORITY_WORKER, call_site: str = None, hedge: bool = False,
+                  model: str = None, validate: Callable[[str], bool] = None, shared_context: str = None):
+    router = get_model_router()
+    model = router.route(call_site, model or CLAUDE_MODEL)
+    for _ in range(Config.MAX_MODEL_ESCALATIONS + 1):
+        request = _build_request(system, messages, max_tokens, model, shared_context)
+        start = time.monotonic()
+        with span("llm.call", call_site=call_site, model=model, priority=priority), track_usage() as usage:
+            text = _routed_call(request, use_cache, priority, call_site, hedge)
+        router.record(call_site, model, time.monotonic() - start, usage.as_dict())
+        larger = router.escalate(model)
+        if validate is None or validate(text) or larger is None:
+            break
+        router.record_escalation(call_site, model)
+        model = larger
+    return text
+
+def _routed_call(request: dict, use_cache: bool, priority: int, call_site: Optional[str], hedge: bool) -> str:
+    cache, key, cached = _cache_lookup(request, use_cache)
+    if cached is not None:
+        _record_usage(cached=True)
+        return cached
+    with _prompt_cache_warmup.hold(_prompt_cache_prefix(request)):
+        text = _create_message(request, priority, call_site, hedge)
+    _cache_store(cache, key, text)
+    return text
+
+def _send_request(request: dict):
+    return client.messages.with_raw_response.create(timeout=30, **request)
+
 @rate_limited_api_call
-def make_api_call(system: str, messages: list, max_tokens: int = 4096):
+def _create_message(request: dict, priority: int, call_site: Optional[str] = None, hedge: bool = False):
+    limiter = get_rate_limiter()
+    estimated_input = _estimate_input_tokens(request)
+    acquire = lambda: limiter.acquire(priority, estimated_input, request["max_tokens"])
+    add_to_span("rate_limit_wait", acquire())
     try:
-        response = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=min(max_tokens, 4096),
-            temperature=0.7,
-            system=system,
-            messages=messages,
-            timeout=30
-        )
+        # Only the HTTP round trip is timed and hedged; a duplicate first waits for its own rate limit budget
+        raw_response = hedged_call(call_site, hedge, _send_request, request, prepare=acquire)
+        limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        limiter.record_usage(estimated_input, request["max_tokens"], response.usage.input_tokens, response.usage.output_tokens)
+        _record_response_usage(response.usage)
         return response.content[0].text.strip()
+    except anthropic.RateLimitError as e:
+        limiter.update_from_headers(e.response.headers)
+        raise
     except anthropic.APITimeoutError:
         logger.error("API call timed out")
         raise AnthropicAPIError("API call timed out")
@@ -59,26 +340,224 @@ def make_api_call(system: str, messages: list, max_tokens: int = 4096):
         logger.error(f"Unexpected error in make_api_call: {str(e)}")
         raise AnthropicAPIError(f"Unexpected error: {str(e)}")
 
-def count_tokens(text: str) -> int:
-    encoder = tiktoken.encoding_for_model("gpt-3.5-turbo")
-    return len(encoder.encode(text))
+def stream_api_call(system: str, messages: list, max_tokens: int = 4096, use_cache: bool = True,
+                    priority: int = PRIORITY_WORKER, call_site: str = None, model: str = None,
+                    shared_context: str = None) -> Iterator[str]:
+    router = get_model_router()
+    request = _build_request(system, messages, max_tokens, router.route(call_site, model or CLAUDE_MODEL), shared_context)
+    start = time.monotonic()
+    cache, key, cached = _cache_lookup(request, use_cache)
+    if cached is not None:
+        _record_usage(cached=True)
+        _record_stream_route(call_site, request, start, None)
+        yield cached
+        return
+    estimated_input = _estimate_input_tokens(request)
+    # Only opening the stream is retried; once text has been yielded a failure is final
+    stream = _open_stream(request, priority, estimated_input)
+    chunks = []
+    try:
+        with stream:
+            for chunk in stream.text_stream:
+                if not chunks:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                chunks.append(chunk)
+                yield chunk
+            usage = stream.get_final_message().usage
+    except anthropic.APIError as e:
+        logger.error(f"Stream interrupted: {str(e)}")
+        raise AnthropicAPIError(f"Stream interrupted: {str(e)}")
+    _finish_stream(request, estimated_input, usage)
+    _record_stream_route(call_site, request, start, usage)
+    _cache_store(cache, key, "".join(chunks).strip())
 
-def chunk_text(text: str, max_tokens: int = 4000) -> List[str]:
+@rate_limited_api_call
+def _open_stream(request: dict, priority: int, estimated_input: int):
+    limiter = get_rate_limiter()
+    add_to_span("rate_limit_wait", limiter.acquire(priority, estimated_input, request["max_tokens"]))
+    try:
+        stream = client.messages.stream(timeout=30, **request).__enter__()
+        limiter.update_from_headers(stream.response.headers)
+        return stream
+    except anthropic.RateLimitError as e:
+        limiter.update_from_headers(e.response.headers)
+        raise
+    except anthropic.APITimeoutError:
+        logger.error("Streaming API call timed out")
+        raise AnthropicAPIError("API call timed out")
+    except Exception as e:
+        logger.error(f"Unexpected error in stream_api_call: {str(e)}")
+        raise AnthropicAPIError(f"Unexpected error: {str(e)}")
+
+def _finish_stream(request: dict, estimated_input: int, usage):
+    get_rate_limiter().record_usage(estimated_input, request["max_tokens"], usage.input_tokens, usage.output_tokens)
+    _record_response_usage(usage)
+
+def _record_stream_route(call_site: Optional[str], request: dict, start: float, usage):
+    # Streams yield to their consumer, so their usage is reported directly instead of through track_usage
+    get_model_router().record(call_site, request["model"], time.monotonic() - start, {
+        "cached_calls": int(usage is None),
+        "input_tokens": usage.input_tokens if usage else 0,
+        "output_tokens": usage.output_tokens if usage else 0,
+        "cache_read_tokens": (getattr(usage, "cache_read_input_tokens", None) or 0) if usage else 0,
+        "cache_write_tokens": (getattr(usage, "cache_creation_input_tokens", None) or 0) if usage else 0
+    })
+
+# One semaphore per event loop, shared by every coroutine calling make_api_call_async
+_async_limiters = weakref.WeakKeyDictionary()
+
+def get_async_limiter() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limiter = _async_limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        _async_limiters[loop] = limiter
+    return limiter
+
+def async_rate_limited_api_call(func):
+    @wraps(func)
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=1, min=4, max=60),
+        retry=retry_if_exception_type(exception_types=(AnthropicAPIError, anthropic.RateLimitError)),
+        reraise=True,
+        before_sleep=lambda retry_state: _note_retry(f"Retrying async API call, attempt {retry_state.attempt_number}")
+    )
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except anthropic.RateLimitError as e:
+            logger.warning(f"Rate limit reached: {str(e)}. Retrying after backoff.")
+            raise AnthropicAPIError(f"Rate limit reached: {str(e)}")
+        except anthropic.APIError as e:
+            logger.error(f"Anthropic API error: {str(e)}")
+            raise AnthropicAPIError(f"API call failed: {str(e)}")
+    return wrapper
+
+async def make_api_call_async(system: str, messages: list, max_tokens: int = 4096, use_cache: bool = True,
+                              priority: int = PRIORITY_WORKER, call_site: str = None, hedge: bool = False,
+                              model: str = None, validate: Callable[[str], bool] = None, shared_context: str = None):
+    router = get_model_router()
+    model = router.route(call_site, model or CLAUDE_MODEL)
+    for _ in range(Config.MAX_MODEL_ESCALATIONS + 1):
+        request = _build_request(system, messages, max_tokens, model, shared_context)
+        start = time.monotonic()
+        with span("llm.call", call_site=call_site, model=model, priority=priority), track_usage() as usage:
+            text = await _routed_call_async(request, use_cache, priority, call_site, hedge)
+        router.record(call_site, model, time.monotonic() - start, usage.as_dict())
+        larger = router.escalate(model)
+        if validate is None or validate(text) or larger is None:
+            break
+        router.record_escalation(call_site, model)
+        model = larger
+    return text
+
+async def _routed_call_async(request: dict, use_cache: bool, priority: int, call_site: Optional[str], hedge: bool) -> str:
+    cache, key, cached = _cache_lookup(request, use_cache)
+    if cached is not None:
+        _record_usage(cached=True)
+        return cached
+    async with _prompt_cache_warmup.hold_async(_prompt_cache_prefix(request)):
+        text = await _create_message_async(request, priority, call_site, hedge)
+    _cache_store(cache, key, text)
+    return text
+
+async def _send_request_async(request: dict):
+    return await async_client.messages.with_raw_response.create(timeout=30, **request)
+
+@async_rate_limited_api_call
+async def _create_message_async(request: dict, priority: int, call_site: Optional[str] = None, hedge: bool = False):
+    limiter = get_rate_limiter()
+    estimated_input = _estimate_input_tokens(request)
+    acquire = lambda: limiter.acquire_async(priority, estimated_input, request["max_tokens"])
+    add_to_span("rate_limit_wait", await acquire())
+    try:
+        # Only the HTTP round trip holds a concurrency slot, so queued low-priority calls never block high-priority ones.
+        # A duplicate shares its original's slot, since the HTTP pool keeps spare connections for hedges
+        queued = time.monotonic()
+        async with get_async_limiter():
+            add_to_span("queue_wait", time.monotonic() - queued)
+            raw_response = await hedged_call_async(call_site, hedge, _send_request_async, request, prepare=acquire)
+        limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        limiter.record_usage(estimated_input, request["max_tokens"], response.usage.input_tokens, response.usage.output_tokens)
+        _record_response_usage(response.usage)
+        return response.content[0].text.strip()
+    except anthropic.RateLimitError as e:
+        limiter.update_from_headers(e.response.headers)
+        raise
+    except anthropic.APITimeoutError:
+        logger.error("Async API call timed out")
+        raise AnthropicAPIError("API call timed out")
+    except Exception as e:
+        logger.error(f"Unexpected error in make_api_call_async: {str(e)}")
+        raise AnthropicAPIError(f"Unexpected error: {str(e)}")
+
+async def stream_api_call_async(system: str, messages: list, max_tokens: int = 4096, use_cache: bool = True,
+                                priority: int = PRIORITY_WORKER, call_site: str = None, model: str = None,
+                                shared_context: str = None) -> AsyncIterator[str]:
+    router = get_model_router()
+    request = _build_request(system, messages, max_tokens, router.route(call_site, model or CLAUDE_MODEL), shared_context)
+    start = time.monotonic()
+    cache, key, cached = _cache_lookup(request, use_cache)
+    if cached is not None:
+        _record_usage(cached=True)
+        _record_stream_route(call_site, request, start, None)
+        yield cached
+        return
+    estimated_input = _estimate_input_tokens(request)
+    # The concurrency slot is held for the whole stream and released however the consumer stops
+    semaphore = get_async_limiter()
+    stream = await _open_stream_async(request, priority, estimated_input, semaphore)
     chunks = []
-    current_chunk = ""
-    current_tokens = 0
-
-    for sentence in text.split(". "):
-        sentence_tokens = count_tokens(sentence)
-        if current_tokens + sentence_tokens > max_tokens:
-            chunks.append(current_chunk)
-            current_chunk = sentence
-            current_tokens = sentence_tokens
-        else:
-            current_chunk += sentence + ". "
-            current_tokens += sentence_tokens
+    try:
+        async with stream:
+            async for chunk in stream.text_stream:
+                if not chunks:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                chunks.append(chunk)
+                yield chunk
+            usage = (await stream.get_final_message()).usage
+    except anthropic.APIError as e:
+        logger.error(f"Async stream interrupted: {str(e)}")
+        raise AnthropicAPIError(f"Stream interrupted: {str(e)}")
+    finally:
+        semaphore.release()
+    _finish_stream(request, estimated_input, usage)
+    _record_stream_route(call_site, request, start, usage)
+    _cache_store(cache, key, "".join(chunks).strip())
 
-    if current_chunk:
-        chunks.append(current_chunk)
+@async_rate_limited_api_call
+async def _open_stream_async(request: dict, priority: int, estimated_input: int, semaphore: asyncio.Semaphore):
+    limiter = get_rate_limiter()
+    add_to_span("rate_limit_wait", await limiter.acquire_async(priority, estimated_input, request["max_tokens"]))
+    queued = time.monotonic()
+    await semaphore.acquire()
+    add_to_span("queue_wait", time.monotonic() - queued)
+    stream = None
+    try:
+        stream = await async_client.messages.stream(timeout=30, **request).__aenter__()
+        limiter.update_from_headers(stream.response.headers)
+        return stream
+    except anthropic.RateLimitError as e:
+        limiter.update_from_headers(e.response.headers)
+        raise
+    except anthropic.APITimeoutError:
+        logger.error("Async streaming API call timed out")
+        raise AnthropicAPIError("API call timed out")
+    except Exception as e:
+        logger.error(f"Unexpected error in stream_api_call_async: {str(e)}")
+        raise AnthropicAPIError(f"Unexpected error: {str(e)}")
+    finally:
+        if stream is None:
+            semaphore.release()
 
-    return chunks
+def count_tokens(text: str) -> int:
+    return tokenizer.count_tokens(text)
+
+def chunk_text(text: str, max_tokens: int = 4000) -> List[str]:
+    return tokenizer.chunk_text(text, max_tokens=max_tokens)
@@ -6,10 +6,23 @@ It provides the foundational structure for all agent types in the system.
 """
 
 import requests
-from typing import List, Tuple
+import asyncio
+import concurrent.futures
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 import os
+import time
 from tavily import Client as TavilyClient
+from api_utils import UsageStats, track_usage
+from clients import get_client_registry
+from config import Config
+from research import ResearchError, get_research_stage
+from task_queue import TASK_EXPAND, TaskDispatcher, current_task_dispatcher
+from tracing import span
+from transposition import TranspositionTable, current_transposition_table, normalize_thought
 import logging
 
 load_dotenv()
@@ -21,17 +34,148 @@ class AgentError(Exception):
     """Custom exception class for Agent-related errors."""
     pass
 
+# The input of the running Tree of Thought search. Its thought generation calls send this text first,
+# so the calls of every worker given the same input share a cacheable prompt prefix
+_shared_context = contextvars.ContextVar("shared_context", default=None)
+
+def current_shared_context() -> Optional[str]:
+    return _shared_context.get()
+
+@contextmanager
+def using_shared_context(context: Optional[str]) -> Iterator[None]:
+    """Send context as the shared prompt prefix of the thought generation calls in the enclosed block."""
+    token = _shared_context.set(context)
+    try:
+        yield
+    finally:
+        _shared_context.reset(token)
+
+# time.monotonic() deadline of the beam search level being expanded. Its level is abandoned past the deadline,
+# so an expansion still running then stops before its next API call instead of paying for a discarded result
+_level_deadline = contextvars.ContextVar("level_deadline", default=None)
+
+def _level_expired() -> bool:
+    deadline = _level_deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
 class Thought:
     """
     Represents a single thought in the Tree of Thought process.
 
+    Thoughts link to their parent only, so a kept thought keeps its path to the root alive
+    while discarded branches are freed, and __slots__ keeps every node small.
+
     Attributes:
         content (str): The content of the thought.
         evaluation (str): The evaluation of the thought ('sure', 'maybe', or 'impossible').
+        rating (Optional[int]): How promising the evaluator rated the thought, from 1 to 10; None if it gave no rating.
+        parent (Optional[Thought]): The thought this one was generated from; None for the root.
+        depth (int): Distance from the root.
+        score (Optional[float]): Mean evaluation score along the path, set by the beam search.
     """
-    def __init__(self, content: str, evaluation: str = None):
+    __slots__ = ("content", "evaluation", "rating", "parent", "depth", "score")
+
+    def __init__(self, content: str, evaluation: str = None, parent: Optional["Thought"] = None,
+                 rating: Optional[int] = None):
         self.content = content
         self.evaluation = evaluation
+        self.rating = rating
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.score = None
+
+    def rate(self) -> float:
+        """
+        Set and return the score: the mean evaluation score over the evaluated path.
+
+        A thought scores its rating / 10, or Config.TOT_EVALUATION_SCORES[evaluation] when it has no rating.
+        """
+        if self.rating is not None:
+            label_score = self.rating / 10
+        else:
+            label_score = Config.TOT_EVALUATION_SCORES.get(self.evaluation, 0.0)
+        parent_score = self.parent.score if self.parent is not None and self.parent.score is not None else 0.0
+        depth = max(self.depth, 1)
+        self.score = (parent_score * (depth - 1) + label_score) / depth
+        return self.score
+
+    def adopt(self, parent: "Thought"):
+        """Attach the thought below parent."""
+        self.parent = parent
+        self.depth = parent.depth + 1
+
+    def path(self) -> List["Thought"]:
+        """The thoughts from the root down to this one."""
+        path = []
+        thought = self
+        while thought is not None:
+            path.append(thought)
+            thought = thought.parent
+        return path[::-1]
+
+    def __repr__(self) -> str:
+        return f"Thought({self.content!r}, evaluation={self.evaluation!r}, rating={self.rating!r}, depth={self.depth})"
+
+class SearchBudget:
+    """
+    Limits of one anytime Tree of Thought search; the clock starts when the budget is created.
+
+    Call and token budgets are checked before each level against the cost of the expansions
+    measured so far, so the search expands only as many thoughts as should still fit.
+
+    Attributes:
+        max_calls (Optional[int]): API calls the search may make; None is unbounded.
+        max_tokens (Optional[int]): Input plus output tokens the search may use; None is unbounded.
+        deadline (Optional[float]): time.monotonic() value the search must finish by; None is unbounded.
+    """
+
+    # Calls an expansion is assumed to cost before any has been measured: a generation and a batch evaluation
+    ASSUMED_CALLS_PER_EXPANSION = 2
+
+    def __init__(self, max_calls: int = None, max_tokens: int = None, seconds: float = None):
+        """
+        Initialize the SearchBudget.
+
+        Args:
+            max_calls (int, optional): API calls the search may make.
+            max_tokens (int, optional): Input plus output tokens the search may use.
+            seconds (float, optional): Wall-clock seconds the search may take.
+        """
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+
+    @classmethod
+    def from_config(cls) -> "SearchBudget":
+        return cls(Config.TOT_BUDGET_MAX_CALLS, Config.TOT_BUDGET_MAX_TOKENS, Config.TOT_BUDGET_SECONDS)
+
+    def remaining_seconds(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def expansions_left(self, usage: UsageStats, expansions: int) -> Optional[int]:
+        """
+        Estimate how many more thoughts can be expanded.
+
+        Args:
+            usage (UsageStats): The API usage of the search so far.
+            expansions (int): Thoughts expanded so far.
+
+        Returns:
+            Optional[int]: The number of expansions that fit the budget, or None if it is unbounded.
+        """
+        if self.deadline is not None and self.remaining_seconds() <= 0:
+            return 0
+        limits = []
+        if self.max_calls is not None:
+            per_expansion = usage.calls / expansions if expansions and usage.calls else self.ASSUMED_CALLS_PER_EXPANSION
+            limits.append(int((self.max_calls - usage.calls) // per_expansion))
+        if self.max_tokens is not None:
+            tokens = usage.input_tokens + usage.output_tokens
+            if tokens >= self.max_tokens:
+                limits.append(0)
+            elif expansions and tokens:
+                limits.append(int((self.max_tokens - tokens) // (tokens / expansions)))
+        return max(0, min(limits)) if limits else None
 
 class Agent:
     """
@@ -44,10 +188,13 @@ class Agent:
         model (str): The name of the language model used by the agent.
         max_depth (int): The maximum depth for the Tree of Thought process.
         branching_factor (int): The branching factor for the Tree of Thought process.
-        tavily_client (TavilyClient): Client for making internet searches.
+        search_mode (str): 'bfs' or 'beam'; see Config.TOT_SEARCH_MODE.
+        beam_width (int): Thoughts kept per level by the beam search.
+        tavily_api_key (str): API key for Tavily search.
+        tavily_client (TavilyClient): Shared client for making internet searches.
     """
 
-    def __init__(self, name: str, model: str, tavily_api_key: str, max_depth: int = 2, branching_factor: int = 2):
+    def __init__(self, name: str, model: str, tavily_api_key: str, max_depth: int = None, branching_factor: int = None):
         """
         Initialize the Agent.
 
@@ -55,26 +202,38 @@ class Agent:
             name (str): The name of the agent.
             model (str): The name of the language model to be used.
             tavily_api_key (str): API key for Tavily search.
-            max_depth (int, optional): Maximum depth for Tree of Thought. Defaults to 2.
-            branching_factor (int, optional): Branching factor for Tree of Thought. Defaults to 2.
-
-        Raises:
-            AgentError: If initialization of Tavily client fails.
+            max_depth (int, optional): Maximum depth for Tree of Thought. Defaults to Config.TOT_MAX_DEPTH.
+            branching_factor (int, optional): Branching factor for Tree of Thought. Defaults to Config.TOT_BRANCHING_FACTOR.
         """
         self.name = name
         self.model = model
-        self.max_depth = max_depth
-        self.branching_factor = branching_factor
-        try:
-            self.tavily_client = TavilyClient(api_key=tavily_api_key)
-        except Exception as e:
-            logger.error(f"Failed to initialize Tavily client: {str(e)}")
-            raise AgentError(f"Failed to initialize Tavily client: {str(e)}")
+        self.max_depth = Config.TOT_MAX_DEPTH if max_depth is None else max_depth
+        self.branching_factor = Config.TOT_BRANCHING_FACTOR if branching_factor is None else branching_factor
+        self.search_mode = Config.TOT_SEARCH_MODE
+        self.beam_width = Config.TOT_BEAM_WIDTH
+        self.tavily_api_key = tavily_api_key
+
+    @property
+    def tavily_client(self) -> TavilyClient:
+        """The Tavily client shared by every agent with this API key, created on first search."""
+        return get_client_registry().tavily_client(self.tavily_api_key)
+
+    def task_spec(self) -> Optional[Dict]:
+        """
+        Describe the agent so a task worker node can rebuild it.
+
+        Returns:
+            Optional[Dict]: A JSON-serializable description, or None if the agent cannot run on a node.
+        """
+        return None
 
     def search_internet(self, query: str) -> str:
         """
         Perform an internet search using the Tavily API.
 
+        Searches go through the shared research stage, so they are cached and deduplicated
+        with the searches of the research stage.
+
         Args:
             query (str): The search query.
 
@@ -85,13 +244,8 @@ class Agent:
             AgentError: If the search fails.
         """
         try:
-            search_result = self.tavily_client.get_search_context(
-                query=query,
-                search_depth="advanced",
-                max_results=3,
-            )
-            return str(search_result)
-        except Exception as e:
+            return get_research_stage(self.tavily_api_key).search(query)
+        except ResearchError as e:
             logger.error(f"Error searching the internet: {str(e)}")
             raise AgentError(f"Error searching the internet: {str(e)}")
 
@@ -130,11 +284,46 @@ class Agent:
         """
         raise NotImplementedError("This method should be implemented by subclasses")
 
+    async def generate_thoughts_async(self, prompt: str, depth: int) -> List[Thought]:
+        """
+        Asynchronously generate thoughts based on a prompt.
+
+        Args:
+            prompt (str): The prompt to generate thoughts from.
+            depth (int): The current depth in the Tree of Thought process.
+
+        Returns:
+            List[Thought]: A list of generated thoughts.
+
+        Raises:
+            NotImplementedError: If not implemented by a subclass.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    async def evaluate_thoughts_async(self, thoughts: List[Thought]) -> List[Thought]:
+        """
+        Asynchronously evaluate a list of thoughts.
+
+        Args:
+            thoughts (List[Thought]): The list of thoughts to evaluate.
+
+        Returns:
+            List[Thought]: The list of thoughts with evaluations.
+
+        Raises:
+            NotImplementedError: If not implemented by a subclass.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses")
+
     def tree_of_thought(self, initial_prompt: str) -> List[Thought]:
         """
         Perform the Tree of Thought process.
 
-        This method implements the core Tree of Thought algorithm.
+        This method implements the core Tree of Thought algorithm as a
+        level-synchronous breadth-first search: every unfinished node at a depth is
+        expanded concurrently (up to Config.TOT_MAX_PARALLEL_EXPANSIONS at a time),
+        and the search stops as soon as branching_factor solutions are found.
+        With search_mode 'beam' the search is delegated to beam_search.
 
         Args:
             initial_prompt (str): The initial prompt to start the process.
@@ -145,26 +334,374 @@ class Agent:
         Raises:
             AgentError: If an error occurs during the process.
         """
+        if self.search_mode == "beam":
+            return self.beam_search(initial_prompt)
+        token = _shared_context.set(initial_prompt)
         try:
-            frontier = [(Thought(initial_prompt), 0)]
+            frontier = deque([Thought(initial_prompt)])
             solution = []
+            depth = 0
 
             while frontier and len(solution) < self.branching_factor:
-                current_thought, depth = frontier.pop(0)
-                
-                if depth == self.max_depth or current_thought.evaluation == 'sure':
-                    solution.append(current_thought)
+                to_expand = self._collect_solutions(frontier, depth, solution)
+                if not to_expand or len(solution) >= self.branching_factor:
+                    break
+
+                depth += 1
+                frontier = deque(
+                    child
+                    for evaluated_children in self._expand_level(to_expand, depth)
+                    for child in evaluated_children
+                    if child.evaluation != "impossible"
+                )
+
+            return solution
+        except Exception as e:
+            logger.error(f"Error in tree of thought process: {str(e)}")
+            raise AgentError(f"Error in tree of thought process: {str(e)}")
+        finally:
+            _shared_context.reset(token)
+
+    def _collect_solutions(self, level: deque, depth: int, solution: List[Thought]) -> List[Thought]:
+        """
+        Move the finished thoughts of one level into the solution list.
+
+        Args:
+            level (deque): The thoughts at the current depth, in BFS order.
+            depth (int): The depth of every thought in the level.
+            solution (List[Thought]): Solutions found so far; extended in place.
+
+        Returns:
+            List[Thought]: The thoughts at this level that still need expanding.
+        """
+        to_expand = []
+        while level and len(solution) < self.branching_factor:
+            thought = level.popleft()
+            if depth == self.max_depth or thought.evaluation == 'sure':
+                solution.append(thought)
+            else:
+                to_expand.append(thought)
+        return to_expand
+
+    def _remote_dispatcher(self) -> Optional[TaskDispatcher]:
+        """The dispatcher to send expansions to, or None to expand locally."""
+        dispatcher = current_task_dispatcher()
+        return dispatcher if dispatcher is not None and self.task_spec() is not None else None
+
+    def _expansion_payload(self, thought: Thought, depth: int) -> Dict:
+        return {"agent": self.task_spec(), "content": thought.content, "depth": depth,
+                "shared_context": current_shared_context()}
+
+    def _transposition_key(self, step: str, content: str, *extra) -> str:
+        return TranspositionTable.key(step, type(self).__name__, self.model, self.branching_factor,
+                                      normalize_thought(content), *extra)
+
+    def _generation_key(self, thought: Thought, depth: int, step: str = "generate") -> str:
+        # Generation prompts build on the shared context, so children are only reused under the same one
+        return self._transposition_key(step, thought.content, depth, current_shared_context())
+
+    def _verdict_key(self, thought: Thought) -> str:
+        # Evaluation prompts contain nothing but the thought, so verdicts are shared across depths and trees
+        return self._transposition_key("evaluate", thought.content)
+
+    def _apply_verdicts(self, table: TranspositionTable, children: List[Thought]) -> List[Thought]:
+        """Fill in the known verdicts of children; returns one child per thought still to be evaluated."""
+        pending = {}
+        for child in children:
+            if child.evaluation is None:
+                key = self._verdict_key(child)
+                verdict = table.get(key)
+                if verdict is None:
+                    pending.setdefault(key, child)
+                else:
+                    child.evaluation, child.rating = verdict
+        return list(pending.values())
+
+    def _store_verdicts(self, table: TranspositionTable, evaluated: List[Thought]):
+        for child in evaluated:
+            if child.evaluation is not None:
+                table.put(self._verdict_key(child), (child.evaluation, child.rating))
+
+    def _generate_children(self, thought: Thought, depth: int) -> List[Thought]:
+        table = current_transposition_table()
+        if table is None:
+            children = self.generate_thoughts(thought.content, depth)
+        else:
+            contents = table.memoize(
+                self._generation_key(thought, depth),
+                lambda: [child.content for child in self.generate_thoughts(thought.content, depth)]
+            )
+            children = [Thought(content) for content in contents]
+        for child in children:
+            child.adopt(thought)
+        return children
+
+    async def _generate_children_async(self, thought: Thought, depth: int) -> List[Thought]:
+        table = current_transposition_table()
+        if table is None:
+            children = await self.generate_thoughts_async(thought.content, depth)
+        else:
+            async def generate():
+                return [child.content for child in await self.generate_thoughts_async(thought.content, depth)]
+            children = [Thought(content) for content in await table.memoize_async(self._generation_key(thought, depth), generate)]
+        for child in children:
+            child.adopt(thought)
+        return children
+
+    def _evaluate_children(self, children: List[Thought]) -> List[Thought]:
+        table = current_transposition_table()
+        if table is None:
+            return self.evaluate_thoughts(children)
+        pending = self._apply_verdicts(table, children)
+        if pending:
+            self._store_verdicts(table, self.evaluate_thoughts(pending))
+            # Siblings repeating an evaluated thought take its verdict
+            self._apply_verdicts(table, children)
+        return children
+
+    async def _evaluate_children_async(self, children: List[Thought]) -> List[Thought]:
+        table = current_transposition_table()
+        if table is None:
+            return await self.evaluate_thoughts_async(children)
+        pending = self._apply_verdicts(table, children)
+        if pending:
+            self._store_verdicts(table, await self.evaluate_thoughts_async(pending))
+            self._apply_verdicts(table, children)
+        return children
+
+    def _expand(self, thought: Thought, depth: int) -> Optional[List[Thought]]:
+        """Generate and evaluate the children of thought; None if its level's deadline passed first."""
+        if _level_expired():
+            return None
+        with span("tot.expand", agent=self.name, depth=depth) as expand_span:
+            dispatcher = self._remote_dispatcher()
+            if dispatcher is not None:
+                table = current_transposition_table()
+                payload = self._expansion_payload(thought, depth)
+                run = lambda: dispatcher.run(TASK_EXPAND, payload)
+                expansion = run() if table is None else table.memoize(self._generation_key(thought, depth, "expand"), run)
+                children = [Thought(content, evaluation, parent=thought, rating=rating) for content, evaluation, rating in expansion]
+                expand_span.set(children=len(children), remote=True)
+                return children
+            children = self._generate_children(thought, depth)
+            expand_span.set(children=len(children))
+            if _level_expired():
+                expand_span.set(abandoned=True)
+                return None
+            return self._evaluate_children(children)
+
+    async def _expand_async(self, thought: Thought, depth: int) -> List[Thought]:
+        with span("tot.expand", agent=self.name, depth=depth) as expand_span:
+            dispatcher = self._remote_dispatcher()
+            if dispatcher is not None:
+                table = current_transposition_table()
+                payload = self._expansion_payload(thought, depth)
+                run = lambda: dispatcher.run_async(TASK_EXPAND, payload)
+                expansion = await (run() if table is None else table.memoize_async(self._generation_key(thought, depth, "expand"), run))
+                children = [Thought(content, evaluation, parent=thought, rating=rating) for content, evaluation, rating in expansion]
+                expand_span.set(children=len(children), remote=True)
+                return children
+            children = await self._generate_children_async(thought, depth)
+            expand_span.set(children=len(children))
+            return await self._evaluate_children_async(children)
+
+    def _expand_level(self, thoughts: List[Thought], depth: int,
+                      timeout: Optional[float] = None) -> List[Optional[List[Thought]]]:
+        """
+        Expand every thought of a level, preserving the input order of the results.
+
+        Args:
+            thoughts (List[Thought]): The thoughts to expand.
+            depth (int): The depth of the children being generated.
+            timeout (Optional[float]): Seconds to wait for the level. None waits for every expansion.
+
+        Returns:
+            List[Optional[List[Thought]]]: The evaluated children of each thought; None for the thoughts
+                whose expansion did not finish within the timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        token = _level_deadline.set(deadline)
+        try:
+            max_parallel = min(len(thoughts), Config.TOT_MAX_PARALLEL_EXPANSIONS)
+            if max_parallel <= 1:
+                return [self._expand(thought, depth) for thought in thoughts]
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel)
+            try:
+                futures = [executor.submit(contextvars.copy_context().run, self._expand, thought, depth) for thought in thoughts]
+                concurrent.futures.wait(futures, timeout)
+                return [future.result() if future.done() else None for future in futures]
+            finally:
+                # Past the timeout, queued expansions are dropped and running ones stop before their next API call
+                executor.shutdown(wait=timeout is None, cancel_futures=True)
+        finally:
+            _level_deadline.reset(token)
+
+    async def _expand_level_async(self, thoughts: List[Thought], depth: int,
+                                  timeout: Optional[float] = None) -> List[Optional[List[Thought]]]:
+        """Asynchronous counterpart of _expand_level; expansions still running at the timeout are cancelled."""
+        if not thoughts:
+            return []
+        tasks = [asyncio.ensure_future(self._expand_async(thought, depth)) for thought in thoughts]
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return [None if task.cancelled() else task.result() for task in tasks]
+
+    def _advance_beam(self, beam: List[Thought], levels: List[Optional[List[Thought]]], depth: int,
+                      finished: List[Thought], reserve: List[Thought]) -> List[Thought]:
+        """
+        Score the children of a level, move the finished ones to finished and keep the best of the rest.
+
+        Args:
+            beam (List[Thought]): The current beam; its first len(levels) thoughts were expanded.
+            levels (List[Optional[List[Thought]]]): The evaluated children of each expanded thought.
+            depth (int): The depth of the children.
+            finished (List[Thought]): Finished thoughts found so far; extended in place.
+            reserve (List[Thought]): Beam thoughts left unexpanded by the budget, deepest first; extended in place.
+
+        Returns:
+            List[Thought]: The next beam, best first; ties keep their breadth-first order.
+        """
+        unexpanded = [thought for thought, children in zip(beam, levels) if children is None] + beam[len(levels):]
+        reserve[:0] = unexpanded
+        candidates = []
+        for children in levels:
+            for child in children or ():
+                if child.evaluation == "impossible":
                     continue
+                child.rate()
+                if depth == self.max_depth or child.evaluation == "sure":
+                    finished.append(child)
+                else:
+                    candidates.append(child)
+        candidates.sort(key=lambda thought: thought.score, reverse=True)
+        return candidates[:self.beam_width]
+
+    def _best_thoughts(self, finished: List[Thought], beam: List[Thought], reserve: List[Thought]) -> List[Thought]:
+        """
+        The branching_factor best finished thoughts, topped up with the deepest unfinished ones.
+
+        The root is the search input rather than a thought, so it is never returned: a search whose
+        budget ran out before the first expansion returns an empty list.
+        """
+        ranked = sorted(finished, key=lambda thought: thought.score, reverse=True)
+        return [thought for thought in ranked + beam + reserve if thought.depth > 0][:self.branching_factor]
+
+    def _beam_step(self, beam: List[Thought], finished: List[Thought], budget: SearchBudget, usage: UsageStats,
+                   expansions: int) -> List[Thought]:
+        """The thoughts of the beam that the budget allows to expand next; empty when the search is over."""
+        if not beam or len(finished) >= self.branching_factor:
+            return []
+        allowed = budget.expansions_left(usage, expansions)
+        if allowed == 0:
+            logger.info(f"{self.name}: Tree of Thought budget exhausted after {expansions} expansions; "
+                        f"returning the best thoughts found so far")
+        return beam if allowed is None else beam[:allowed]
+
+    def beam_search(self, initial_prompt: str, budget: Optional[SearchBudget] = None) -> List[Thought]:
+        """
+        Perform a budget-bounded, anytime Tree of Thought search.
+
+        Each level expands the beam, scores the surviving children by their mean evaluation
+        score along the path, and keeps the beam_width best unfinished ones. The search stops
+        when branching_factor thoughts are finished, max_depth is reached or the budget runs
+        out; in every case the best thoughts found so far are returned.
+
+        Args:
+            initial_prompt (str): The initial prompt to start the process.
+            budget (Optional[SearchBudget]): The limits of the search. Defaults to SearchBudget.from_config().
+
+        Returns:
+            List[Thought]: Up to branching_factor thoughts, best first; empty if the budget allowed no expansion.
+
+        Raises:
+            AgentError: If an error occurs during the process.
+        """
+        budget = budget or SearchBudget.from_config()
+        token = _shared_context.set(initial_prompt)
+        try:
+            with span("tot.beam", agent=self.name, beam_width=self.beam_width) as beam_span, track_usage() as usage:
+                beam, finished, reserve = [Thought(initial_prompt)], [], []
+                depth = expansions = 0
+                while depth < self.max_depth and (to_expand := self._beam_step(beam, finished, budget, usage, expansions)):
+                    depth += 1
+                    levels = self._expand_level(to_expand, depth, timeout=budget.remaining_seconds())
+                    expansions += len(to_expand)
+                    beam = self._advance_beam(beam, levels, depth, finished, reserve)
+                beam_span.set(depth=depth, expansions=expansions, finished=len(finished), calls=usage.calls)
+                return self._best_thoughts(finished, beam, reserve)
+        except Exception as e:
+            logger.error(f"Error in beam search: {str(e)}")
+            raise AgentError(f"Error in tree of thought process: {str(e)}")
+        finally:
+            _shared_context.reset(token)
+
+    async def beam_search_async(self, initial_prompt: str, budget: Optional[SearchBudget] = None) -> List[Thought]:
+        """Asynchronous counterpart of beam_search."""
+        budget = budget or SearchBudget.from_config()
+        token = _shared_context.set(initial_prompt)
+        try:
+            with span("tot.beam", agent=self.name, beam_width=self.beam_width) as beam_span, track_usage() as usage:
+                beam, finished, reserve = [Thought(initial_prompt)], [], []
+                depth = expansions = 0
+                while depth < self.max_depth and (to_expand := self._beam_step(beam, finished, budget, usage, expansions)):
+                    depth += 1
+                    levels = await self._expand_level_async(to_expand, depth, timeout=budget.remaining_seconds())
+                    expansions += len(to_expand)
+                    beam = self._advance_beam(beam, levels, depth, finished, reserve)
+                beam_span.set(depth=depth, expansions=expansions, finished=len(finished), calls=usage.calls)
+                return self._best_thoughts(finished, beam, reserve)
+        except Exception as e:
+            logger.error(f"Error in async beam search: {str(e)}")
+            raise AgentError(f"Error in tree of thought process: {str(e)}")
+        finally:
+            _shared_context.reset(token)
+
+    async def tree_of_thought_async(self, initial_prompt: str) -> List[Thought]:
+        """
+        Perform the Tree of Thought process on the asyncio event loop.
+
+        Same search as tree_of_thought, but every LLM call is awaited so many trees
+        can run concurrently under the shared async request limit.
+
+        Args:
+            initial_prompt (str): The initial prompt to start the process.
+
+        Returns:
+            List[Thought]: The final list of thoughts generated by the process.
+
+        Raises:
+            AgentError: If an error occurs during the process.
+        """
+        if self.search_mode == "beam":
+            return await self.beam_search_async(initial_prompt)
+        token = _shared_context.set(initial_prompt)
+        try:
+            frontier = deque([Thought(initial_prompt)])
+            solution = []
+            depth = 0
 
-                if depth < self.max_depth:
-                    children = self.generate_thoughts(current_thought.content, depth + 1)
-                    evaluated_children = self.evaluate_thoughts(children)
-                    frontier.extend((child, depth + 1) for child in evaluated_children if child.evaluation != "impossible")
+            while frontier and len(solution) < self.branching_factor:
+                to_expand = self._collect_solutions(frontier, depth, solution)
+                if not to_expand or len(solution) >= self.branching_factor:
+                    break
+
+                depth += 1
+                levels = await asyncio.gather(*(self._expand_async(thought, depth) for thought in to_expand))
+                frontier = deque(
+                    child
+                    for evaluated_children in levels
+                    for child in evaluated_children
+                    if child.evaluation != "impossible"
+                )
 
             return solution
         except Exception as e:
-            logger.error(f"Error in tree of thought process: {str(e)}")
+            logger.error(f"Error in async tree of thought process: {str(e)}")
             raise AgentError(f"Error in tree of thought process: {str(e)}")
+        finally:
+            _shared_context.reset(token)
 
     def process(self, input: str) -> str:
         """
@@ -183,3 +720,17 @@ class Agent:
         """
         raise NotImplementedError("This method should be implemented by subclasses")
 
+    async def process_async(self, input: str) -> str:
+        """
+        Asynchronously process an input string.
+
+        Args:
+            input (str): The input string to process.
+
+        Returns:
+            str: The processed output.
+
+        Raises:
+            NotImplementedError: If not implemented by a subclass.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses")
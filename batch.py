@@ -0,0 +1,150 @@
+"""
+batch.py
+
+This module implements the multi-episode batch mode of the AI News Podcast Generation System.
+Episodes run concurrently on one asyncio event loop, so every worker, manager and Chief Editor
+call from every episode goes through the same process-wide rate limit scheduler and request limit.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+from api_utils import track_usage
+from checkpoint import RunCheckpoint
+from config import Config
+from moa_framework import MoAFramework
+
+logger = logging.getLogger(__name__)
+
+class BatchConfigError(Exception):
+    """Custom exception class for invalid batch configurations."""
+    pass
+
+def load_episodes(path: str) -> List[Dict]:
+    """
+    Load episode definitions from a JSON file.
+
+    The file holds a list of objects, each with a unique 'name' and an 'rss_feed_url'
+    (a feed URL, or a list of feed URLs that are ingested together).
+
+    Args:
+        path (str): Path of the JSON file.
+
+    Returns:
+        List[Dict]: The episode definitions.
+
+    Raises:
+        BatchConfigError: If the file cannot be read or an episode is invalid.
+    """
+    try:
+        with open(path) as f:
+            episodes = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BatchConfigError(f"Cannot read batch file {path}: {str(e)}")
+
+    if not isinstance(episodes, list) or not episodes:
+        raise BatchConfigError("Batch file must contain a non-empty list of episodes")
+    names = set()
+    for episode in episodes:
+        if not isinstance(episode, dict) or not episode.get("name") or not episode.get("rss_feed_url"):
+            raise BatchConfigError(f"Each episode needs a 'name' and an 'rss_feed_url': {episode!r}")
+        if episode["name"] in names:
+            raise BatchConfigError(f"Duplicate episode name: {episode['name']}")
+        names.add(episode["name"])
+    return episodes
+
+async def run_episode(episode: Dict, tavily_api_key: str) -> Dict:
+    """
+    Generate the script for one episode and measure its throughput.
+
+    Args:
+        episode (Dict): The episode definition.
+        tavily_api_key (str): API key for Tavily internet search service.
+
+    Returns:
+        Dict: 'name', 'status' ('ok' or 'failed'), 'run_id', 'script' or 'error',
+              'duration' in seconds and the episode's API 'usage'.
+    """
+    start = time.monotonic()
+    checkpoint = RunCheckpoint.create(Config.RUNS_DIR)
+    result = {"name": episode["name"], "run_id": checkpoint.run_id}
+    logger.info(f"Starting episode {episode['name']} (run {checkpoint.run_id})")
+
+    with track_usage() as usage:
+        try:
+            moa = MoAFramework(episode["rss_feed_url"], tavily_api_key)
+            result["script"] = await moa.generate_podcast_script_async(checkpoint)
+            result["status"] = "ok"
+        except Exception as e:
+            logger.error(f"Episode {episode['name']} failed: {str(e)}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+
+    result["duration"] = time.monotonic() - start
+    result["usage"] = usage.as_dict()
+    return result
+
+async def run_batch(episodes: List[Dict], tavily_api_key: str,
+                    on_episode_complete: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Run many episodes concurrently under the shared scheduler.
+
+    Args:
+        episodes (List[Dict]): The episode definitions.
+        tavily_api_key (str): API key for Tavily internet search service.
+        on_episode_complete (Callable[[Dict], None], optional): Called with each episode
+            result as soon as that episode finishes.
+
+    Returns:
+        Dict: 'episodes' (the per-episode results, in input order), 'duration' of the
+              whole batch in seconds and aggregate API 'usage'.
+    """
+    start = time.monotonic()
+
+    async def run_and_report(episode):
+        result = await run_episode(episode, tavily_api_key)
+        if on_episode_complete is not None:
+            on_episode_complete(result)
+        return result
+
+    with track_usage() as usage:
+        results = await asyncio.gather(*(run_and_report(episode) for episode in episodes))
+    return {"episodes": results, "duration": time.monotonic() - start, "usage": usage.as_dict()}
+
+def format_report(batch_result: Dict) -> str:
+    """
+    Render per-episode and aggregate throughput as a plain-text table.
+
+    Args:
+        batch_result (Dict): The value returned by run_batch.
+
+    Returns:
+        str: The report.
+    """
+    def rate(count, seconds):
+        return count * 60.0 / seconds if seconds > 0 else 0.0
+
+    header = f"{'Episode':<24} {'Status':<7} {'Time (s)':>9} {'Calls':>6} {'Cached':>6} {'In tok':>9} {'Out tok':>8} {'Calls/min':>9}"
+    lines = [header, "-" * len(header)]
+    for result in batch_result["episodes"]:
+        usage = result["usage"]
+        lines.append(
+            f"{result['name'][:24]:<24} {result['status']:<7} {result['duration']:>9.1f} {usage['calls']:>6} "
+            f"{usage['cached_calls']:>6} {usage['input_tokens']:>9} {usage['output_tokens']:>8} "
+            f"{rate(usage['calls'], result['duration']):>9.1f}"
+        )
+
+    usage = batch_result["usage"]
+    duration = batch_result["duration"]
+    succeeded = sum(1 for result in batch_result["episodes"] if result["status"] == "ok")
+    lines.append("-" * len(header))
+    lines.append(
+        f"{succeeded}/{len(batch_result['episodes'])} episodes in {duration:.1f}s | "
+        f"{usage['calls']} calls ({rate(usage['calls'], duration):.1f}/min), {usage['cached_calls']} cached | "
+        f"{usage['input_tokens'] + usage['output_tokens']} tokens "
+        f"({rate(usage['input_tokens'] + usage['output_tokens'], duration):.0f}/min) | "
+        f"{rate(succeeded, duration):.2f} episodes/min"
+    )
+    return "\n".join(lines)
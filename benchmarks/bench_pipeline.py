@@ -0,0 +1,229 @@
+"""
+bench_pipeline.py
+
+Offline, deterministic throughput benchmark of MoAFramework.generate_podcast_script.
+
+The Anthropic, Tavily and RSS backends are replaced by the simulated ones in
+benchmarks.fake_backend, so the benchmark measures the orchestration itself: worker
+fan-out, Tree of Thought expansion, rate limiting, retries and hedging. Every point of the
+grid of worker counts, Tree of Thought depths, branching factors and story counts reports
+API calls, injected failures, wall time, LLM call p50/p99, tokens and simulated cost.
+Simulated latencies are slept at --time-scale real seconds per simulated second, and all
+reported times are converted back to simulated seconds; scales much below 0.01 let thread
+scheduling overhead inflate them.
+
+The simulated answer to a call depends only on the request and the attempt number, so
+single-worker runs are reproducible. With several workers, the manager receives their
+outputs in completion order, so later prompts and token counts vary a little between
+runs; use --repeat to report medians.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline [--workers 1 3] [--depths 1 2] [--branching 2 3] [--stories 5]
+        [--async] [--repeat 1] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Dict, List, Optional
+from unittest.mock import patch
+import api_utils
+import clients
+import hedging
+import model_router
+import moa_framework
+import research
+import tracing
+from api_utils import track_usage
+from clients import ClientRegistry
+from config import Config
+from moa_framework import MoAFramework
+from model_router import ModelRouter
+from rate_limiter import RateLimitScheduler
+from benchmarks.fake_backend import (
+    BackendProfile, FakeAnthropic, FakeAsyncAnthropic, FakeBackend, FakeFeedParser, FakeTavilyClient, make_stories
+)
+
+GRID_KEYS = ("workers", "depth", "branching", "stories")
+REPORTED = ("wall_seconds", "llm_p50", "llm_p99", "calls", "tokens", "cost")
+
+class LatencyExporter:
+    """Span exporter keeping the durations of finished LLM calls."""
+
+    def __init__(self):
+        self.durations = []
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        if span.name == "llm.call":
+            self.durations.append(span.duration)
+
+    def close(self):
+        pass
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def bench_patches(backend: FakeBackend, stories: List[Dict], exporter: LatencyExporter, workers: int, depth: int,
+                  branching: int) -> ExitStack:
+    """Swap every external backend and process-wide singleton for a fresh, simulated one."""
+    scale = backend.time_scale
+
+    def sleep(seconds):
+        time.sleep(seconds * scale)
+
+    async def sleep_async(seconds):
+        await asyncio.sleep(seconds * scale)
+
+    # Generous limits: the benchmark exercises the scheduler without being throttled by it
+    limiter = RateLimitScheduler(10 ** 6, 10 ** 9, 10 ** 9)
+    stack = ExitStack()
+    for name, value in (("MAX_WORKERS", workers), ("TOT_MAX_DEPTH", depth), ("TOT_BRANCHING_FACTOR", branching),
+                        ("NUM_STORIES", len(stories)), ("STORIES_PER_FEED", len(stories)), ("LLM_CACHE_ENABLED", False),
+                        ("RESEARCH_CACHE_ENABLED", False), ("INCREMENTAL_STORIES", False), ("TRACE_OTEL_ENABLED", False)):
+        stack.enter_context(patch.object(Config, name, value))
+    for target, name, value in (
+        (api_utils, "client", FakeAnthropic(backend)),
+        (api_utils, "async_client", FakeAsyncAnthropic(backend)),
+        (api_utils, "get_rate_limiter", lambda: limiter),
+        (api_utils._create_message.retry, "sleep", sleep),
+        (api_utils._create_message_async.retry, "sleep", sleep_async),
+        (moa_framework, "RSSFeedParser", lambda url: FakeFeedParser(url, stories)),
+        (clients, "TavilyClient", FakeTavilyClient),
+        (clients, "_client_registry", ClientRegistry()),
+        (research, "_research_stages", {}),
+        (hedging, "_hedging_policy", None),
+        (model_router, "_model_router", ModelRouter()),
+        (tracing, "_tracer", tracing.Tracer([exporter]))
+    ):
+        stack.enter_context(patch.object(target, name, value))
+    return stack
+
+def run_point(profile: BackendProfile, time_scale: float, workers: int, depth: int, branching: int, num_stories: int,
+              use_async: bool) -> Dict:
+    """Generate one script on the simulated backend and return its measurements."""
+    backend = FakeBackend(profile, time_scale)
+    exporter = LatencyExporter()
+    stories = make_stories(num_stories, seed=profile.seed)
+    with bench_patches(backend, stories, exporter, workers, depth, branching):
+        framework = MoAFramework("https://example.com/feed", "fake-tavily-key")
+        with track_usage() as usage:
+            start = time.perf_counter()
+            if use_async:
+                asyncio.run(framework.generate_podcast_script_async())
+            else:
+                framework.generate_podcast_script()
+            wall = time.perf_counter() - start
+        routes = model_router.get_model_router().stats()
+    usage = usage.as_dict()
+    llm = [duration / time_scale for duration in exporter.durations]
+    return {
+        "workers": workers, "depth": depth, "branching": branching, "stories": num_stories,
+        "calls": usage["calls"], "cached_calls": usage["cached_calls"],
+        "attempts": backend.calls, "errors": backend.errors, "rate_limited": backend.rate_limited,
+        "wall_seconds": wall / time_scale, "real_seconds": wall,
+        "llm_p50": percentile(llm, 0.5), "llm_p99": percentile(llm, 0.99),
+        "input_tokens": usage["input_tokens"], "output_tokens": usage["output_tokens"],
+        "tokens": usage["input_tokens"] + usage["output_tokens"],
+        "cache_read_tokens": usage["cache_read_tokens"], "cache_write_tokens": usage["cache_write_tokens"],
+        "cost": sum(route["cost"] for route in routes.values())
+    }
+
+def median_of(runs: List[Dict]) -> Dict:
+    """Combine repeated runs of one point, taking the median of every measurement."""
+    result = dict(runs[0])
+    for key, value in runs[0].items():
+        if key not in GRID_KEYS and isinstance(value, (int, float)):
+            values = [run[key] for run in runs if run[key] is not None]
+            median = statistics.median if isinstance(value, float) else statistics.median_low
+            result[key] = median(values) if values else None
+    return result
+
+def point_key(result: Dict) -> tuple:
+    return tuple(result[key] for key in GRID_KEYS)
+
+def format_results(results: List[Dict], baseline: Dict[tuple, Dict] = None) -> str:
+    lines = [
+        f"{'Workers':>7} {'Depth':>5} {'Branch':>6} {'Stories':>7} {'Calls':>6} {'Errors':>6} {'429s':>5} "
+        f"{'Wall s':>8} {'p50 s':>6} {'p99 s':>6} {'Tokens':>8} {'Cache rd':>8} {'Cost $':>8}" + ("  vs baseline" if baseline else "")
+    ]
+    for result in results:
+        line = (
+            f"{result['workers']:>7} {result['depth']:>5} {result['branching']:>6} {result['stories']:>7} "
+            f"{result['calls']:>6} {result['errors']:>6} {result['rate_limited']:>5} {result['wall_seconds']:>8.1f} "
+            f"{result['llm_p50'] or 0:>6.2f} {result['llm_p99'] or 0:>6.2f} {result['tokens']:>8} "
+            f"{result['cache_read_tokens']:>8} {result['cost']:>8.4f}"
+        )
+        previous = (baseline or {}).get(point_key(result))
+        if previous:
+            line += "  " + " ".join(
+                f"{key} {100 * (result[key] - previous[key]) / previous[key]:+.1f}%"
+                for key in REPORTED if result[key] is not None and previous.get(key)
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+def load_baseline(path: str) -> Dict[tuple, Dict]:
+    with open(path, encoding="utf-8") as f:
+        return {point_key(result): result for result in json.load(f)["results"]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--branching", type=int, nargs="+", default=[2, 3])
+    parser.add_argument("--stories", type=int, nargs="+", default=[5])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use generate_podcast_script_async")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Real seconds slept per simulated second")
+    parser.add_argument("--latency-median", type=float, default=0.8)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--seconds-per-token", type=float, default=0.01)
+    parser.add_argument("--output-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON results file. Defaults to output/benchmarks/pipeline_<timestamp>.json")
+    parser.add_argument("--compare", help="JSON results of an earlier run to print deltas against")
+    args = parser.parse_args(argv)
+
+    # Injected failures are expected; keep their retries out of the results table
+    logging.disable(logging.ERROR)
+    profile = BackendProfile(
+        latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+        seconds_per_output_token=args.seconds_per_token, output_tokens=args.output_tokens,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    )
+    print(f"{'async' if args.use_async else 'threaded'} pipeline, time scale {args.time_scale}, "
+          f"median of {args.repeat}; times in simulated seconds")
+
+    results = []
+    for workers, depth, branching, num_stories in itertools.product(args.workers, args.depths, args.branching, args.stories):
+        runs = [run_point(profile, args.time_scale, workers, depth, branching, num_stories, args.use_async)
+                for _ in range(args.repeat)]
+        results.append(median_of(runs))
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    print(format_results(results, baseline))
+
+    output = args.output or os.path.join("output", "benchmarks", f"pipeline_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"profile": profile.as_dict(), "time_scale": args.time_scale, "async": args.use_async,
+                   "repeat": args.repeat, "results": results}, f, indent=2)
+    print(f"Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+bench_tokenizer.py
+
+Micro-benchmark comparing the original per-sentence token counting chunker against
+tokenizer.chunk_text on large synthetic articles.
+
+Run from the repository root:
+    python -m benchmarks.bench_tokenizer [--sentences 2000 5000 20000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+from unittest.mock import patch
+import tiktoken
+import tiktoken.registry
+import tokenizer
+
+WORDS = ("model agent launch research open source benchmark release funding startup chip "
+         "inference training dataset robotics policy safety developer platform api update").split()
+
+def make_article(num_sentences: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return ". ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))).capitalize()
+        for _ in range(num_sentences)
+    )
+
+def legacy_chunk_text(text: str, encoder_factory: Callable[[], tiktoken.Encoding], max_tokens: int = 4000) -> List[str]:
+    """The chunker as it was before tokenizer.py: one encoder lookup and one encode per sentence."""
+    def count_tokens(sentence):
+        return len(encoder_factory().encode(sentence))
+
+    chunks = []
+    current_chunk = ""
+    current_tokens = 0
+    for sentence in text.split(". "):
+        sentence_tokens = count_tokens(sentence)
+        if current_tokens + sentence_tokens > max_tokens:
+            chunks.append(current_chunk)
+            current_chunk = sentence
+            current_tokens = sentence_tokens
+        else:
+            current_chunk += sentence + ". "
+            current_tokens += sentence_tokens
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+def best_of(repeat: int, func: Callable, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def offline_encoding() -> tiktoken.Encoding:
+    """A small BPE over the benchmark vocabulary, roughly one token per word like a real encoding."""
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in WORDS:
+        for variant in (word, word.capitalize(), " " + word, " " + word.capitalize()):
+            data = variant.encode()
+            for end in range(2, len(data) + 1):
+                ranks.setdefault(data[:end], len(ranks))
+    return tiktoken.Encoding(name="bench_vocab", pat_str=r" ?\S+|\s+", mergeable_ranks=ranks, special_tokens={})
+
+def load_encoder_factory():
+    try:
+        tiktoken.encoding_for_model(tokenizer.DEFAULT_MODEL)
+        return lambda: tiktoken.encoding_for_model(tokenizer.DEFAULT_MODEL), "cl100k_base"
+    except Exception as e:
+        # Offline: register a stand-in under the real name so the legacy path still pays the real model lookup
+        print(f"Could not load the tiktoken encoding ({e.__class__.__name__}); using an offline vocabulary encoding")
+        tiktoken.registry.ENCODINGS[tokenizer.FALLBACK_ENCODING] = offline_encoding()
+        return lambda: tiktoken.encoding_for_model(tokenizer.DEFAULT_MODEL), "offline vocabulary"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    encoder_factory, encoding_name = load_encoder_factory()
+    encoder = encoder_factory()
+    print(f"Encoding: {encoding_name}, max_tokens={args.max_tokens}, best of {args.repeat}")
+    print(f"{'Sentences':>9} {'Tokens':>9} {'Legacy (s)':>11} {'Sentence (s)':>13} {'Token (s)':>10} {'Speedup':>8}")
+
+    with patch.object(tokenizer, 'get_encoder', return_value=encoder):
+        for num_sentences in args.sentences:
+            article = make_article(num_sentences)
+            legacy = best_of(args.repeat, legacy_chunk_text, article, encoder_factory, args.max_tokens)
+            sentence_mode = best_of(args.repeat, tokenizer.chunk_text, article, max_tokens=args.max_tokens)
+            token_mode = best_of(args.repeat, tokenizer.chunk_text, article, max_tokens=args.max_tokens,
+                                 respect_sentences=False)
+            print(f"{num_sentences:>9} {tokenizer.count_tokens(article):>9} {legacy:>11.3f} "
+                  f"{sentence_mode:>13.3f} {token_mode:>10.3f} {legacy / sentence_mode:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
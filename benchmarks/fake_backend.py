@@ -0,0 +1,252 @@
+"""
+fake_backend.py
+
+Simulated Anthropic, Tavily and feed backends for the offline pipeline benchmarks.
+
+The fake Anthropic client answers every prompt the agents send (thought generation,
+single and batched evaluation, synthesis) with well-formed text. It sleeps for a latency
+drawn from a configurable distribution and reports token usage. It can also fail with
+server errors or 429 responses at configurable rates. Prompt caching is simulated: a
+content block marked with cache_control is written to the cache on first use and read
+from it afterwards, with the cache usage fields reported like the real API. Randomness is
+derived from the request content and the attempt number, so a run is reproducible however
+the requests interleave.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+import anthropic
+import httpx
+
+BATCH_EVALUATION_PROMPT = re.compile(r"evaluate each of the following numbered thoughts", re.IGNORECASE)
+NUMBERED_THOUGHT = re.compile(r"^(\d+)\. ", re.MULTILINE)
+GENERATION_PROMPT = re.compile(r"^Generate (\d+) diverse thoughts")
+WORDS = ("model agent launch research open source benchmark release funding startup chip "
+         "inference training dataset robotics policy safety developer platform api update").split()
+API_URL = "https://api.anthropic.com/v1/messages"
+
+class BackendProfile:
+    """
+    Behaviour of the simulated LLM API. Durations are in simulated seconds.
+
+    Attributes:
+        latency_median (float): Median time to first token.
+        latency_sigma (float): Log-normal shape of the time to first token; larger means a longer tail.
+        seconds_per_output_token (float): Generation time per output token.
+        output_tokens (int): Typical output length of generation and synthesis calls.
+        error_rate (float): Probability that an attempt fails with a 500 error.
+        rate_limit_rate (float): Probability that an attempt is rejected with a 429.
+        retry_after (float): The 'retry-after' header sent with a 429.
+        model_speed (Dict[str, float]): Latency multiplier for models whose name contains the key.
+        evaluation_weights (Tuple[float, float, float]): Odds of 'sure', 'maybe' and 'impossible'.
+        seed (int): Seed mixed into every request's randomness.
+    """
+
+    def __init__(self, latency_median: float = 0.8, latency_sigma: float = 0.5, seconds_per_output_token: float = 0.01,
+                 output_tokens: int = 300, error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 model_speed: Dict[str, float] = None, evaluation_weights: Tuple[float, float, float] = (0.3, 0.6, 0.1),
+                 seed: int = 0):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.seconds_per_output_token = seconds_per_output_token
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.model_speed = {"haiku": 0.4} if model_speed is None else model_speed
+        self.evaluation_weights = evaluation_weights
+        self.seed = seed
+
+    def as_dict(self) -> Dict:
+        return dict(vars(self))
+
+class FakeBackend:
+    """
+    The simulated API shared by the sync and async fake clients.
+
+    Attributes:
+        profile (BackendProfile): Simulated behaviour.
+        time_scale (float): Real seconds slept per simulated second.
+        calls (int): Attempts received, including failed ones.
+        errors (int): Attempts failed with a 500.
+        rate_limited (int): Attempts rejected with a 429.
+    """
+
+    def __init__(self, profile: BackendProfile, time_scale: float = 0.01):
+        self.profile = profile
+        self.time_scale = time_scale
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self._attempts = {}
+        self._prompt_cache = set()
+        self._lock = threading.Lock()
+
+    def _rng(self, request: Dict) -> random.Random:
+        digest = hashlib.sha256(repr((request["model"], request["system"], request["messages"])).encode()).hexdigest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+        return random.Random(f"{self.profile.seed}:{digest}:{attempt}")
+
+    def _latency(self, rng: random.Random, model: str, output_tokens: int) -> float:
+        speed = next((factor for key, factor in self.profile.model_speed.items() if key in model), 1.0)
+        first_token = self.profile.latency_median * rng.lognormvariate(0, self.profile.latency_sigma)
+        return speed * (first_token + output_tokens * self.profile.seconds_per_output_token)
+
+    def _text(self, rng: random.Random, prompt: str, max_tokens: int) -> str:
+        labels = ("sure", "maybe", "impossible")
+        if BATCH_EVALUATION_PROMPT.search(prompt):
+            count = len(NUMBERED_THOUGHT.findall(prompt))
+            return "\n".join(
+                f"{i}: {rng.choices(labels, self.profile.evaluation_weights)[0]} {rng.randint(1, 10)}" for i in range(1, count + 1)
+            )
+        if prompt.startswith("Quickly evaluate as"):
+            return f"{rng.choices(labels, self.profile.evaluation_weights)[0]} {rng.randint(1, 10)}"
+        length = max(1, min(max_tokens, int(rng.gauss(self.profile.output_tokens, self.profile.output_tokens / 4))))
+        match = GENERATION_PROMPT.match(prompt)
+        if match:
+            count = int(match.group(1))
+            return "\n".join(
+                f"Thought {i}: " + " ".join(rng.choice(WORDS) for _ in range(max(1, length // count)))
+                for i in range(1, count + 1)
+            )
+        return " ".join(rng.choice(WORDS) for _ in range(length))
+
+    def _error(self, status: int, headers: Dict[str, str]) -> anthropic.APIStatusError:
+        response = httpx.Response(status, headers=headers, request=httpx.Request("POST", API_URL))
+        if status == 429:
+            return anthropic.RateLimitError("Simulated rate limit", response=response, body=None)
+        return anthropic.InternalServerError("Simulated server error", response=response, body=None)
+
+    def plan(self, request: Dict) -> Tuple[float, object]:
+        """
+        Decide the outcome of one attempt.
+
+        Returns:
+            Tuple[float, object]: Simulated latency and either a raw response or the error to raise.
+        """
+        rng = self._rng(request)
+        if rng.random() < self.profile.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            retry_after = self.profile.retry_after * self.time_scale
+            return 0.05, self._error(429, {"retry-after": f"{retry_after:.4f}"})
+        if rng.random() < self.profile.error_rate:
+            with self._lock:
+                self.errors += 1
+            return self._latency(rng, request["model"], 0), self._error(500, {})
+
+        content = request["messages"][-1]["content"]
+        blocks = [{"type": "text", "text": content}] if isinstance(content, str) else content
+        prompt = blocks[-1]["text"]
+        written = []
+        text = self._text(rng, prompt, request["max_tokens"])
+        output_tokens = len(text.split())
+        message = SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(output_tokens=output_tokens, **self._input_usage(request, blocks, written))
+        )
+        raw = SimpleNamespace(headers={}, parse=lambda: message, cache_writes=written)
+        return self._latency(rng, request["model"], output_tokens), raw
+
+    def _input_usage(self, request: Dict, blocks: List[Dict], written: List[tuple]) -> Dict[str, int]:
+        """
+        Split the input tokens into uncached, cache write and cache read, as the API reports them.
+
+        Prefixes at cache breakpoints are appended to written; they become readable once the
+        response has been delivered, like the real cache.
+        """
+        usage = {"input_tokens": len(request["system"]) // 4, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        prefix = (request["model"], request["system"])
+        for block in blocks:
+            tokens = len(block["text"]) // 4
+            prefix += (block["text"],)
+            if "cache_control" not in block:
+                usage["input_tokens"] += tokens
+                continue
+            # A breakpoint caches the whole prefix up to and including its block
+            prefix_tokens = usage["input_tokens"] + tokens
+            with self._lock:
+                hit = prefix in self._prompt_cache
+            usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] += prefix_tokens
+            written.append(prefix)
+            usage["input_tokens"] = 0
+        return usage
+
+    def _deliver(self, outcome):
+        if isinstance(outcome, Exception):
+            raise outcome
+        with self._lock:
+            self._prompt_cache.update(outcome.cache_writes)
+        return outcome
+
+    def create(self, timeout: float = None, extra_headers: Dict = None, **request):
+        latency, outcome = self.plan(request)
+        time.sleep(latency * self.time_scale)
+        return self._deliver(outcome)
+
+    async def create_async(self, timeout: float = None, extra_headers: Dict = None, **request):
+        latency, outcome = self.plan(request)
+        await asyncio.sleep(latency * self.time_scale)
+        return self._deliver(outcome)
+
+class FakeAnthropic:
+    """Stands in for anthropic.Anthropic; only messages.with_raw_response.create is simulated."""
+
+    def __init__(self, backend: FakeBackend):
+        raw = SimpleNamespace(create=backend.create)
+        self.messages = SimpleNamespace(with_raw_response=raw)
+
+class FakeAsyncAnthropic:
+    """Stands in for anthropic.AsyncAnthropic."""
+
+    def __init__(self, backend: FakeBackend):
+        raw = SimpleNamespace(create=backend.create_async)
+        self.messages = SimpleNamespace(with_raw_response=raw)
+
+class FakeTavilyClient:
+    """Stands in for tavily.Client with a fixed search latency in real seconds."""
+
+    def __init__(self, api_key: str = None, latency: float = 0.0):
+        self.api_key = api_key
+        self.latency = latency
+        self.searches = 0
+
+    def search(self, query: str, search_depth: str = "basic", max_results: int = 5, **kwargs) -> Dict:
+        self.searches += 1
+        time.sleep(self.latency)
+        return {"query": query, "results": [
+            {"title": f"Result {i} for {query}", "url": f"https://example.com/search/{i}", "content": f"Background on {query}"}
+            for i in range(max_results)
+        ]}
+
+def make_stories(count: int, seed: int = 0) -> List[Dict]:
+    """Synthetic stories in the shape returned by RSSFeedParser."""
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"Story {i}: " + " ".join(rng.choice(WORDS) for _ in range(6)),
+            "summary": " ".join(rng.choice(WORDS) for _ in range(40)),
+            "link": f"https://example.com/news/{i}",
+            "published": None
+        }
+        for i in range(count)
+    ]
+
+class FakeFeedParser:
+    """Stands in for RSSFeedParser and serves a fixed list of synthetic stories."""
+
+    def __init__(self, url: str, stories: List[Dict]):
+        self.url = url
+        self.stories = stories
+
+    def get_top_stories(self, num_stories: int = 10, days: int = 7) -> List[Dict]:
+        return self.stories[:num_stories]
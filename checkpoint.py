@@ -0,0 +1,194 @@
+"""
+checkpoint.py
+
+This module provides stage-level checkpointing for the AI News Podcast Generation System.
+Each pipeline run gets a directory under Config.OUTPUT_DIR holding a manifest and the
+output of every completed stage, so a failed run can be resumed without redoing the
+stages that already finished.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+class CheckpointError(Exception):
+    """Custom exception class for checkpoint-related errors."""
+    pass
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode(obj: dict) -> Any:
+    if set(obj) == {"__datetime__"}:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+def compute_input_hash(stories: List[dict]) -> str:
+    """
+    Hash the pipeline input so a run directory can be tied to the stories it was built from.
+
+    Args:
+        stories (List[dict]): The stories fed into the pipeline.
+
+    Returns:
+        str: A SHA-256 hex digest over each story's title, summary and link.
+    """
+    canonical = json.dumps(
+        [[story.get("title"), story.get("summary"), story.get("link")] for story in stories],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class RunCheckpoint:
+    """
+    Persists the output of each pipeline stage for one run.
+
+    Attributes:
+        run_id (str): Identifier of the run, also the name of its directory.
+        run_dir (str): Directory holding the manifest and stage outputs.
+        manifest (dict): Run metadata: run_id, created_at, input_hash and completed_stages.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, run_id: str, run_dir: str, manifest: dict):
+        self.run_id = run_id
+        self.run_dir = run_dir
+        self.manifest = manifest
+        # Independent stages may finish concurrently; serialize manifest updates
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, base_dir: str, run_id: str = None) -> "RunCheckpoint":
+        """
+        Start a new run directory.
+
+        Args:
+            base_dir (str): Directory under which run directories are created.
+            run_id (str, optional): Identifier to use. Defaults to a timestamp plus a random suffix.
+
+        Returns:
+            RunCheckpoint: The checkpoint for the new run.
+        """
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        run_dir = os.path.join(base_dir, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        checkpoint = cls(run_id, run_dir, {
+            "run_id": run_id,
+            "created_at": datetime.now().isoformat(),
+            "input_hash": None,
+            "completed_stages": []
+        })
+        checkpoint._write_json(cls.MANIFEST_FILE, checkpoint.manifest)
+        return checkpoint
+
+    @classmethod
+    def load(cls, base_dir: str, run_id: str) -> "RunCheckpoint":
+        """
+        Open an existing run directory for resuming.
+
+        Args:
+            base_dir (str): Directory under which run directories are created.
+            run_id (str): Identifier of the run to resume.
+
+        Returns:
+            RunCheckpoint: The checkpoint for the existing run.
+
+        Raises:
+            CheckpointError: If the run does not exist or its manifest cannot be read.
+        """
+        run_dir = os.path.join(base_dir, run_id)
+        try:
+            with open(os.path.join(run_dir, cls.MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CheckpointError(f"Cannot resume run {run_id}: {str(e)}")
+        return cls(run_id, run_dir, manifest)
+
+    @property
+    def input_hash(self) -> str:
+        return self.manifest.get("input_hash")
+
+    def has_stage(self, stage: str) -> bool:
+        return stage in self.manifest["completed_stages"]
+
+    def load_stage(self, stage: str) -> Any:
+        """
+        Load the saved output of a completed stage.
+
+        Args:
+            stage (str): The stage name.
+
+        Returns:
+            Any: The stage output as it was saved.
+
+        Raises:
+            CheckpointError: If the stage was never completed or its file cannot be read.
+        """
+        if not self.has_stage(stage):
+            raise CheckpointError(f"Stage '{stage}' has not been completed in run {self.run_id}")
+        try:
+            with open(os.path.join(self.run_dir, f"{stage}.json")) as f:
+                return json.load(f, object_hook=_decode)["output"]
+        except (OSError, ValueError, KeyError) as e:
+            raise CheckpointError(f"Cannot load stage '{stage}' of run {self.run_id}: {str(e)}")
+
+    def save_stage(self, stage: str, output: Any):
+        """
+        Save the output of a stage and mark it completed in the manifest.
+
+        Args:
+            stage (str): The stage name.
+            output (Any): JSON-serializable stage output (datetimes are supported).
+        """
+        with self._lock:
+            self._write_json(f"{stage}.json", {"stage": stage, "output": output})
+            if stage not in self.manifest["completed_stages"]:
+                self.manifest["completed_stages"].append(stage)
+            self._write_json(self.MANIFEST_FILE, self.manifest)
+        logger.info(f"Checkpointed stage '{stage}' of run {self.run_id}")
+
+    def record_input(self, stories: List[dict]):
+        """
+        Record the hash of the pipeline input in the manifest.
+
+        A resumed run that re-fetches different stories than it recorded cannot reuse the
+        outputs built from the old ones: the mismatch is refused once any later stage has
+        been completed, and only logged otherwise.
+
+        Args:
+            stories (List[dict]): The stories fed into the pipeline.
+
+        Raises:
+            CheckpointError: If the stories differ from the recorded input and later stages were completed.
+        """
+        input_hash = compute_input_hash(stories)
+        with self._lock:
+            recorded = self.manifest.get("input_hash")
+            if recorded is not None and recorded != input_hash:
+                built_on_input = [stage for stage in self.manifest["completed_stages"] if stage != "stories"]
+                if built_on_input:
+                    raise CheckpointError(
+                        f"The stories of run {self.run_id} changed since it started, so its completed stages "
+                        f"({', '.join(built_on_input)}) are stale; start a new run instead of resuming it"
+                    )
+                logger.warning(f"The stories of run {self.run_id} changed since it started; recording the new input")
+            self.manifest["input_hash"] = input_hash
+            self._write_json(self.MANIFEST_FILE, self.manifest)
+
+    def _write_json(self, filename: str, data: Any):
+        # Write to a temporary file first so a crash never leaves a half-written checkpoint
+        path = os.path.join(self.run_dir, filename)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, default=_encode, indent=2)
+        os.replace(tmp_path, path)
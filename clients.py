@@ -0,0 +1,96 @@
+"""
+clients.py
+
+This module provides the shared API client registry for the AI News Podcast Generation System.
+One Anthropic client, one async Anthropic client and one Tavily client per API key are
+created on first use and shared by every agent. The Anthropic clients' HTTP connection
+pools are sized to the request concurrency the scheduler allows, so concurrent calls
+reuse warm connections instead of queueing for the library default pool or opening new
+ones.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict
+import anthropic
+import httpx
+from dotenv import load_dotenv
+from tavily import Client as TavilyClient
+from config import Config
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+class ClientRegistry:
+    """
+    Lazily created API clients shared across agents.
+
+    Attributes:
+        pool_size (int): Maximum open connections of each Anthropic HTTP pool.
+        keepalive (int): Idle connections each pool keeps open for reuse.
+    """
+
+    def __init__(self, pool_size: int = None, keepalive: int = None):
+        """
+        Initialize the ClientRegistry.
+
+        Args:
+            pool_size (int, optional): Defaults to Config.HTTP_POOL_SIZE.
+            keepalive (int, optional): Defaults to Config.HTTP_KEEPALIVE_CONNECTIONS.
+        """
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.keepalive = min(keepalive or Config.HTTP_KEEPALIVE_CONNECTIONS, self.pool_size)
+        self._anthropic = None
+        self._async_anthropic = None
+        self._tavily: Dict[str, TavilyClient] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.keepalive)
+
+    def anthropic_client(self) -> anthropic.Anthropic:
+        """Return the shared Anthropic client, creating it on first use."""
+        with self._lock:
+            if self._anthropic is None:
+                self._anthropic = anthropic.Anthropic(
+                    api_key=os.getenv("ANTHROPIC_API_KEY"),
+                    http_client=anthropic.DefaultHttpxClient(limits=self._limits())
+                )
+            return self._anthropic
+
+    def async_anthropic_client(self) -> anthropic.AsyncAnthropic:
+        """Return the shared async Anthropic client, creating it on first use."""
+        with self._lock:
+            if self._async_anthropic is None:
+                self._async_anthropic = anthropic.AsyncAnthropic(
+                    api_key=os.getenv("ANTHROPIC_API_KEY"),
+                    http_client=anthropic.DefaultAsyncHttpxClient(limits=self._limits())
+                )
+            return self._async_anthropic
+
+    def tavily_client(self, api_key: str) -> TavilyClient:
+        """Return the Tavily client for api_key, shared by every agent using that key."""
+        with self._lock:
+            client = self._tavily.get(api_key)
+            if client is None:
+                client = self._tavily[api_key] = TavilyClient(api_key=api_key)
+            return client
+
+    def close(self):
+        """Close the sync Anthropic connection pool; the async pool is closed with its event loop."""
+        with self._lock:
+            if self._anthropic is not None:
+                self._anthropic.close()
+                self._anthropic = None
+
+_client_registry = None
+_client_registry_lock = threading.Lock()
+
+def get_client_registry() -> ClientRegistry:
+    """Return the process-wide client registry, creating it from Config on first use."""
+    global _client_registry
+    with _client_registry_lock:
+        if _client_registry is None:
+            _client_registry = ClientRegistry()
+        return _client_registry
@@ -6,15 +6,58 @@ load_dotenv()
 class Config:
     # RSS Feed settings
     RSS_FEED_URL = "https://www.futuretools.io/news"
+    # Feeds ingested together; set RSS_FEED_URLS to a comma-separated list to combine several sources
+    RSS_FEED_URLS = [url.strip() for url in os.getenv("RSS_FEED_URLS", "").split(",") if url.strip()] or [RSS_FEED_URL]
     NUM_STORIES = 10
     DAYS_LOOKBACK = 7
+    FEED_CACHE_DIR = os.path.join("output", "cache", "feeds")
+    FEED_REQUEST_TIMEOUT = 15
+    FEED_POOL_SIZE = 10
+    # 'auto' detects RSS/Atom XML vs. an HTML news page; 'xml' or 'html' forces a backend
+    FEED_PARSER_BACKEND = "auto"
+    # Fresh stories taken from each feed before cross-source deduplication and ranking
+    STORIES_PER_FEED = 30
+    # Stories whose title/summary SimHash fingerprints differ in at most this many bits are merged
+    DEDUP_SIMHASH_MAX_DISTANCE = 3
 
     # Agent settings
     CHIEF_EDITOR_MODEL = "claude-3-5-sonnet-20240620"
     MANAGER_MODEL = "claude-3-5-sonnet-20240620"
     WORKER_MODEL = "claude-3-haiku-20240307"
+    # Tree of Thought evaluations are the most frequent and simplest calls, so they use the fastest model
+    EVALUATION_MODEL = WORKER_MODEL
+    # Model per call site ('<role>.<step>', wildcards allowed); other call sites use their agent's model
+    MODEL_ROUTES = {"*.evaluate": EVALUATION_MODEL, "*.evaluate_batch": EVALUATION_MODEL}
+    # Models from cheapest to largest; a call whose output fails validation is retried one model up
+    MODEL_CASCADE = [WORKER_MODEL, MANAGER_MODEL, CHIEF_EDITOR_MODEL]
+    MAX_MODEL_ESCALATIONS = 1
+    # USD per million input and output tokens, for the per-route cost report
+    MODEL_PRICES = {
+        "claude-3-haiku-20240307": (0.25, 1.25),
+        "claude-3-5-sonnet-20240620": (3.0, 15.0),
+        "claude-3-opus-20240229": (15.0, 75.0),
+    }
     TOT_MAX_DEPTH = 2
     TOT_BRANCHING_FACTOR = 2
+    # Score all sibling thoughts in one request instead of one request per thought
+    TOT_BATCH_EVALUATION = True
+    # Sibling nodes at one ToT depth expanded at the same time (1 = sequential)
+    TOT_MAX_PARALLEL_EXPANSIONS = 4
+    # Run-scoped transposition table: children generated for a thought and verdicts given to it are
+    # reused by every tree in the run that reaches the same (normalized) thought
+    TOT_TRANSPOSITION_ENABLED = True
+    TOT_TRANSPOSITION_MAX_ENTRIES = 20000
+    # 'bfs' expands every unfinished thought of a level; 'beam' keeps only the TOT_BEAM_WIDTH best-scored
+    # thoughts per level and stops at the first exhausted budget, returning the best thoughts found so far
+    TOT_SEARCH_MODE = "bfs"
+    TOT_BEAM_WIDTH = 3
+    # Budgets of one beam search (None = unbounded): API calls, input plus output tokens, and wall-clock seconds
+    TOT_BUDGET_MAX_CALLS = None
+    TOT_BUDGET_MAX_TOKENS = None
+    TOT_BUDGET_SECONDS = None
+    # Evaluations rate each thought from 1 to 10, and a thought is scored by the mean of rating / 10 along its path;
+    # an evaluation without a rating scores its label's value here
+    TOT_EVALUATION_SCORES = {"sure": 1.0, "maybe": 0.5, "impossible": 0.0}
 
     # API keys
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
@@ -22,9 +65,102 @@ class Config:
 
     # Output settings
     OUTPUT_DIR = "output"
+    # Per-run stage checkpoints, used by `main.py --resume <run_id>`
+    RUNS_DIR = os.path.join(OUTPUT_DIR, "runs")
+    # Span traces (one JSONL file per run). With OTEL_EXPORTER_OTLP_ENDPOINT set, spans are also exported over
+    # OTLP; this needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http, or opentelemetry-instrument
+    TRACE_ENABLED = True
+    TRACES_DIR = os.path.join(OUTPUT_DIR, "traces")
+    TRACE_OTEL_ENABLED = bool(os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"))
+
+    # Incremental mode: stories go through the News Editor and Journalist layers one at a time,
+    # and stories already processed by an earlier run reuse their stored outputs
+    INCREMENTAL_STORIES = False
+    STORY_STORE_PATH = os.path.join(OUTPUT_DIR, "cache", "stories.sqlite")
+    STORY_STORE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+    # LLM response cache settings
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_PATH = os.path.join(OUTPUT_DIR, "cache", "llm_responses.sqlite")
+    LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES = 50000
+    # Anthropic prompt caching of the story context shared by every call of a Tree of Thought run.
+    # Contexts shorter than their model's PROMPT_CACHE_MIN_TOKENS (the smallest cacheable prefix; models not
+    # listed use the largest) are sent unmarked, and deeper Tree of Thought nodes then leave them out;
+    # PROMPT_CACHING_BETA is sent as the anthropic-beta header (None once the feature needs no header)
+    PROMPT_CACHING_ENABLED = True
+    PROMPT_CACHE_MIN_TOKENS = {
+        "claude-3-haiku-20240307": 2048,
+        "claude-3-5-sonnet-20240620": 1024,
+        "claude-3-opus-20240229": 1024,
+    }
+    PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+    # Calls sharing a cacheable prefix wait this long for the first one to write it to the cache
+    PROMPT_CACHE_WARMUP_TIMEOUT = 30
+    # Price of cache writes and reads as a multiple of the model's input token price
+    PROMPT_CACHE_WRITE_PRICE_RATIO = 1.25
+    PROMPT_CACHE_READ_PRICE_RATIO = 0.1
+
+    # Research stage: Tavily searches for every story run on a pool of RESEARCH_POOL_SIZE threads
+    # while the News Editor layer works, and their results are added to the Journalist input
+    RESEARCH_ENABLED = True
+    RESEARCH_POOL_SIZE = 4
+    RESEARCH_SEARCH_DEPTH = "basic"
+    RESEARCH_MAX_RESULTS = 3
+    # Queries are cut to this many words after normalization
+    RESEARCH_MAX_QUERY_WORDS = 12
+    # Search results are cached across runs and episodes
+    RESEARCH_CACHE_ENABLED = True
+    RESEARCH_CACHE_PATH = os.path.join(OUTPUT_DIR, "cache", "research.sqlite")
+    RESEARCH_CACHE_TTL_SECONDS = 6 * 60 * 60
 
     # Parallel processing settings
     MAX_WORKERS = 3
+    # 'concatenated' runs every layer once over all stories joined together; 'map_reduce' runs the
+    # News Editor and Journalist layers per story in parallel, then their managers reduce the results
+    PIPELINE_MODE = "concatenated"
+    MAX_PARALLEL_STORIES = 8
+    # Stories waiting between two per-story layers; a full queue holds back the upstream layer
+    STORY_QUEUE_SIZE = 4
+    # Worker outputs a manager waits for before synthesizing (None = all); slower workers are abandoned
+    WORKER_QUORUM = None
+    # Largest input handed to a manager in one reduce step; larger sets of outputs are reduced in groups
+    REDUCE_MAX_INPUT_TOKENS = 12000
+    REDUCE_MAX_LEVELS = 3
+    # Upper bound on in-flight requests shared by every coroutine in the async pipeline
+    MAX_CONCURRENT_REQUESTS = 64
+
+    # Hedged worker calls: a call running past its call site's HEDGE_QUANTILE latency gets a duplicate
+    # request, and the first answer wins. Deadlines are trusted once a site has HEDGE_MIN_SAMPLES calls,
+    # and at most HEDGE_BUDGET_RATIO of the hedgeable calls are duplicated
+    HEDGING_ENABLED = True
+    HEDGE_QUANTILE = 0.95
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_BUDGET_RATIO = 0.05
+    # HTTP connections kept free for duplicate requests
+    HEDGE_POOL_SIZE = 32
+    # Connections in each shared Anthropic HTTP pool: every in-flight request plus its hedge gets one
+    HTTP_POOL_SIZE = MAX_CONCURRENT_REQUESTS + HEDGE_POOL_SIZE
+    HTTP_KEEPALIVE_CONNECTIONS = 32
+
+    # Distributed mode (`main.py --distributed`): worker agent runs and manager Tree of Thought expansions
+    # are queued as tasks for `task_worker.py` processes on any node. 'sqlite:///<path>' for processes
+    # sharing a filesystem, 'redis://<host>:<port>/<db>' (needs the redis package) across machines
+    TASK_QUEUE_URL = os.getenv("TASK_QUEUE_URL", "sqlite:///" + os.path.join(OUTPUT_DIR, "queue", "tasks.sqlite"))
+    # A node keeps renewing the lease on its task; a task whose lease runs out goes to another node,
+    # and fails after TASK_MAX_ATTEMPTS claims
+    TASK_LEASE_SECONDS = 120
+    TASK_MAX_ATTEMPTS = 3
+    # How often the coordinator checks for finished tasks, and how long it waits for them
+    TASK_POLL_INTERVAL = 0.2
+    TASK_TIMEOUT_SECONDS = 60 * 60
+    # Tasks each task_worker.py process runs at the same time
+    TASK_WORKER_CONCURRENCY = 4
+
+    # Starting API budgets for the shared rate limit scheduler; adjusted from response headers
+    RATE_LIMIT_REQUESTS_PER_MINUTE = 50
+    RATE_LIMIT_INPUT_TOKENS_PER_MINUTE = 40000
+    RATE_LIMIT_OUTPUT_TOKENS_PER_MINUTE = 8000
 
     @classmethod
     def validate(cls):
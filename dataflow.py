@@ -0,0 +1,164 @@
+"""
+dataflow.py
+
+This module provides the dataflow scheduler used by the per-story pipeline of the AI News
+Podcast Generation System. Stages are connected by bounded queues and each stage has its own
+workers, so an item moves on to the next stage as soon as its own upstream work is done
+instead of waiting for every other item to clear the stage.
+"""
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, Awaitable, Callable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Each stage is (name, function of (item index, input) returning the stage output, number of workers)
+Stage = Tuple[str, Callable[[int, Any], Any], int]
+AsyncStage = Tuple[str, Callable[[int, Any], Awaitable[Any]], int]
+
+_DONE = object()
+
+class _PipelineState:
+    """Bookkeeping shared by the workers of one pipeline run."""
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable, int]], num_items: int):
+        self.stages = stages
+        self.results = [[None] * num_items for _ in stages]
+        self.errors = []
+        self.running = [max(1, workers) for _, _, workers in stages]
+        self._lock = threading.Lock()
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.errors)
+
+    def record_error(self, stage: int, index: int, error: Exception):
+        logger.error(f"Stage {self.stages[stage][0]} failed for item {index}: {str(error)}")
+        with self._lock:
+            self.errors.append(error)
+
+    def worker_finished(self, stage: int) -> bool:
+        """Return True if this was the stage's last worker, which then closes the next queue."""
+        with self._lock:
+            self.running[stage] -= 1
+            return self.running[stage] == 0
+
+def run_pipeline(items: Sequence[Any], stages: Sequence[Stage], queue_size: int) -> List[List[Any]]:
+    """
+    Push items through stages connected by bounded queues.
+
+    Every worker thread runs in a copy of the caller's context. After a failure the
+    remaining items are drained without being processed, and the first error is raised.
+
+    Args:
+        items (Sequence[Any]): The inputs of the first stage.
+        stages (Sequence[Stage]): The stages, in order.
+        queue_size (int): Capacity of each queue between stages.
+
+    Returns:
+        List[List[Any]]: The outputs of every stage, each in item order.
+
+    Raises:
+        Exception: The first error raised by a stage function.
+    """
+    state = _PipelineState(stages, len(items))
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+
+    def work(stage: int):
+        _, func, _ = stages[stage]
+        while True:
+            entry = queues[stage].get()
+            if entry is _DONE:
+                break
+            index, value = entry
+            if state.failed:
+                continue
+            try:
+                output = func(index, value)
+            except Exception as e:
+                state.record_error(stage, index, e)
+                continue
+            state.results[stage][index] = output
+            if stage + 1 < len(stages):
+                queues[stage + 1].put((index, output))
+        if state.worker_finished(stage) and stage + 1 < len(stages):
+            for _ in range(state.running[stage + 1]):
+                queues[stage + 1].put(_DONE)
+
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(work, stage), name=f"dataflow-{name}-{i}", daemon=True)
+        for stage, (name, _, workers) in enumerate(stages)
+        for i in range(max(1, workers))
+    ]
+    for thread in threads:
+        thread.start()
+    for index, item in enumerate(items):
+        if state.failed:
+            break
+        queues[0].put((index, item))
+    for _ in range(state.running[0]):
+        queues[0].put(_DONE)
+    for thread in threads:
+        thread.join()
+
+    if state.errors:
+        raise state.errors[0]
+    return state.results
+
+async def run_pipeline_async(items: Sequence[Any], stages: Sequence[AsyncStage], queue_size: int) -> List[List[Any]]:
+    """
+    Asynchronous counterpart of run_pipeline; every stage worker is a task on the running loop.
+
+    Args:
+        items (Sequence[Any]): The inputs of the first stage.
+        stages (Sequence[AsyncStage]): The stages, in order, with coroutine functions.
+        queue_size (int): Capacity of each queue between stages.
+
+    Returns:
+        List[List[Any]]: The outputs of every stage, each in item order.
+
+    Raises:
+        Exception: The first error raised by a stage function.
+    """
+    state = _PipelineState(stages, len(items))
+    queues = [asyncio.Queue(maxsize=max(1, queue_size)) for _ in stages]
+
+    async def work(stage: int):
+        _, func, _ = stages[stage]
+        while True:
+            entry = await queues[stage].get()
+            if entry is _DONE:
+                break
+            index, value = entry
+            if state.failed:
+                continue
+            try:
+                output = await func(index, value)
+            except Exception as e:
+                state.record_error(stage, index, e)
+                continue
+            state.results[stage][index] = output
+            if stage + 1 < len(stages):
+                await queues[stage + 1].put((index, output))
+        if state.worker_finished(stage) and stage + 1 < len(stages):
+            for _ in range(state.running[stage + 1]):
+                await queues[stage + 1].put(_DONE)
+
+    async def feed():
+        for index, item in enumerate(items):
+            if state.failed:
+                break
+            await queues[0].put((index, item))
+        for _ in range(state.running[0]):
+            await queues[0].put(_DONE)
+
+    await asyncio.gather(feed(), *(
+        work(stage) for stage, (_, _, workers) in enumerate(stages) for _ in range(max(1, workers))
+    ))
+    if state.errors:
+        raise state.errors[0]
+    return state.results
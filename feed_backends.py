@@ -0,0 +1,211 @@
+"""
+feed_backends.py
+
+This module provides the pluggable parser backends used by RSSFeedParser in the AI News
+Podcast Generation System. Each backend turns a fetched document into a lazy stream of
+stories, so selection can stop as soon as enough fresh stories have been collected:
+
+- XMLFeedBackend parses RSS 2.0 and Atom incrementally with iterparse.
+- HTMLFeedBackend scrapes news-item blocks from an HTML page, using lxml when it is
+  installed and BeautifulSoup restricted to the news-item blocks otherwise.
+"""
+
+import html
+import io
+import logging
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
+import xml.etree.ElementTree as ET
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+def _naive_local(value: datetime) -> datetime:
+    # Stories are compared against datetime.now(), so keep every date naive in local time
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+def _clean_text(value: Optional[str]) -> str:
+    return html.unescape(TAG_PATTERN.sub("", value or "")).strip()
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return _naive_local(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return _naive_local(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+class FeedBackend:
+    """Base class for parser backends: yields stories in document order."""
+
+    name = None
+
+    def iter_stories(self, content: bytes) -> Iterator[Dict]:
+        """
+        Lazily parse stories from a document.
+
+        Args:
+            content (bytes): The fetched document.
+
+        Yields:
+            Dict: Stories with 'title', 'summary', 'link' and 'published' keys.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+class XMLFeedBackend(FeedBackend):
+    """Incremental RSS 2.0 / Atom parser; elements are discarded as soon as each item is read."""
+
+    name = "xml"
+
+    def iter_stories(self, content: bytes) -> Iterator[Dict]:
+        for _, element in ET.iterparse(io.BytesIO(content), events=("end",)):
+            if element.tag == "item":
+                story = self._rss_item(element)
+            elif element.tag == f"{ATOM_NS}entry":
+                story = self._atom_entry(element)
+            else:
+                continue
+            element.clear()
+            if story['published'] is None:
+                logger.debug(f"Skipping undated feed item: {story['title']}")
+                continue
+            yield story
+
+    @staticmethod
+    def _rss_item(item: ET.Element) -> Dict:
+        return {
+            'title': _clean_text(item.findtext("title")),
+            'summary': _clean_text(item.findtext("description")),
+            'link': (item.findtext("link") or item.findtext("guid") or "").strip(),
+            'published': _parse_date(item.findtext("pubDate") or item.findtext("{http://purl.org/dc/elements/1.1/}date"))
+        }
+
+    @staticmethod
+    def _atom_entry(entry: ET.Element) -> Dict:
+        link = ""
+        for link_element in entry.findall(f"{ATOM_NS}link"):
+            if link_element.get("rel", "alternate") == "alternate":
+                link = link_element.get("href", "")
+                break
+        return {
+            'title': _clean_text(entry.findtext(f"{ATOM_NS}title")),
+            'summary': _clean_text(entry.findtext(f"{ATOM_NS}summary") or entry.findtext(f"{ATOM_NS}content")),
+            'link': link.strip(),
+            'published': _parse_date(entry.findtext(f"{ATOM_NS}published") or entry.findtext(f"{ATOM_NS}updated"))
+        }
+
+class HTMLFeedBackend(FeedBackend):
+    """Scrapes div.news-item blocks from a news page."""
+
+    name = "html"
+    DATE_FORMAT = "%B %d, %Y"
+
+    def iter_stories(self, content: bytes) -> Iterator[Dict]:
+        if lxml is not None:
+            return self._iter_lxml(content)
+        return self._iter_soup(content)
+
+    def _iter_lxml(self, content: bytes) -> Iterator[Dict]:
+        document = lxml.html.fromstring(content)
+        for item in document.find_class('news-item'):
+            if item.tag != 'div':
+                continue
+            yield self._story(
+                title=item.find_class('news-title')[0].text_content(),
+                summary=item.find_class('news-summary')[0].text_content(),
+                link=item.find_class('news-link')[0].get('href'),
+                date_str=item.find_class('news-date')[0].text_content()
+            )
+
+    def _iter_soup(self, content: bytes) -> Iterator[Dict]:
+        soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer('div', class_='news-item'))
+        for item in soup.find_all('div', class_='news-item'):
+            yield self._story(
+                title=item.find('h3', class_='news-title').text,
+                summary=item.find('p', class_='news-summary').text,
+                link=item.find('a', class_='news-link')['href'],
+                date_str=item.find('span', class_='news-date').text
+            )
+
+    def _story(self, title: str, summary: str, link: str, date_str: str) -> Dict:
+        return {
+            'title': title.strip(),
+            'summary': summary.strip(),
+            'link': link,
+            # Parse the date (adjust the format as needed)
+            'published': datetime.strptime(date_str.strip(), self.DATE_FORMAT)
+        }
+
+BACKENDS = {backend.name: backend for backend in (XMLFeedBackend, HTMLFeedBackend)}
+
+def detect_backend(content: bytes) -> FeedBackend:
+    """
+    Pick a backend by sniffing the start of a document.
+
+    Args:
+        content (bytes): The fetched document.
+
+    Returns:
+        FeedBackend: XMLFeedBackend for RSS/Atom documents, HTMLFeedBackend otherwise.
+    """
+    head = content[:1024].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if b"<html" not in head and (head.startswith(b"<?xml") or b"<rss" in head or b"<feed" in head):
+        return XMLFeedBackend()
+    return HTMLFeedBackend()
+
+def get_backend(name: str, content: bytes) -> FeedBackend:
+    """
+    Resolve a backend by name.
+
+    Args:
+        name (str): 'auto', 'xml' or 'html'.
+        content (bytes): The fetched document, used when name is 'auto'.
+
+    Returns:
+        FeedBackend: The backend instance.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "auto":
+        return detect_backend(content)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown feed parser backend: {name}")
+    return BACKENDS[name]()
+
+def select_fresh_stories(stories: Iterator[Dict], num_stories: int, cutoff: datetime) -> List[Dict]:
+    """
+    Collect the first num_stories stories published after cutoff, then stop parsing.
+
+    Args:
+        stories (Iterator[Dict]): Lazily parsed stories in document order.
+        num_stories (int): The number of stories wanted.
+        cutoff (datetime): Stories published at or before this time are skipped.
+
+    Returns:
+        List[Dict]: Up to num_stories fresh stories.
+    """
+    selected = []
+    if num_stories <= 0:
+        return selected
+    for story in stories:
+        if story['published'] > cutoff:
+            selected.append(story)
+            if len(selected) >= num_stories:
+                break
+    return selected
@@ -0,0 +1,167 @@
+"""
+feed_fetcher.py
+
+This module provides the HTTP fetch layer for news feeds in the AI News Podcast Generation System.
+Requests go through a pooled session with timeouts and compression, use conditional GET
+(ETag / Last-Modified), and keep the last response body and its parsed stories on disk so an
+unchanged feed costs one small 304 round trip and no parsing.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class FeedFetcher:
+    """
+    Fetches feeds over a shared connection pool with an on-disk conditional-GET cache.
+
+    Attributes:
+        cache_dir (str): Directory holding one sub-directory per feed URL.
+        timeout (float): Connect and read timeout in seconds for each request.
+        session (requests.Session): The pooled HTTP session.
+    """
+
+    META_FILE = "meta.json"
+    BODY_FILE = "body"
+    PARSED_FILE = "parsed.json"
+
+    def __init__(self, cache_dir: str = None, timeout: float = None, pool_size: int = None,
+                 session: requests.Session = None):
+        """
+        Initialize the FeedFetcher.
+
+        Args:
+            cache_dir (str, optional): Cache directory. Defaults to Config.FEED_CACHE_DIR.
+            timeout (float, optional): Request timeout in seconds. Defaults to Config.FEED_REQUEST_TIMEOUT.
+            pool_size (int, optional): Connections kept per host. Defaults to Config.FEED_POOL_SIZE.
+            session (requests.Session, optional): Session to use instead of building a pooled one.
+        """
+        self.cache_dir = cache_dir or Config.FEED_CACHE_DIR
+        self.timeout = timeout or Config.FEED_REQUEST_TIMEOUT
+        self.session = session or self._build_session(pool_size or Config.FEED_POOL_SIZE)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate", "User-Agent": "Podcast-MoA-ToT feed fetcher"})
+        return session
+
+    def _feed_dir(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32])
+
+    def _read_json(self, path: str) -> Optional[Any]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, data: bytes):
+        # Write to a temporary file first so readers never see a partial cache entry
+        tmp_path = f"{path}.tmp.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def fetch(self, url: str) -> Tuple[bytes, bool]:
+        """
+        Fetch a feed, revalidating the cached copy with a conditional GET.
+
+        Args:
+            url (str): The feed URL.
+
+        Returns:
+            Tuple[bytes, bool]: The response body, and whether it changed since the
+                                cached copy (False when the server answered 304).
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+        """
+        feed_dir = self._feed_dir(url)
+        meta = self._read_json(os.path.join(feed_dir, self.META_FILE)) or {}
+        body_path = os.path.join(feed_dir, self.BODY_FILE)
+
+        headers = {}
+        if os.path.exists(body_path):
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            try:
+                with open(body_path, "rb") as f:
+                    logger.info(f"Feed {url} not modified, using cached copy")
+                    return f.read(), False
+            except OSError:
+                # The cached body vanished between the check and the read; refetch unconditionally
+                response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+
+        with self._lock:
+            os.makedirs(feed_dir, exist_ok=True)
+            self._write(body_path, response.content)
+            self._write(os.path.join(feed_dir, self.META_FILE), json.dumps({
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")
+            }).encode("utf-8"))
+            parsed_path = os.path.join(feed_dir, self.PARSED_FILE)
+            if os.path.exists(parsed_path):
+                os.remove(parsed_path)
+        return response.content, True
+
+    def load_parsed(self, url: str, key: str) -> Optional[Any]:
+        """
+        Return parsed data stored for the cached body of a feed.
+
+        Args:
+            url (str): The feed URL.
+            key (str): Identifies the parse settings the data was produced with.
+
+        Returns:
+            Optional[Any]: The stored data, or None if nothing is stored under key.
+        """
+        parsed = self._read_json(os.path.join(self._feed_dir(url), self.PARSED_FILE)) or {}
+        return parsed.get(key)
+
+    def store_parsed(self, url: str, key: str, data: Any):
+        """
+        Store parsed data for the cached body of a feed; it is dropped when the body changes.
+
+        Args:
+            url (str): The feed URL.
+            key (str): Identifies the parse settings the data was produced with.
+            data (Any): JSON-serializable parsed data.
+        """
+        path = os.path.join(self._feed_dir(url), self.PARSED_FILE)
+        with self._lock:
+            parsed = self._read_json(path) or {}
+            parsed[key] = data
+            self._write(path, json.dumps(parsed).encode("utf-8"))
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+def get_default_fetcher() -> FeedFetcher:
+    """Return the process-wide fetcher, so every feed shares one connection pool."""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = FeedFetcher()
+        return _default_fetcher
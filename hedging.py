@@ -0,0 +1,317 @@
+"""
+hedging.py
+
+This module provides hedged LLM requests for the AI News Podcast Generation System.
+Every API call site keeps a latency histogram. When a hedgeable call runs past the
+site's p95 latency, a duplicate request is sent and whichever answer arrives first is
+used, so one straggling worker does not hold up its whole layer. The number of
+duplicates is capped at a fraction of the calls made.
+"""
+
+import asyncio
+import bisect
+import concurrent.futures
+import contextvars
+import logging
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    """
+    Latency histogram with logarithmically spaced buckets.
+
+    Buckets grow by about 10% from 10ms up to 10 minutes, so quantiles are accurate to
+    roughly 10% in constant memory, however many calls are recorded.
+
+    Attributes:
+        count (int): Number of recorded latencies.
+        total (float): Sum of recorded latencies in seconds.
+    """
+
+    BOUNDS = tuple(0.01 * 1.1 ** i for i in range(int(math.log(60000) / math.log(1.1)) + 2))
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency quantile.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The upper bound of the bucket holding the quantile, or None without data.
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, math.ceil(q * self.count))
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank:
+                    return self.BOUNDS[min(index, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+class HedgingPolicy:
+    """
+    Per-call-site latency tracking and the budget for duplicate requests.
+
+    Attributes:
+        quantile (float): Latency quantile after which a call is hedged.
+        min_samples (int): Calls a site needs before its deadline is trusted.
+        budget_ratio (float): Largest share of hedgeable calls that may be duplicated.
+        histograms (Dict[str, LatencyHistogram]): Latencies per call site.
+    """
+
+    def __init__(self, quantile: float = None, min_samples: int = None, budget_ratio: float = None):
+        """
+        Initialize the HedgingPolicy.
+
+        Args:
+            quantile (float, optional): Defaults to Config.HEDGE_QUANTILE.
+            min_samples (int, optional): Defaults to Config.HEDGE_MIN_SAMPLES.
+            budget_ratio (float, optional): Defaults to Config.HEDGE_BUDGET_RATIO.
+        """
+        self.quantile = Config.HEDGE_QUANTILE if quantile is None else quantile
+        self.min_samples = Config.HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self.budget_ratio = Config.HEDGE_BUDGET_RATIO if budget_ratio is None else budget_ratio
+        self.histograms = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def histogram(self, call_site: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self.histograms.get(call_site)
+            if histogram is None:
+                histogram = self.histograms[call_site] = LatencyHistogram()
+            return histogram
+
+    def record(self, call_site: str, seconds: float):
+        self.histogram(call_site).record(seconds)
+
+    def deadline(self, call_site: str) -> Optional[float]:
+        """Seconds after which a call at this site is hedged, or None while the site has too few samples."""
+        histogram = self.histogram(call_site)
+        if histogram.count < self.min_samples:
+            return None
+        return histogram.quantile(self.quantile)
+
+    def start_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_hedge(self) -> bool:
+        """Reserve one duplicate request if the budget allows it."""
+        with self._lock:
+            if self.hedges + 1 > self.budget_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> Dict:
+        """
+        Report latencies and hedging activity.
+
+        Returns:
+            Dict: 'calls', 'hedges' and 'hedge_wins', plus per-site 'count', 'mean', 'p50', 'p95' and 'p99' under 'sites'.
+        """
+        with self._lock:
+            histograms = dict(self.histograms)
+            summary = {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+        summary["sites"] = {
+            call_site: {
+                "count": histogram.count,
+                "mean": histogram.total / histogram.count if histogram.count else None,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99)
+            }
+            for call_site, histogram in sorted(histograms.items())
+        }
+        return summary
+
+_hedging_policy = None
+_hedging_policy_lock = threading.Lock()
+
+def get_hedging_policy() -> HedgingPolicy:
+    """Return the process-wide hedging policy, creating it from Config on first use."""
+    global _hedging_policy
+    with _hedging_policy_lock:
+        if _hedging_policy is None:
+            _hedging_policy = HedgingPolicy()
+        return _hedging_policy
+
+def _timed(policy: HedgingPolicy, call_site: str, func: Callable, *args) -> Any:
+    start = time.monotonic()
+    result = func(*args)
+    policy.record(call_site, time.monotonic() - start)
+    return result
+
+def _start_attempt(policy: HedgingPolicy, call_site: str, func: Callable, args: tuple,
+                   prepare: Optional[Callable[[], Any]] = None) -> concurrent.futures.Future:
+    """
+    Run one attempt of a hedged call on its own thread.
+
+    The attempt's clock starts after prepare() returns, so waiting for a rate limit budget
+    is not counted as latency.
+    """
+    future = concurrent.futures.Future()
+
+    def attempt():
+        try:
+            if prepare is not None:
+                prepare()
+            future.set_result(_timed(policy, call_site, func, *args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=contextvars.copy_context().run, args=(attempt,), name="hedged-call", daemon=True).start()
+    return future
+
+async def _timed_async(policy: HedgingPolicy, call_site: str, func: Callable[..., Awaitable], *args,
+                       prepare: Optional[Callable[[], Awaitable]] = None) -> Any:
+    if prepare is not None:
+        await prepare()
+    start = time.monotonic()
+    result = await func(*args)
+    policy.record(call_site, time.monotonic() - start)
+    return result
+
+def hedged_call(call_site: Optional[str], hedge: bool, func: Callable, *args,
+                prepare: Optional[Callable[[], Any]] = None) -> Any:
+    """
+    Run func(*args), recording its latency and hedging it if it runs past the site's deadline.
+
+    func should be the request itself: the caller waits for its rate limit budget first,
+    so only the round trip is timed and the deadline starts when the request does. The
+    duplicate runs alongside the original; the first successful result wins and the
+    other request is left to finish in the background. If one attempt fails, the other
+    one's outcome is used.
+
+    Args:
+        call_site (Optional[str]): Name of the call site; None disables tracking and hedging.
+        hedge (bool): Whether this call may be duplicated.
+        func (Callable): The call to make.
+        *args: Arguments for func.
+        prepare (Optional[Callable[[], Any]]): Run before the duplicate is sent, e.g. to wait for its
+            own rate limit budget; not counted in its latency.
+
+    Returns:
+        Any: The result of the first attempt to succeed.
+
+    Raises:
+        Exception: The error of the last attempt if every attempt failed.
+    """
+    if call_site is None:
+        return func(*args)
+    policy = get_hedging_policy()
+    deadline = policy.deadline(call_site) if hedge and Config.HEDGING_ENABLED else None
+    if deadline is None:
+        return _timed(policy, call_site, func, *args)
+
+    policy.start_call()
+    primary = _start_attempt(policy, call_site, func, args)
+    try:
+        return primary.result(timeout=deadline)
+    except concurrent.futures.TimeoutError:
+        pass
+    if not policy.try_hedge():
+        return primary.result()
+
+    logger.info(f"Hedging {call_site} call after {deadline:.2f}s")
+    backup = _start_attempt(policy, call_site, func, args, prepare)
+    pending = {primary, backup}
+    while True:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is backup:
+                    policy.record_hedge_win()
+                return future.result()
+        if not pending:
+            return next(iter(done)).result()
+
+async def hedged_call_async(call_site: Optional[str], hedge: bool, func: Callable[..., Awaitable], *args,
+                            prepare: Optional[Callable[[], Awaitable]] = None) -> Any:
+    """
+    Asynchronous counterpart of hedged_call; the losing attempt is cancelled.
+
+    Args:
+        call_site (Optional[str]): Name of the call site; None disables tracking and hedging.
+        hedge (bool): Whether this call may be duplicated.
+        func (Callable[..., Awaitable]): The coroutine function to call.
+        *args: Arguments for func.
+        prepare (Optional[Callable[[], Awaitable]]): Awaited before the duplicate is sent; not counted in its latency.
+
+    Returns:
+        Any: The result of the first attempt to succeed.
+
+    Raises:
+        Exception: The error of the last attempt if every attempt failed.
+    """
+    if call_site is None:
+        return await func(*args)
+    policy = get_hedging_policy()
+    deadline = policy.deadline(call_site) if hedge and Config.HEDGING_ENABLED else None
+    if deadline is None:
+        return await _timed_async(policy, call_site, func, *args)
+
+    policy.start_call()
+    primary = asyncio.ensure_future(_timed_async(policy, call_site, func, *args))
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=deadline)
+        if done or not policy.try_hedge():
+            return await primary
+
+        logger.info(f"Hedging {call_site} call after {deadline:.2f}s")
+        backup = asyncio.ensure_future(_timed_async(policy, call_site, func, *args, prepare=prepare))
+        pending.add(backup)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        policy.record_hedge_win()
+                    return task.result()
+            if not pending:
+                return next(iter(done)).result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+def format_latency_report(stats: Dict) -> str:
+    """Render HedgingPolicy.stats() as a per-call-site latency table."""
+    def seconds(value):
+        return f"{value:.2f}" if value is not None else "-"
+
+    lines = [f"{'Call site':<24} {'Calls':>6} {'Mean s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}"]
+    for call_site, site in stats["sites"].items():
+        lines.append(
+            f"{call_site:<24} {site['count']:>6} {seconds(site['mean']):>7} {seconds(site['p50']):>7} "
+            f"{seconds(site['p95']):>7} {seconds(site['p99']):>7}"
+        )
+    lines.append(f"Hedged {stats['hedges']} of {stats['calls']} eligible calls, {stats['hedge_wins']} won by the duplicate")
+    return "\n".join(lines)
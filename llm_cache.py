@@ -0,0 +1,148 @@
+"""
+llm_cache.py
+
+This module provides a persistent, content-addressed cache for LLM responses
+in the AI News Podcast Generation System. Responses are stored in SQLite and
+keyed on a hash of the full request, so identical prompts across agents, runs
+and crash re-runs are answered from disk instead of the API.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    A disk-backed LLM response cache with TTL and LRU eviction.
+
+    The cache is safe to share between threads; every operation is serialized
+    on a single SQLite connection.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+        ttl_seconds (Optional[float]): Age after which an entry is treated as a miss.
+        max_entries (Optional[int]): Number of entries kept before least recently used ones are evicted.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups not found (or expired) in the cache.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            path (str): Location of the SQLite database file. Parent directories are created.
+            ttl_seconds (float, optional): Entry lifetime in seconds. Defaults to no expiry.
+            max_entries (int, optional): Maximum number of stored entries. Defaults to unbounded.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_accessed ON responses (last_accessed)")
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """
+        Build a content-addressed key for a request.
+
+        Args:
+            **request: The request fields (model, system, messages, max_tokens, temperature, ...).
+
+        Returns:
+            str: A SHA-256 hex digest of the canonical JSON encoding of the request.
+        """
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): The request key from make_key.
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """
+        Store a response, evicting least recently used entries beyond max_entries.
+
+        Args:
+            key (str): The request key from make_key.
+            value (str): The response text.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def stats(self) -> Dict:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            Dict: 'hits', 'misses', 'hit_rate' and the current number of 'entries'.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries
+            }
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
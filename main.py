@@ -1,7 +1,16 @@
 import os
 import csv
+import argparse
+import asyncio
 from datetime import datetime
+from typing import AsyncIterable, Iterable
 from moa_framework import MoAFramework
+from checkpoint import RunCheckpoint
+from batch import load_episodes, run_batch, format_report
+from hedging import format_latency_report, get_hedging_policy
+from model_router import format_route_report, get_model_router
+from task_queue import TaskDispatcher, open_task_queue
+from tracing import configure_tracing, format_trace_summary, get_tracer
 from config import Config
 import logging
 
@@ -12,13 +21,36 @@ def ensure_output_directory():
     if not os.path.exists(Config.OUTPUT_DIR):
         os.makedirs(Config.OUTPUT_DIR)
 
-def save_markdown(content: str):
+def markdown_filename(episode_name: str = None):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{Config.OUTPUT_DIR}/podcast_script_{timestamp}.md"
+    prefix = f"podcast_script_{episode_name}" if episode_name else "podcast_script"
+    return f"{Config.OUTPUT_DIR}/{prefix}_{timestamp}.md"
+
+def save_markdown(content: str, episode_name: str = None):
+    filename = markdown_filename(episode_name)
     with open(filename, "w") as f:
         f.write(content)
     return filename
 
+def save_markdown_stream(chunks: Iterable[str], episode_name: str = None):
+    # Flush every chunk so readers tailing the file see the script as it is written
+    filename = markdown_filename(episode_name)
+    logger.info(f"Streaming podcast script to {filename}")
+    with open(filename, "w") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+    return filename
+
+async def save_markdown_stream_async(chunks: AsyncIterable[str], episode_name: str = None):
+    filename = markdown_filename(episode_name)
+    logger.info(f"Streaming podcast script to {filename}")
+    with open(filename, "w") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+    return filename
+
 def update_csv(md_filename: str):
     csv_filename = f"{Config.OUTPUT_DIR}/podcast_scripts.csv"
     file_exists = os.path.isfile(csv_filename)
@@ -35,22 +67,98 @@ def update_csv(md_filename: str):
             "Markdown_Filename": os.path.basename(md_filename)
         })
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate an AI news podcast script.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run the pipeline on the asyncio execution mode")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a failed run, skipping the stages it already completed")
+    parser.add_argument("--batch", metavar="EPISODES_JSON",
+                        help="Generate many episodes concurrently from a JSON list of {name, rss_feed_url}")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Process stories one at a time and reuse the stored analysis of stories seen in earlier runs")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write the final script to the output file while the Chief Editor is generating it")
+    parser.add_argument("--pipeline-mode", choices=("concatenated", "map_reduce"),
+                        help="Override Config.PIPELINE_MODE")
+    parser.add_argument("--distributed", action="store_true",
+                        help="Run worker agents and Tree of Thought expansions on task_worker.py nodes via Config.TASK_QUEUE_URL")
+    return parser.parse_args(argv)
+
+def start_tracing(name: str):
+    if Config.TRACE_ENABLED:
+        trace_path = os.path.join(Config.TRACES_DIR, f"{name}.jsonl")
+        configure_tracing(trace_path)
+        logger.info(f"Writing spans to {trace_path}")
+
+def log_trace_summary():
+    logger.info(f"Trace summary:\n{format_trace_summary(get_tracer().summary.as_dict())}")
+
+def save_episode(result: dict):
+    if result["status"] != "ok":
+        logger.error(f"Episode {result['name']} failed; continue it with --resume {result['run_id']}")
+        return
+    md_filename = save_markdown(result["script"], result["name"])
+    update_csv(md_filename)
+    logger.info(f"Episode {result['name']} saved as {md_filename}")
+
+def main_batch(episodes_path: str):
+    episodes = load_episodes(episodes_path)
+    logger.info(f"Generating {len(episodes)} episodes...")
+    start_tracing(f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    batch_result = asyncio.run(run_batch(episodes, Config.TAVILY_API_KEY, on_episode_complete=save_episode))
+    logger.info(f"Batch throughput report:\n{format_report(batch_result)}")
+    log_trace_summary()
+
+def main(argv=None):
+    args = parse_args(argv)
     try:
         Config.validate()
         ensure_output_directory()
+
+        if args.batch:
+            main_batch(args.batch)
+            return
         
-        moa = MoAFramework(Config.RSS_FEED_URL, Config.TAVILY_API_KEY)
+        moa = MoAFramework(Config.RSS_FEED_URLS, Config.TAVILY_API_KEY, incremental=args.incremental or None,
+                           pipeline_mode=args.pipeline_mode)
+
+        if args.resume:
+            checkpoint = RunCheckpoint.load(Config.RUNS_DIR, args.resume)
+            logger.info(f"Resuming run {checkpoint.run_id} (completed stages: {', '.join(checkpoint.manifest['completed_stages']) or 'none'})")
+        else:
+            checkpoint = RunCheckpoint.create(Config.RUNS_DIR)
+            logger.info(f"Starting run {checkpoint.run_id}")
+        start_tracing(checkpoint.run_id)
+        if args.distributed:
+            # Task IDs are scoped to the run, so a resumed run reuses the results of its finished tasks
+            moa.task_dispatcher = TaskDispatcher(open_task_queue(), namespace=checkpoint.run_id)
+            logger.info(f"Distributing agent work through {Config.TASK_QUEUE_URL}")
         
         logger.info("Generating podcast script...")
-        podcast_script = moa.generate_podcast_script()
+        try:
+            if args.stream and args.use_async:
+                md_filename = asyncio.run(save_markdown_stream_async(moa.generate_podcast_script_stream_async(checkpoint)))
+            elif args.stream:
+                md_filename = save_markdown_stream(moa.generate_podcast_script_stream(checkpoint))
+            elif args.use_async:
+                podcast_script = asyncio.run(moa.generate_podcast_script_async(checkpoint))
+            else:
+                podcast_script = moa.generate_podcast_script(checkpoint)
+        except Exception:
+            logger.error(f"Run {checkpoint.run_id} failed; continue it with --resume {checkpoint.run_id}")
+            raise
         
         logger.info("Saving output files...")
-        md_filename = save_markdown(podcast_script)
+        if not args.stream:
+            md_filename = save_markdown(podcast_script)
         update_csv(md_filename)
         
         logger.info(f"Podcast script generated and saved as {md_filename}")
         logger.info(f"CSV file updated with new entry")
+        logger.info(f"API latency report:\n{format_latency_report(get_hedging_policy().stats())}")
+        logger.info(f"Model route report:\n{format_route_report(get_model_router().stats())}")
+        log_trace_summary()
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
 
@@ -5,15 +5,82 @@ This module implements the Mix of Agents (MoA) framework for the AI News Podcast
 It coordinates the different types of agents and manages the overall workflow of generating a podcast script.
 """
 
-from typing import List, Dict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from functools import partial
+from typing import List, Dict, Callable, Any, AsyncIterator, Iterator, Optional, Sequence, Tuple, Union
 from rss_feed_parser import RSSFeedParser
+from story_ingest import FeedIngestor
+from story_store import StoryStore, get_story_store
+from checkpoint import RunCheckpoint
+from research import ResearchRun, get_research_stage, with_research
 from specific_agent_classes import ChiefEditorAgent, ManagerAgent, WorkerAgent
+from task_queue import TASK_PROCESS, TaskDispatcher, use_task_dispatcher
 from config import Config
+from dataflow import run_pipeline, run_pipeline_async
+from tracing import span
+from transposition import TranspositionTable, use_transposition_table
+from tokenizer import chunk_text, count_tokens_batch
+import asyncio
 import concurrent.futures
+import contextvars
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+PIPELINE_MODES = ("concatenated", "map_reduce")
+# Layers that run per story in incremental and map-reduce modes
+STORY_LAYERS = ("news_editor", "journalist")
+# The layer whose input gets each story's research notes
+RESEARCH_LAYER = "journalist"
+
+class LazyAgentMap(MutableMapping):
+    """
+    Agents by type, each built by its factory the first time it is looked up.
+
+    Layers that a run never reaches never construct their agents. Entries can still be
+    assigned and deleted like a dict.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = dict(factories)
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, agent_type: str) -> Any:
+        with self._lock:
+            if agent_type not in self._agents:
+                self._agents[agent_type] = self._factories[agent_type]()
+            return self._agents[agent_type]
+
+    def __setitem__(self, agent_type: str, agents: Any):
+        with self._lock:
+            self._factories[agent_type] = lambda: agents
+            self._agents[agent_type] = agents
+
+    def __delitem__(self, agent_type: str):
+        with self._lock:
+            del self._factories[agent_type]
+            self._agents.pop(agent_type, None)
+
+    def __contains__(self, agent_type: object) -> bool:
+        return agent_type in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._factories))
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def built(self) -> List[str]:
+        """Return the agent types whose agents have been constructed."""
+        with self._lock:
+            return list(self._agents)
+
+def _build_workers(worker_class: Callable, agent_type: str, tavily_api_key: str) -> List[WorkerAgent]:
+    return [worker_class(f"{agent_type}_Worker_{i}", tavily_api_key) for i in range(1, Config.MAX_WORKERS + 1)]
+
 class MoAFramework:
     """
     Mix of Agents (MoA) Framework for generating AI news podcast scripts.
@@ -22,32 +89,68 @@ class MoAFramework:
     and manages the overall workflow of generating a podcast script from RSS feed input.
 
     Attributes:
-        rss_parser (RSSFeedParser): Parser for retrieving top stories from an RSS feed.
-        chief_editor (ChiefEditorAgent): The Chief Editor agent for final script review.
-        manager_agents (Dict[str, ManagerAgent]): Dictionary of Manager agents for different roles.
-        worker_agents (Dict[str, List[WorkerAgent]]): Dictionary of lists of Worker agents for each role.
+        ingestor (FeedIngestor): Fetches and deduplicates the top stories across all feeds.
+        chief_editor (ChiefEditorAgent): The Chief Editor agent for final script review, built on first use.
+        manager_agents (Dict[str, ManagerAgent]): Manager agents for different roles, built on first use.
+        worker_agents (Dict[str, List[WorkerAgent]]): Lists of Worker agents for each role, built on first use.
+        story_store (Optional[StoryStore]): Per-story outputs of earlier runs; set in incremental mode only.
+        pipeline_mode (str): 'concatenated' or 'map_reduce'.
+        tavily_api_key (str): API key for the research stage's searches.
+        task_dispatcher (Optional[TaskDispatcher]): When set, worker agents and manager Tree of
+            Thought expansions run as tasks on the task queue instead of in this process.
     """
 
-    def __init__(self, rss_feed_url: str, tavily_api_key: str):
+    def __init__(self, rss_feed_url: Union[str, Sequence[str]], tavily_api_key: str, incremental: bool = None,
+                 pipeline_mode: str = None, task_dispatcher: Optional[TaskDispatcher] = None):
         """
         Initialize the MoAFramework.
 
         Args:
-            rss_feed_url (str): URL of the RSS feed to parse for news stories.
+            rss_feed_url (Union[str, Sequence[str]]): URL, or list of URLs, of the feeds to parse for news stories.
             tavily_api_key (str): API key for Tavily internet search service.
+            incremental (bool, optional): Process stories one at a time through the News Editor and
+                Journalist layers, reusing the stored outputs of stories seen before.
+                Defaults to Config.INCREMENTAL_STORIES.
+            pipeline_mode (str, optional): 'concatenated' runs each layer once over all stories;
+                'map_reduce' runs the News Editor and Journalist layers per story in parallel and
+                has their managers reduce the results in token-bounded groups.
+                Defaults to Config.PIPELINE_MODE.
+            task_dispatcher (Optional[TaskDispatcher]): Runs agents on task worker nodes (distributed mode).
+
+        Raises:
+            ValueError: If the pipeline mode is not recognized.
         """
-        self.rss_parser = RSSFeedParser(rss_feed_url)
-        self.chief_editor = ChiefEditorAgent("Chief Editor", tavily_api_key)
-        self.manager_agents = {
-            "news_editor": ManagerAgent("News Editor", "News Editor", tavily_api_key),
-            "journalist": ManagerAgent("Journalist", "Journalist", tavily_api_key),
-            "script_writer": ManagerAgent("Script Writer", "Script Writer", tavily_api_key)
-        }
-        self.worker_agents = {
-            "news_editor": [WorkerAgent(f"news_editor_Worker_{i}", tavily_api_key) for i in range(1, Config.MAX_WORKERS + 1)],
-            "journalist": [WorkerAgent(f"journalist_Worker_{i}", tavily_api_key) for i in range(1, Config.MAX_WORKERS + 1)],
-            "script_writer": [WorkerAgent(f"script_writer_Worker_{i}", tavily_api_key) for i in range(1, Config.MAX_WORKERS + 1)]
-        }
+        self.pipeline_mode = pipeline_mode or Config.PIPELINE_MODE
+        if self.pipeline_mode not in PIPELINE_MODES:
+            raise ValueError(f"Unknown pipeline mode: {self.pipeline_mode}")
+        self.tavily_api_key = tavily_api_key
+        feed_urls = [rss_feed_url] if isinstance(rss_feed_url, str) else list(rss_feed_url)
+        self.ingestor = FeedIngestor(feed_urls, parser_factory=RSSFeedParser)
+        # Agents are built on first use; the factories bind the agent classes now
+        self._chief_editor_factory = partial(ChiefEditorAgent, "Chief Editor", tavily_api_key)
+        self._chief_editor = None
+        self.manager_agents = LazyAgentMap({
+            "news_editor": partial(ManagerAgent, "News Editor", "News Editor", tavily_api_key),
+            "journalist": partial(ManagerAgent, "Journalist", "Journalist", tavily_api_key),
+            "script_writer": partial(ManagerAgent, "Script Writer", "Script Writer", tavily_api_key)
+        })
+        self.worker_agents = LazyAgentMap({
+            agent_type: partial(_build_workers, WorkerAgent, agent_type, tavily_api_key)
+            for agent_type in ("news_editor", "journalist", "script_writer")
+        })
+        incremental = Config.INCREMENTAL_STORIES if incremental is None else incremental
+        self.story_store: Optional[StoryStore] = get_story_store() if incremental else None
+        self.task_dispatcher = task_dispatcher
+
+    @property
+    def chief_editor(self) -> ChiefEditorAgent:
+        if self._chief_editor is None:
+            self._chief_editor = self._chief_editor_factory()
+        return self._chief_editor
+
+    @chief_editor.setter
+    def chief_editor(self, agent: ChiefEditorAgent):
+        self._chief_editor = agent
 
     def process_worker_layer(self, agent_type: str, input: str) -> str:
         """
@@ -68,9 +171,28 @@ class MoAFramework:
         if agent_type not in self.manager_agents:
             raise ValueError(f"Unknown manager agent type: {agent_type}")
 
+        workers = self.worker_agents[agent_type]
+        with span(f"layer.{agent_type}", workers=len(workers)) as layer_span:
+            quorum = self._worker_quorum(len(workers))
+            if self.task_dispatcher is not None:
+                worker_outputs = self._dispatch_workers(workers, input, quorum)
+            else:
+                worker_outputs = self._run_workers(workers, input, quorum)
+            self._log_quorum(agent_type, len(worker_outputs), len(workers))
+            layer_span.set(worker_outputs=len(worker_outputs))
+
+            return self.manager_agents[agent_type].process("\n\n".join(worker_outputs))
+
+    def _run_workers(self, workers: List[WorkerAgent], input: str, quorum: int) -> List[str]:
+        """Run the workers on a thread pool; returns the first quorum outputs in completion order."""
         worker_outputs = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS) as executor:
-            future_to_worker = {executor.submit(worker.process, input): worker for worker in self.worker_agents[agent_type]}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS)
+        try:
+            # Each worker runs in a copy of the caller's context so usage tracking and tracing follow it into the pool
+            future_to_worker = {
+                executor.submit(contextvars.copy_context().run, worker.process, input): worker
+                for worker in workers
+            }
             for future in concurrent.futures.as_completed(future_to_worker):
                 worker = future_to_worker[future]
                 try:
@@ -78,20 +200,476 @@ class MoAFramework:
                     worker_outputs.append(result)
                 except Exception as e:
                     logger.error(f"Worker {worker.name} generated an exception: {str(e)}")
-        
-        return self.manager_agents[agent_type].process("\n\n".join(worker_outputs))
+                if len(worker_outputs) >= quorum:
+                    break
+        finally:
+            # Stragglers beyond the quorum finish in the background; their outputs are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+        return worker_outputs
+
+    def _submit_workers(self, workers: List[WorkerAgent], input: str) -> Dict[str, WorkerAgent]:
+        return {
+            self.task_dispatcher.submit(TASK_PROCESS, {"agent": worker.task_spec(), "input": input}): worker
+            for worker in workers
+        }
+
+    def _dispatch_workers(self, workers: List[WorkerAgent], input: str, quorum: int) -> List[str]:
+        """Run the workers as tasks on the queue; returns the first quorum outputs in completion order."""
+        task_to_worker = self._submit_workers(workers, input)
+        worker_outputs = []
+        for task in self.task_dispatcher.as_completed(list(task_to_worker)):
+            try:
+                worker_outputs.append(task.output())
+            except Exception as e:
+                logger.error(f"Worker {task_to_worker[task.task_id].name} generated an exception: {str(e)}")
+            if len(worker_outputs) >= quorum:
+                break
+        return worker_outputs
+
+    async def _dispatch_workers_async(self, workers: List[WorkerAgent], input: str, quorum: int) -> List[str]:
+        task_to_worker = await asyncio.to_thread(self._submit_workers, workers, input)
+        worker_outputs = []
+        async for task in self.task_dispatcher.as_completed_async(list(task_to_worker)):
+            try:
+                worker_outputs.append(task.output())
+            except Exception as e:
+                logger.error(f"Worker {task_to_worker[task.task_id].name} generated an exception: {str(e)}")
+            if len(worker_outputs) >= quorum:
+                break
+        return worker_outputs
+
+    async def process_worker_layer_async(self, agent_type: str, input: str) -> str:
+        """
+        Process input through a layer of worker agents on the asyncio event loop.
+
+        All workers run concurrently; their LLM calls are bounded only by the
+        process-wide async request limit rather than by a per-layer thread pool.
+
+        Args:
+            agent_type (str): The type of worker agents to use.
+            input (str): The input to process.
+
+        Returns:
+            str: The processed output from the worker layer.
+
+        Raises:
+            ValueError: If the agent_type is not recognized.
+        """
+        if agent_type not in self.worker_agents:
+            raise ValueError(f"Unknown worker agent type: {agent_type}")
+        if agent_type not in self.manager_agents:
+            raise ValueError(f"Unknown manager agent type: {agent_type}")
+
+        workers = self.worker_agents[agent_type]
+        with span(f"layer.{agent_type}", workers=len(workers)) as layer_span:
+            quorum = self._worker_quorum(len(workers))
+            if self.task_dispatcher is not None:
+                worker_outputs = await self._dispatch_workers_async(workers, input, quorum)
+            else:
+                worker_outputs = await self._run_workers_async(workers, input, quorum)
+            self._log_quorum(agent_type, len(worker_outputs), len(workers))
+            layer_span.set(worker_outputs=len(worker_outputs))
+
+            return await self.manager_agents[agent_type].process_async("\n\n".join(worker_outputs))
+
+    async def _run_workers_async(self, workers: List[WorkerAgent], input: str, quorum: int) -> List[str]:
+        task_to_worker = {asyncio.ensure_future(worker.process_async(input)): worker for worker in workers}
+        pending = set(task_to_worker)
+        worker_outputs = []
+        try:
+            while pending and len(worker_outputs) < quorum:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Keep worker order among tasks that finish together
+                for task in sorted(done, key=list(task_to_worker).index):
+                    if task.cancelled():
+                        logger.error(f"Worker {task_to_worker[task].name} was cancelled")
+                    elif task.exception() is not None:
+                        logger.error(f"Worker {task_to_worker[task].name} generated an exception: {str(task.exception())}")
+                    elif len(worker_outputs) < quorum:
+                        worker_outputs.append(task.result())
+        finally:
+            for task in pending:
+                task.cancel()
+        return worker_outputs
+
+    def _worker_quorum(self, num_workers: int) -> int:
+        quorum = Config.WORKER_QUORUM
+        return min(quorum, num_workers) if quorum else num_workers
+
+    def _log_quorum(self, agent_type: str, received: int, num_workers: int):
+        if received < num_workers:
+            logger.info(f"Layer {agent_type}: manager proceeding with {received} of {num_workers} worker outputs")
+
+    def _stored_output(self, story: Dict, agent_type: str) -> Optional[str]:
+        if self.story_store is None:
+            return None
+        output = self.story_store.get(story, agent_type)
+        if output is not None:
+            logger.debug(f"Layer {agent_type}: reusing stored output for '{story['title']}'")
+        return output
+
+    def _store_output(self, story: Dict, agent_type: str, output: str):
+        if self.story_store is not None:
+            self.story_store.put(story, agent_type, output)
+
+    def process_story_layers(self, agent_types: Sequence[str], stories: List[Dict],
+                             research: Optional[ResearchRun] = None) -> Dict[str, List[str]]:
+        """
+        Process every story separately through a chain of worker layers.
+
+        Layers are connected by bounded queues of Config.STORY_QUEUE_SIZE stories, and each
+        layer works on up to Config.MAX_PARALLEL_STORIES stories at once, so a story moves
+        to the next layer as soon as its own output is ready. With a story store, stored
+        outputs are reused and new ones are stored for later runs.
+
+        Args:
+            agent_types (Sequence[str]): The layers, in order.
+            stories (List[Dict]): The stories.
+            research (Optional[ResearchRun]): When given, each story's research notes are added
+                to its input of the RESEARCH_LAYER layer.
+
+        Returns:
+            Dict[str, List[str]]: The per-story outputs of each layer, in story order.
+        """
+        def stage(agent_type):
+            def process(index, story_input):
+                output = self._stored_output(stories[index], agent_type)
+                if output is None:
+                    if research is not None and agent_type == RESEARCH_LAYER:
+                        story_input = with_research(story_input, research.notes(index))
+                    output = self.process_worker_layer(agent_type, story_input)
+                    self._store_output(stories[index], agent_type, output)
+                return output
+            return agent_type, process, Config.MAX_PARALLEL_STORIES
+
+        results = run_pipeline(
+            [self._format_stories([story]) for story in stories],
+            [stage(agent_type) for agent_type in agent_types],
+            Config.STORY_QUEUE_SIZE
+        )
+        return dict(zip(agent_types, results))
+
+    async def process_story_layers_async(self, agent_types: Sequence[str], stories: List[Dict],
+                                         research: Optional[ResearchRun] = None) -> Dict[str, List[str]]:
+        """
+        Asynchronous counterpart of process_story_layers.
+
+        Args:
+            agent_types (Sequence[str]): The layers, in order.
+            stories (List[Dict]): The stories.
+            research (Optional[ResearchRun]): Research notes for the RESEARCH_LAYER layer, if any.
+
+        Returns:
+            Dict[str, List[str]]: The per-story outputs of each layer, in story order.
+        """
+        def stage(agent_type):
+            async def process(index, story_input):
+                output = self._stored_output(stories[index], agent_type)
+                if output is None:
+                    if research is not None and agent_type == RESEARCH_LAYER:
+                        story_input = with_research(story_input, await research.notes_async(index))
+                    output = await self.process_worker_layer_async(agent_type, story_input)
+                    self._store_output(stories[index], agent_type, output)
+                return output
+            return agent_type, process, Config.MAX_PARALLEL_STORIES
+
+        results = await run_pipeline_async(
+            [self._format_stories([story]) for story in stories],
+            [stage(agent_type) for agent_type in agent_types],
+            Config.STORY_QUEUE_SIZE
+        )
+        return dict(zip(agent_types, results))
+
+    def _group_by_tokens(self, outputs: List[str]) -> List[List[str]]:
+        """Pack outputs in order into groups of at most Config.REDUCE_MAX_INPUT_TOKENS tokens, splitting oversized ones."""
+        budget = Config.REDUCE_MAX_INPUT_TOKENS
+        groups = []
+        group_tokens = 0
+        for output, tokens in zip(outputs, count_tokens_batch(outputs)):
+            pieces = [(output, tokens)] if tokens <= budget else [(chunk, budget) for chunk in chunk_text(output, max_tokens=budget)]
+            for piece, piece_tokens in pieces:
+                if not groups or group_tokens + piece_tokens > budget:
+                    groups.append([])
+                    group_tokens = 0
+                groups[-1].append(piece)
+                group_tokens += piece_tokens
+        return groups
+
+    def reduce_outputs(self, agent_type: str, outputs: List[str]) -> str:
+        """
+        Merge per-story outputs into one text that fits the manager's input budget.
+
+        Outputs are packed into groups of at most Config.REDUCE_MAX_INPUT_TOKENS tokens. While
+        more than one group is needed, the layer's manager condenses every group in parallel
+        and the condensed texts are grouped again, up to Config.REDUCE_MAX_LEVELS times.
+
+        Args:
+            agent_type (str): The layer whose manager condenses the groups.
+            outputs (List[str]): The per-story outputs, in story order.
+
+        Returns:
+            str: The merged output.
+        """
+        manager = self.manager_agents[agent_type]
+        groups = self._group_by_tokens(outputs)
+        level = 0
+        while len(groups) > 1 and level < Config.REDUCE_MAX_LEVELS:
+            level += 1
+            logger.info(f"Layer {agent_type}: reducing {len(outputs)} outputs in {len(groups)} groups (level {level})")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(groups), Config.MAX_PARALLEL_STORIES)) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, manager.process, "\n\n".join(group))
+                    for group in groups
+                ]
+                outputs = [future.result() for future in futures]
+            groups = self._group_by_tokens(outputs)
+        return self._finish_reduce(agent_type, groups)
 
-    def generate_podcast_script(self) -> str:
+    async def reduce_outputs_async(self, agent_type: str, outputs: List[str]) -> str:
+        """
+        Asynchronous counterpart of reduce_outputs.
+
+        Args:
+            agent_type (str): The layer whose manager condenses the groups.
+            outputs (List[str]): The per-story outputs, in story order.
+
+        Returns:
+            str: The merged output.
+        """
+        manager = self.manager_agents[agent_type]
+        groups = self._group_by_tokens(outputs)
+        level = 0
+        while len(groups) > 1 and level < Config.REDUCE_MAX_LEVELS:
+            level += 1
+            logger.info(f"Layer {agent_type}: reducing {len(outputs)} outputs in {len(groups)} groups (level {level})")
+            outputs = list(await asyncio.gather(*(manager.process_async("\n\n".join(group)) for group in groups)))
+            groups = self._group_by_tokens(outputs)
+        return self._finish_reduce(agent_type, groups)
+
+    def _finish_reduce(self, agent_type: str, groups: List[List[str]]) -> str:
+        if len(groups) > 1:
+            logger.warning(f"Layer {agent_type}: output still spans {len(groups)} groups after {Config.REDUCE_MAX_LEVELS} reduce levels")
+        return "\n\n".join(piece for group in groups for piece in group)
+
+    def _format_stories(self, top_stories: List[Dict]) -> str:
+        return "\n\n".join([f"Title: {story['title']}\nSummary: {story['summary']}" for story in top_stories])
+
+    def _fetch_stories(self) -> List[Dict]:
+        return self.ingestor.get_top_stories(num_stories=Config.NUM_STORIES, days=Config.DAYS_LOOKBACK)
+
+    def _fetch_and_record_stories(self, checkpoint: Optional[RunCheckpoint]) -> List[Dict]:
+        top_stories = self._fetch_stories()
+        if checkpoint is not None:
+            checkpoint.record_input(top_stories)
+        return top_stories
+
+    def _start_research(self, checkpoint: Optional[RunCheckpoint], top_stories: List[Dict]) -> Optional[ResearchRun]:
+        """
+        Start the research stage in the background, so its searches overlap the News Editor layer.
+
+        Args:
+            checkpoint (Optional[RunCheckpoint]): Checkpoint of the current run, if any.
+            top_stories (List[Dict]): The stories to research.
+
+        Returns:
+            Optional[ResearchRun]: The running research, or None when research is disabled or
+                the stages that need it are already checkpointed.
+        """
+        if not Config.RESEARCH_ENABLED or not top_stories:
+            return None
+        if checkpoint is not None:
+            if checkpoint.has_stage(RESEARCH_LAYER) or checkpoint.has_stage("story_layers"):
+                return None
+            if checkpoint.has_stage("research"):
+                return ResearchRun.completed(checkpoint.load_stage("research"))
+        return get_research_stage(self.tavily_api_key).start(top_stories)
+
+    def _run_stage(self, checkpoint: Optional[RunCheckpoint], stage: str, func: Callable, *args) -> Any:
+        """
+        Run one pipeline stage, or reuse its output if the checkpoint already has it.
+
+        Args:
+            checkpoint (Optional[RunCheckpoint]): Checkpoint of the current run, if any.
+            stage (str): The stage name.
+            func (Callable): The function producing the stage output.
+            *args: Arguments passed to func.
+
+        Returns:
+            Any: The stage output.
+        """
+        with span(f"stage.{stage}") as stage_span:
+            if checkpoint is not None and checkpoint.has_stage(stage):
+                logger.info(f"Reusing completed stage '{stage}' from run {checkpoint.run_id}")
+                stage_span.set(reused=True)
+                return checkpoint.load_stage(stage)
+            output = func(*args)
+            if checkpoint is not None:
+                checkpoint.save_stage(stage, output)
+            return output
+
+    async def _run_stage_async(self, checkpoint: Optional[RunCheckpoint], stage: str, func: Callable, *args) -> Any:
+        with span(f"stage.{stage}") as stage_span:
+            if checkpoint is not None and checkpoint.has_stage(stage):
+                logger.info(f"Reusing completed stage '{stage}' from run {checkpoint.run_id}")
+                stage_span.set(reused=True)
+                return checkpoint.load_stage(stage)
+            output = await func(*args)
+            if checkpoint is not None:
+                checkpoint.save_stage(stage, output)
+            return output
+
+    def _uses_story_layers(self) -> bool:
+        return self.story_store is not None or self.pipeline_mode == "map_reduce"
+
+    def _run_story_layers(self, checkpoint: Optional[RunCheckpoint], top_stories: List[Dict],
+                          research: Optional[ResearchRun] = None) -> Tuple[str, str]:
+        """Run the News Editor and Journalist layers per story; returns both layers' combined (or reduced) outputs."""
+        outputs = self._run_stage(
+            checkpoint, "story_layers", self.process_story_layers, list(STORY_LAYERS), top_stories, research
+        )
+        if self.pipeline_mode != "map_reduce":
+            return tuple("\n\n".join(outputs[agent_type]) for agent_type in STORY_LAYERS)
+
+        # The two reductions are independent, so they run side by side
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(STORY_LAYERS)) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self._run_stage,
+                    checkpoint, f"reduce_{agent_type}", self.reduce_outputs, agent_type, outputs[agent_type]
+                )
+                for agent_type in STORY_LAYERS
+            ]
+            return tuple(future.result() for future in futures)
+
+    async def _run_story_layers_async(self, checkpoint: Optional[RunCheckpoint], top_stories: List[Dict],
+                                      research: Optional[ResearchRun] = None) -> Tuple[str, str]:
+        outputs = await self._run_stage_async(
+            checkpoint, "story_layers", self.process_story_layers_async, list(STORY_LAYERS), top_stories, research
+        )
+        if self.pipeline_mode != "map_reduce":
+            return tuple("\n\n".join(outputs[agent_type]) for agent_type in STORY_LAYERS)
+        return tuple(await asyncio.gather(*(
+            self._run_stage_async(checkpoint, f"reduce_{agent_type}", self.reduce_outputs_async, agent_type, outputs[agent_type])
+            for agent_type in STORY_LAYERS
+        )))
+
+    def _run_layers(self, checkpoint: Optional[RunCheckpoint]) -> List[str]:
+        """Run every stage up to the Chief Editor; returns the Chief Editor's inputs."""
+        # Get top stories from RSS feed
+        top_stories = self._run_stage(checkpoint, "stories", self._fetch_and_record_stories, checkpoint)
+        # Research the stories while the News Editor layer works
+        research = self._start_research(checkpoint, top_stories)
+
+        if self._uses_story_layers():
+            news_editor_output, journalist_output = self._run_story_layers(checkpoint, top_stories, research)
+        else:
+            # Process through News Editor layer
+            news_editor_input = self._format_stories(top_stories)
+            news_editor_output = self._run_stage(checkpoint, "news_editor", self.process_worker_layer, "news_editor", news_editor_input)
+
+            # Process through Journalist layer, with the research notes
+            journalist_input = news_editor_output
+            if research is not None:
+                notes = self._run_stage(checkpoint, "research", research.all_notes)
+                journalist_input = with_research(news_editor_output, "\n".join(note for note in notes if note))
+            journalist_output = self._run_stage(checkpoint, "journalist", self.process_worker_layer, "journalist", journalist_input)
+
+        # Process through Script Writer layer
+        script_writer_output = self._run_stage(checkpoint, "script_writer", self.process_worker_layer, "script_writer", journalist_output)
+        return [news_editor_output, journalist_output, script_writer_output]
+
+    async def _run_layers_async(self, checkpoint: Optional[RunCheckpoint]) -> List[str]:
+        # Fetching the feed is blocking I/O, keep it off the event loop
+        top_stories = await self._run_stage_async(
+            checkpoint, "stories", asyncio.to_thread, self._fetch_and_record_stories, checkpoint
+        )
+        research = self._start_research(checkpoint, top_stories)
+
+        if self._uses_story_layers():
+            news_editor_output, journalist_output = await self._run_story_layers_async(checkpoint, top_stories, research)
+        else:
+            news_editor_input = self._format_stories(top_stories)
+            news_editor_output = await self._run_stage_async(
+                checkpoint, "news_editor", self.process_worker_layer_async, "news_editor", news_editor_input
+            )
+            journalist_input = news_editor_output
+            if research is not None:
+                notes = await self._run_stage_async(checkpoint, "research", research.all_notes_async)
+                journalist_input = with_research(news_editor_output, "\n".join(note for note in notes if note))
+            journalist_output = await self._run_stage_async(
+                checkpoint, "journalist", self.process_worker_layer_async, "journalist", journalist_input
+            )
+        script_writer_output = await self._run_stage_async(
+            checkpoint, "script_writer", self.process_worker_layer_async, "script_writer", journalist_output
+        )
+        return [news_editor_output, journalist_output, script_writer_output]
+
+    def _run_attributes(self, checkpoint: Optional[RunCheckpoint]) -> Dict:
+        return {"run_id": checkpoint.run_id if checkpoint else None, "pipeline_mode": self.pipeline_mode,
+                "incremental": self.story_store is not None}
+
+    @contextmanager
+    def _run_scope(self, checkpoint: Optional[RunCheckpoint]) -> Iterator[None]:
+        """Open the span, task dispatcher and Tree of Thought transposition table of one pipeline run."""
+        table = TranspositionTable() if Config.TOT_TRANSPOSITION_ENABLED else None
+        with span("pipeline.run", **self._run_attributes(checkpoint)) as run_span, \
+                use_task_dispatcher(self.task_dispatcher), use_transposition_table(table):
+            try:
+                yield
+            finally:
+                if table is not None:
+                    stats = table.stats()
+                    run_span.set(tot_table_hits=stats["hits"], tot_table_misses=stats["misses"])
+                    logger.info(f"Tree of Thought transposition table: {stats['hits']} hits, {stats['misses']} misses, "
+                                f"{stats['entries']} entries")
+
+    def _run_streaming_stage(self, checkpoint: Optional[RunCheckpoint], stage: str, func: Callable, *args) -> Iterator[str]:
+        """Like _run_stage for a stage that yields its output in chunks; the joined chunks are checkpointed."""
+        with span(f"stage.{stage}", streamed=True) as stage_span:
+            if checkpoint is not None and checkpoint.has_stage(stage):
+                logger.info(f"Reusing completed stage '{stage}' from run {checkpoint.run_id}")
+                stage_span.set(reused=True)
+                yield checkpoint.load_stage(stage)
+                return
+            chunks = []
+            for chunk in func(*args):
+                chunks.append(chunk)
+                yield chunk
+            if checkpoint is not None:
+                checkpoint.save_stage(stage, "".join(chunks).strip())
+
+    async def _run_streaming_stage_async(self, checkpoint: Optional[RunCheckpoint], stage: str, func: Callable, *args) -> AsyncIterator[str]:
+        with span(f"stage.{stage}", streamed=True) as stage_span:
+            if checkpoint is not None and checkpoint.has_stage(stage):
+                logger.info(f"Reusing completed stage '{stage}' from run {checkpoint.run_id}")
+                stage_span.set(reused=True)
+                yield checkpoint.load_stage(stage)
+                return
+            chunks = []
+            async for chunk in func(*args):
+                chunks.append(chunk)
+                yield chunk
+            if checkpoint is not None:
+                checkpoint.save_stage(stage, "".join(chunks).strip())
+
+    def generate_podcast_script(self, checkpoint: Optional[RunCheckpoint] = None) -> str:
         """
         Generate a complete podcast script using the Mix of Agents framework.
 
         This method orchestrates the entire process of generating a podcast script:
-        1. Fetches top stories from the RSS feed
-        2. Processes the stories through the News Editor layer
-        3. Passes the result through the Journalist layer
+        1. Fetches and deduplicates the top stories across the RSS feeds
+        2. Processes the stories through the News Editor layer, while the research stage
+           searches the web for each story in the background
+        3. Passes the result and the research notes through the Journalist layer (in incremental and map-reduce
+           modes, steps 2 and 3 run per story; incremental mode reuses the stored outputs
+           of stories seen before, map-reduce mode reduces them in token-bounded groups)
         4. Creates a script using the Script Writer layer
         5. Finalizes the script with the Chief Editor
 
+        Args:
+            checkpoint (Optional[RunCheckpoint]): When given, every stage output is saved to
+                the run directory, and stages the run already completed are skipped.
+
         Returns:
             str: The final podcast script.
 
@@ -99,23 +677,87 @@ class MoAFramework:
             Exception: If there's an error at any stage of the generation process.
         """
         try:
-            # Get top stories from RSS feed
-            top_stories = self.rss_parser.get_top_stories(num_stories=Config.NUM_STORIES, days=Config.DAYS_LOOKBACK)
+            with self._run_scope(checkpoint):
+                chief_editor_inputs = self._run_layers(checkpoint)
 
-            # Process through News Editor layer
-            news_editor_input = "\n\n".join([f"Title: {story['title']}\nSummary: {story['summary']}" for story in top_stories])
-            news_editor_output = self.process_worker_layer("news_editor", news_editor_input)
+                # Final processing by Chief Editor
+                return self._run_stage(checkpoint, "chief_editor", self.chief_editor.process, chief_editor_inputs)
+        except Exception as e:
+            logger.error(f"Error in generate_podcast_script: {str(e)}")
+            raise
 
-            # Process through Journalist layer
-            journalist_output = self.process_worker_layer("journalist", news_editor_output)
+    def generate_podcast_script_stream(self, checkpoint: Optional[RunCheckpoint] = None) -> Iterator[str]:
+        """
+        Generate a podcast script, yielding the Chief Editor's script as it is written.
+
+        Runs the same stages as generate_podcast_script; the first chunk arrives as soon
+        as the Chief Editor starts writing instead of when it finishes.
 
-            # Process through Script Writer layer
-            script_writer_output = self.process_worker_layer("script_writer", journalist_output)
+        Args:
+            checkpoint (Optional[RunCheckpoint]): When given, every stage output is saved to
+                the run directory, and stages the run already completed are skipped.
 
-            # Final processing by Chief Editor
-            final_script = self.chief_editor.process([news_editor_output, journalist_output, script_writer_output])
+        Yields:
+            str: Consecutive chunks of the final podcast script.
 
-            return final_script
+        Raises:
+            Exception: If there's an error at any stage of the generation process.
+        """
+        try:
+            with self._run_scope(checkpoint):
+                chief_editor_inputs = self._run_layers(checkpoint)
+                yield from self._run_streaming_stage(checkpoint, "chief_editor", self.chief_editor.process_stream, chief_editor_inputs)
         except Exception as e:
-            logger.error(f"Error in generate_podcast_script: {str(e)}")
+            logger.error(f"Error in generate_podcast_script_stream: {str(e)}")
+            raise
+
+    async def generate_podcast_script_async(self, checkpoint: Optional[RunCheckpoint] = None) -> str:
+        """
+        Generate a complete podcast script using the asyncio execution mode.
+
+        Runs the same stages as generate_podcast_script, but every agent call is a
+        coroutine, so many episodes can share one process and one request limit
+        without holding an OS thread per outstanding LLM call.
+
+        Args:
+            checkpoint (Optional[RunCheckpoint]): When given, every stage output is saved to
+                the run directory, and stages the run already completed are skipped.
+
+        Returns:
+            str: The final podcast script.
+
+        Raises:
+            Exception: If there's an error at any stage of the generation process.
+        """
+        try:
+            with self._run_scope(checkpoint):
+                chief_editor_inputs = await self._run_layers_async(checkpoint)
+                return await self._run_stage_async(checkpoint, "chief_editor", self.chief_editor.process_async, chief_editor_inputs)
+        except Exception as e:
+            logger.error(f"Error in generate_podcast_script_async: {str(e)}")
+            raise
+
+    async def generate_podcast_script_stream_async(self, checkpoint: Optional[RunCheckpoint] = None) -> AsyncIterator[str]:
+        """
+        Asynchronous counterpart of generate_podcast_script_stream.
+
+        Args:
+            checkpoint (Optional[RunCheckpoint]): When given, every stage output is saved to
+                the run directory, and stages the run already completed are skipped.
+
+        Yields:
+            str: Consecutive chunks of the final podcast script.
+
+        Raises:
+            Exception: If there's an error at any stage of the generation process.
+        """
+        try:
+            with self._run_scope(checkpoint):
+                chief_editor_inputs = await self._run_layers_async(checkpoint)
+                async for chunk in self._run_streaming_stage_async(
+                    checkpoint, "chief_editor", self.chief_editor.process_stream_async, chief_editor_inputs
+                ):
+                    yield chunk
+        except Exception as e:
+            logger.error(f"Error in generate_podcast_script_stream_async: {str(e)}")
             raise
@@ -0,0 +1,176 @@
+"""
+model_router.py
+
+This module provides model routing for the AI News Podcast Generation System.
+Each API call site ('chief_editor', 'manager.generate', 'worker.evaluate', ...) is mapped
+to a model: cheap models for the many Tree of Thought evaluation calls, the agent's own
+configured model otherwise. Calls that can check their output escalate along a cascade of
+larger models when a cheaper model's answer fails validation. Latency, tokens and cost are
+tracked per route.
+"""
+
+import logging
+import threading
+from fnmatch import fnmatchcase
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RouteStats:
+    """Counters for one (call site, model) route."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.escalations = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.seconds = 0.0
+        self.cost = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "escalations": self.escalations,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "mean_seconds": self.seconds / self.calls if self.calls else None,
+            "cost": self.cost
+        }
+
+class ModelRouter:
+    """
+    Picks the model for every API call and accounts for it per route.
+
+    Attributes:
+        routes (Dict[str, str]): Call site patterns (fnmatch wildcards allowed) mapped to models.
+        cascade (List[str]): Distinct models from cheapest to largest.
+        prices (Dict[str, Tuple[float, float]]): USD per million input and output tokens per model.
+    """
+
+    def __init__(self, routes: Mapping[str, str] = None, cascade: Sequence[str] = None,
+                 prices: Mapping[str, Tuple[float, float]] = None):
+        """
+        Initialize the ModelRouter.
+
+        Args:
+            routes (Mapping[str, str], optional): Defaults to Config.MODEL_ROUTES.
+            cascade (Sequence[str], optional): Defaults to Config.MODEL_CASCADE.
+            prices (Mapping[str, Tuple[float, float]], optional): Defaults to Config.MODEL_PRICES.
+        """
+        self.routes = dict(Config.MODEL_ROUTES if routes is None else routes)
+        self.cascade = list(dict.fromkeys(Config.MODEL_CASCADE if cascade is None else cascade))
+        self.prices = dict(Config.MODEL_PRICES if prices is None else prices)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def route(self, call_site: Optional[str], default_model: str) -> str:
+        """
+        Choose the model for a call.
+
+        An exact call site entry wins over wildcard patterns; unrouted call sites use
+        default_model, normally the model configured for the calling agent.
+
+        Args:
+            call_site (Optional[str]): The call site, e.g. 'worker.evaluate'.
+            default_model (str): The model to use when no route matches.
+
+        Returns:
+            str: The model name.
+        """
+        if call_site is None:
+            return default_model
+        if call_site in self.routes:
+            return self.routes[call_site]
+        for pattern, model in self.routes.items():
+            if fnmatchcase(call_site, pattern):
+                return model
+        return default_model
+
+    def escalate(self, model: str) -> Optional[str]:
+        """Return the next larger model in the cascade, or None if model is the largest or not in it."""
+        if model not in self.cascade:
+            return None
+        index = self.cascade.index(model)
+        return self.cascade[index + 1] if index + 1 < len(self.cascade) else None
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0,
+             cache_write_tokens: int = 0) -> float:
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        cached_input = (cache_write_tokens * Config.PROMPT_CACHE_WRITE_PRICE_RATIO
+                        + cache_read_tokens * Config.PROMPT_CACHE_READ_PRICE_RATIO)
+        return ((input_tokens + cached_input) * input_price + output_tokens * output_price) / 1_000_000
+
+    def _route_stats(self, call_site: Optional[str], model: str) -> RouteStats:
+        key = (call_site or "-", model)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = RouteStats()
+        return stats
+
+    def record(self, call_site: Optional[str], model: str, seconds: float, usage: Dict):
+        """
+        Account for one call on a route.
+
+        Args:
+            call_site (Optional[str]): The call site.
+            model (str): The model that served the call.
+            seconds (float): Wall time of the call.
+            usage (Dict): The call's UsageStats.as_dict(), including any hedged duplicates.
+        """
+        with self._lock:
+            stats = self._route_stats(call_site, model)
+            stats.calls += 1
+            stats.cached_calls += usage["cached_calls"]
+            stats.input_tokens += usage["input_tokens"]
+            stats.output_tokens += usage["output_tokens"]
+            stats.cache_read_tokens += usage.get("cache_read_tokens", 0)
+            stats.cache_write_tokens += usage.get("cache_write_tokens", 0)
+            stats.seconds += seconds
+            stats.cost += self.cost(model, usage["input_tokens"], usage["output_tokens"],
+                                    usage.get("cache_read_tokens", 0), usage.get("cache_write_tokens", 0))
+
+    def record_escalation(self, call_site: Optional[str], model: str):
+        logger.info(f"Output of {call_site} on {model} failed validation, escalating to a larger model")
+        with self._lock:
+            self._route_stats(call_site, model).escalations += 1
+
+    def stats(self) -> Dict[Tuple[str, str], Dict]:
+        """Return the counters of every route, keyed by (call site, model)."""
+        with self._lock:
+            return {key: stats.as_dict() for key, stats in sorted(self._stats.items())}
+
+_model_router = None
+_model_router_lock = threading.Lock()
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model router, creating it from Config on first use."""
+    global _model_router
+    with _model_router_lock:
+        if _model_router is None:
+            _model_router = ModelRouter()
+        return _model_router
+
+def format_route_report(stats: Dict[Tuple[str, str], Dict]) -> str:
+    """Render ModelRouter.stats() as a per-route latency and cost table."""
+    lines = [
+        f"{'Call site':<24} {'Model':<28} {'Calls':>6} {'Cached':>6} {'Escal.':>6} {'Mean s':>7} {'Tokens':>9} "
+        f"{'Cache rd':>9} {'Cache wr':>9} {'Cost $':>8}"
+    ]
+    total = 0.0
+    for (call_site, model), route in stats.items():
+        mean = f"{route['mean_seconds']:.2f}" if route['mean_seconds'] is not None else "-"
+        lines.append(
+            f"{call_site:<24} {model:<28} {route['calls']:>6} {route['cached_calls']:>6} {route['escalations']:>6} "
+            f"{mean:>7} {route['input_tokens'] + route['output_tokens']:>9} {route['cache_read_tokens']:>9} "
+            f"{route['cache_write_tokens']:>9} {route['cost']:>8.4f}"
+        )
+        total += route['cost']
+    lines.append(f"Total cost: ${total:.4f}")
+    return "\n".join(lines)
@@ -0,0 +1,246 @@
+"""
+rate_limiter.py
+
+This module provides the process-wide rate limit scheduler for the AI News Podcast Generation System.
+Every LLM request acquires capacity from one token-bucket scheduler that tracks requests, input
+tokens and output tokens per minute, adapts to the rate limit headers returned by the API, and
+serves Chief Editor and manager calls ahead of worker calls.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CHIEF_EDITOR = 0
+PRIORITY_MANAGER = 1
+PRIORITY_WORKER = 2
+
+# How often a waiter that is not at the head of the queue re-checks its turn
+_POLL_INTERVAL = 0.05
+
+class TokenBucket:
+    """
+    A bucket refilled continuously at capacity units per minute.
+
+    The level may go negative when actual usage turns out larger than the amount
+    reserved up front; later requests then wait until the debt is repaid.
+
+    Attributes:
+        capacity (float): Units available per minute, also the bucket size.
+        level (float): Units currently available.
+    """
+
+    def __init__(self, capacity: float):
+        self.capacity = float(capacity)
+        self.level = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount units are available (amounts above capacity wait for a full bucket)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60.0 / self.capacity)
+
+    def consume(self, amount: float):
+        self.level -= amount
+
+    def set_capacity(self, capacity: float):
+        if capacity > 0 and capacity != self.capacity:
+            self.level = min(self.level, capacity)
+            self.capacity = float(capacity)
+
+    def set_remaining(self, remaining: float):
+        self.level = min(self.level, float(remaining))
+
+class RateLimitScheduler:
+    """
+    Priority scheduler in front of every LLM request.
+
+    Callers reserve one request plus their estimated input and output tokens, then
+    report the real usage afterwards so the buckets track what the API actually billed.
+    Waiters are served strictly by priority (lower value first), then in arrival order.
+
+    Attributes:
+        buckets (Dict[str, TokenBucket]): The 'requests', 'input_tokens' and 'output_tokens' buckets.
+    """
+
+    # Maps API rate limit header prefixes onto bucket names
+    HEADER_BUCKETS = {
+        "anthropic-ratelimit-requests": "requests",
+        "anthropic-ratelimit-input-tokens": "input_tokens",
+        "anthropic-ratelimit-output-tokens": "output_tokens",
+    }
+
+    def __init__(self, requests_per_minute: int, input_tokens_per_minute: int, output_tokens_per_minute: int):
+        """
+        Initialize the RateLimitScheduler.
+
+        Args:
+            requests_per_minute (int): Starting request budget per minute.
+            input_tokens_per_minute (int): Starting input token budget per minute.
+            output_tokens_per_minute (int): Starting output token budget per minute.
+        """
+        self.buckets = {
+            "requests": TokenBucket(requests_per_minute),
+            "input_tokens": TokenBucket(input_tokens_per_minute),
+            "output_tokens": TokenBucket(output_tokens_per_minute),
+        }
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+
+    def _enqueue(self, priority: int) -> tuple:
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _cancel(self, ticket: tuple):
+        with self._cond:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def _try_acquire(self, ticket: tuple, amounts: Dict[str, float]) -> Optional[float]:
+        """Grant the reservation if ticket is first in line and capacity allows; else return seconds to wait."""
+        if self._waiting[0] != ticket:
+            return _POLL_INTERVAL
+        now = time.monotonic()
+        wait = max(
+            self._paused_until - now,
+            *(self.buckets[name].wait_time(amount, now) for name, amount in amounts.items())
+        )
+        if wait > 0:
+            return wait
+        for name, amount in amounts.items():
+            self.buckets[name].consume(amount)
+        heapq.heappop(self._waiting)
+        self._cond.notify_all()
+        return None
+
+    def acquire(self, priority: int = PRIORITY_WORKER, input_tokens: int = 0, output_tokens: int = 0) -> float:
+        """
+        Block until one request and the given token estimates can be spent.
+
+        Args:
+            priority (int, optional): Scheduling priority, lower is served first. Defaults to PRIORITY_WORKER.
+            input_tokens (int, optional): Estimated input tokens of the request.
+            output_tokens (int, optional): Estimated output tokens of the request.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        amounts = {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens}
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            with self._cond:
+                while True:
+                    wait = self._try_acquire(ticket, amounts)
+                    if wait is None:
+                        return time.monotonic() - start
+                    self._cond.wait(timeout=wait)
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    async def acquire_async(self, priority: int = PRIORITY_WORKER, input_tokens: int = 0, output_tokens: int = 0) -> float:
+        """
+        Asynchronous counterpart of acquire that waits without blocking the event loop.
+
+        Args:
+            priority (int, optional): Scheduling priority, lower is served first. Defaults to PRIORITY_WORKER.
+            input_tokens (int, optional): Estimated input tokens of the request.
+            output_tokens (int, optional): Estimated output tokens of the request.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        amounts = {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens}
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(ticket, amounts)
+                if wait is None:
+                    return time.monotonic() - start
+                await asyncio.sleep(min(wait, _POLL_INTERVAL))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    def record_usage(self, estimated_input: int, estimated_output: int, input_tokens: int, output_tokens: int):
+        """
+        Correct the token buckets once the real usage of a request is known.
+
+        Args:
+            estimated_input (int): Input tokens reserved in acquire.
+            estimated_output (int): Output tokens reserved in acquire.
+            input_tokens (int): Input tokens reported by the API.
+            output_tokens (int): Output tokens reported by the API.
+        """
+        with self._cond:
+            self.buckets["input_tokens"].consume(input_tokens - estimated_input)
+            self.buckets["output_tokens"].consume(output_tokens - estimated_output)
+            self._cond.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Adapt the limits to the rate limit headers of an API response.
+
+        '<prefix>-limit' headers resize the buckets, '<prefix>-remaining' headers clamp
+        the available capacity, and 'retry-after' pauses all requests for that long.
+
+        Args:
+            headers (Mapping[str, str]): Response headers.
+        """
+        if not headers:
+            return
+        with self._cond:
+            for prefix, name in self.HEADER_BUCKETS.items():
+                limit = _parse_number(headers.get(f"{prefix}-limit"))
+                if limit is not None:
+                    self.buckets[name].set_capacity(limit)
+                remaining = _parse_number(headers.get(f"{prefix}-remaining"))
+                if remaining is not None:
+                    self.buckets[name].set_remaining(remaining)
+            retry_after = _parse_number(headers.get("retry-after"))
+            if retry_after is not None:
+                logger.warning(f"API asked to retry after {retry_after}s, pausing all requests")
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimitScheduler:
+    """Return the process-wide scheduler, creating it from Config on first use."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimitScheduler(
+                Config.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                Config.RATE_LIMIT_INPUT_TOKENS_PER_MINUTE,
+                Config.RATE_LIMIT_OUTPUT_TOKENS_PER_MINUTE
+            )
+        return _rate_limiter
@@ -0,0 +1,244 @@
+"""
+research.py
+
+This module provides the research stage of the AI News Podcast Generation System.
+Search queries are extracted from every story, normalized and deduplicated, and run
+concurrently on a bounded pool while the News Editor layer works, so search latency
+overlaps LLM work. Results are kept in a disk-backed TTL cache shared by every run and
+episode, and identical queries in flight at the same time are searched only once. The
+research notes of each story are added to its Journalist layer input.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import re
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+from clients import get_client_registry
+from config import Config
+from llm_cache import ResponseCache
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+class ResearchError(Exception):
+    """Custom exception class for research-related errors."""
+    pass
+
+def normalize_query(text: str) -> str:
+    """Lowercase text, drop punctuation and extra whitespace, and keep the first Config.RESEARCH_MAX_QUERY_WORDS words."""
+    words = re.sub(r"[^\w\s-]", " ", text.lower()).split()
+    return " ".join(words[:Config.RESEARCH_MAX_QUERY_WORDS])
+
+def extract_queries(story: Dict) -> List[str]:
+    """
+    Derive the search queries for a story.
+
+    The title names what the story is about; stories without one fall back to the first
+    sentence of their summary.
+
+    Args:
+        story (Dict): A story as returned by the feed ingestor.
+
+    Returns:
+        List[str]: Normalized queries, empty if the story has no usable text.
+    """
+    text = story.get("title") or (story.get("summary") or "").split(". ")[0]
+    query = normalize_query(text)
+    return [query] if query else []
+
+def format_search_results(response: Dict, max_results: int) -> str:
+    """Render a Tavily search response as one '- title (url): content' line per result."""
+    return "\n".join(
+        f"- {result.get('title', '')} ({result.get('url', '')}): {result.get('content', '')}".strip()
+        for result in (response or {}).get("results", [])[:max_results]
+    )
+
+def tavily_search(tavily_api_key: str, query: str) -> str:
+    """Search with the shared Tavily client for tavily_api_key."""
+    response = get_client_registry().tavily_client(tavily_api_key).search(
+        query, search_depth=Config.RESEARCH_SEARCH_DEPTH, max_results=Config.RESEARCH_MAX_RESULTS
+    )
+    return format_search_results(response, Config.RESEARCH_MAX_RESULTS)
+
+class ResearchRun:
+    """
+    The research of one set of stories, filled in by searches running in the background.
+
+    Attributes:
+        queries (List[List[str]]): The queries of each story, in story order.
+    """
+
+    def __init__(self, queries: List[List[str]], futures: Dict[str, concurrent.futures.Future]):
+        self.queries = queries
+        self._futures = futures
+
+    @classmethod
+    def completed(cls, notes: Sequence[str]) -> "ResearchRun":
+        """A run whose notes are already known, e.g. loaded from a checkpoint."""
+        futures = {}
+        for index, text in enumerate(notes):
+            future = concurrent.futures.Future()
+            future.set_result(text)
+            futures[str(index)] = future
+        return cls([[str(index)] for index in range(len(notes))], futures)
+
+    def _result(self, query: str) -> str:
+        try:
+            return self._futures[query].result()
+        except Exception as e:
+            logger.warning(f"Search for '{query}' failed, continuing without it: {str(e)}")
+            return ""
+
+    def notes(self, index: int) -> str:
+        """Wait for and return the search results of story index."""
+        return "\n".join(result for result in (self._result(query) for query in self.queries[index]) if result)
+
+    async def notes_async(self, index: int) -> str:
+        await asyncio.gather(
+            *(asyncio.wrap_future(self._futures[query]) for query in self.queries[index]), return_exceptions=True
+        )
+        return self.notes(index)
+
+    def all_notes(self) -> List[str]:
+        return [self.notes(index) for index in range(len(self.queries))]
+
+    async def all_notes_async(self) -> List[str]:
+        return [await self.notes_async(index) for index in range(len(self.queries))]
+
+class ResearchStage:
+    """
+    Runs deduplicated, cached searches on a bounded thread pool.
+
+    Attributes:
+        search_func (Callable[[str], str]): Performs one search and returns its results as text.
+        cache (Optional[ResponseCache]): Search results by query, shared across runs.
+        searches (int): Searches sent to the backend.
+    """
+
+    def __init__(self, search_func: Callable[[str], str], cache: Optional[ResponseCache] = None, pool_size: int = None):
+        """
+        Initialize the ResearchStage.
+
+        Args:
+            search_func (Callable[[str], str]): The search backend.
+            cache (Optional[ResponseCache]): Result cache; None disables caching.
+            pool_size (int, optional): Concurrent searches. Defaults to Config.RESEARCH_POOL_SIZE.
+        """
+        self.search_func = search_func
+        self.cache = cache
+        self.searches = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=pool_size or Config.RESEARCH_POOL_SIZE, thread_name_prefix="research"
+        )
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def _cache_key(self, query: str) -> str:
+        return ResponseCache.make_key(query=query, search_depth=Config.RESEARCH_SEARCH_DEPTH, max_results=Config.RESEARCH_MAX_RESULTS)
+
+    def _cached(self, query: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(self._cache_key(query))
+        except sqlite3.Error as e:
+            logger.warning(f"Research cache lookup failed: {str(e)}")
+            return None
+
+    def _search(self, query: str) -> str:
+        with span("research.search", query=query) as search_span:
+            result = self._cached(query)
+            search_span.set(cached=result is not None)
+            if result is not None:
+                return result
+            with self._lock:
+                self.searches += 1
+            result = self.search_func(query)
+            if self.cache is not None:
+                try:
+                    self.cache.set(self._cache_key(query), result)
+                except sqlite3.Error as e:
+                    logger.warning(f"Research cache store failed: {str(e)}")
+            return result
+
+    def _done(self, query: str, future: concurrent.futures.Future):
+        with self._lock:
+            if self._in_flight.get(query) is future:
+                del self._in_flight[query]
+
+    def submit(self, query: str) -> concurrent.futures.Future:
+        """
+        Start a search, or join the identical one already in flight.
+
+        Args:
+            query (str): The query; it is normalized first.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the results text.
+        """
+        query = normalize_query(query)
+        with self._lock:
+            future = self._in_flight.get(query)
+            started = future is None
+            if started:
+                future = self._executor.submit(contextvars.copy_context().run, self._search, query)
+                self._in_flight[query] = future
+        if started:
+            # Registered outside the lock: a search that has already finished runs _done right here
+            future.add_done_callback(lambda done: self._done(query, done))
+        return future
+
+    def search(self, query: str) -> str:
+        """
+        Search and wait for the results.
+
+        Raises:
+            ResearchError: If the search fails.
+        """
+        try:
+            return self.submit(query).result()
+        except Exception as e:
+            raise ResearchError(f"Search for '{query}' failed: {str(e)}")
+
+    def start(self, stories: List[Dict]) -> ResearchRun:
+        """
+        Start researching every story without waiting for the results.
+
+        Args:
+            stories (List[Dict]): The stories.
+
+        Returns:
+            ResearchRun: Hands out each story's notes once its searches finish.
+        """
+        queries = [extract_queries(story) for story in stories]
+        futures = {query: self.submit(query) for story_queries in queries for query in story_queries}
+        logger.info(f"Researching {len(stories)} stories with {len(futures)} distinct queries")
+        return ResearchRun(queries, futures)
+
+_research_stages: Dict[str, ResearchStage] = {}
+_research_stages_lock = threading.Lock()
+_research_cache = None
+
+def get_research_stage(tavily_api_key: str) -> ResearchStage:
+    """Return the process-wide research stage for a Tavily API key, so every run and episode shares its cache and pool."""
+    global _research_cache
+    with _research_stages_lock:
+        stage = _research_stages.get(tavily_api_key)
+        if stage is None:
+            if Config.RESEARCH_CACHE_ENABLED and _research_cache is None:
+                try:
+                    _research_cache = ResponseCache(Config.RESEARCH_CACHE_PATH, ttl_seconds=Config.RESEARCH_CACHE_TTL_SECONDS)
+                except (OSError, sqlite3.Error) as e:
+                    # Searches go uncached rather than failing the run
+                    logger.warning(f"Research cache unavailable: {str(e)}")
+            cache = _research_cache if Config.RESEARCH_CACHE_ENABLED else None
+            stage = _research_stages[tavily_api_key] = ResearchStage(lambda query: tavily_search(tavily_api_key, query), cache)
+        return stage
+
+def with_research(text: str, notes: str) -> str:
+    """Append research notes to a layer input."""
+    return f"{text}\n\nBackground research:\n{notes}" if notes else text
@@ -6,8 +6,11 @@ for the AI News Podcast Generation System.
 """
 
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+from typing import Dict, List
+from config import Config
+from feed_backends import get_backend, select_fresh_stories
+from feed_fetcher import FeedFetcher, get_default_fetcher
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,23 +28,30 @@ class RSSFeedParser:
 
     Attributes:
         feed_url (str): The URL of the RSS feed to parse.
+        fetcher (FeedFetcher): Fetch layer handling pooling and conditional GET.
+        backend (str): Parser backend name: 'auto', 'xml' (RSS/Atom) or 'html'.
     """
 
-    def __init__(self, url):
+    def __init__(self, url, fetcher: FeedFetcher = None, backend: str = None):
         """
         Initialize the RSSFeedParser.
 
         Args:
-            url (str): The URL of the website to scrape for news.
+            url (str): The URL of the feed or website to scrape for news.
+            fetcher (FeedFetcher, optional): Fetch layer to use. Defaults to the shared fetcher.
+            backend (str, optional): Parser backend name. Defaults to Config.FEED_PARSER_BACKEND.
         """
         self.url = url
+        self.fetcher = fetcher or get_default_fetcher()
+        self.backend = backend or Config.FEED_PARSER_BACKEND
 
     def get_top_stories(self, num_stories=10, days=7):
         """
         Fetch and process top stories from the website.
 
-        This method retrieves stories from the website, filters them based on
-        recency, and returns the top stories.
+        This method retrieves stories from the website and returns the first
+        num_stories that fall within the lookback window. Parsing stops as soon
+        as enough fresh stories have been found.
 
         Args:
             num_stories (int, optional): The number of top stories to return. Defaults to 10.
@@ -55,30 +65,22 @@ class RSSFeedParser:
             RSSFeedError: If there's an error fetching or parsing the news content.
         """
         try:
-            response = requests.get(self.url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            news_items = soup.find_all('div', class_='news-item')
-
-            stories = []
-            for item in news_items[:num_stories]:
-                title = item.find('h3', class_='news-title').text.strip()
-                summary = item.find('p', class_='news-summary').text.strip()
-                link = item.find('a', class_='news-link')['href']
-                date_str = item.find('span', class_='news-date').text.strip()
-                
-                # Parse the date (adjust the format as needed)
-                pub_date = datetime.strptime(date_str, "%B %d, %Y")
-                
-                if pub_date > (datetime.now() - timedelta(days=days)):
-                    stories.append({
-                        'title': title,
-                        'summary': summary,
-                        'link': link,
-                        'published': pub_date
-                    })
-
+            content, modified = self.fetcher.fetch(self.url)
+            cutoff = datetime.now() - timedelta(days=days)
+
+            # An unchanged feed reuses the stories parsed from the cached body, as long as
+            # none of them has aged out of the window (which would leave a gap to refill)
+            parse_key = f"{self.backend}:{num_stories}:{days}"
+            cached = None if modified else self.fetcher.load_parsed(self.url, parse_key)
+            if cached is not None:
+                stories = [dict(story, published=datetime.fromisoformat(story['published'])) for story in cached]
+                if all(story['published'] > cutoff for story in stories):
+                    return stories
+
+            stories = select_fresh_stories(get_backend(self.backend, content).iter_stories(content), num_stories, cutoff)
+            self.fetcher.store_parsed(
+                self.url, parse_key, [dict(story, published=story['published'].isoformat()) for story in stories]
+            )
             return stories
 
         except requests.RequestException as e:
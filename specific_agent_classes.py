@@ -1,109 +1,318 @@
-from base_agent import Agent, Thought, AgentError
-from typing import List, Dict
+from base_agent import Agent, Thought, AgentError, current_shared_context
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
+import asyncio
 import logging
+import re
 from config import Config
-from ratelimit import limits, sleep_and_retry
-from api_utils import make_api_call, AnthropicAPIError
+from api_utils import make_api_call, make_api_call_async, stream_api_call, stream_api_call_async, AnthropicAPIError, is_cacheable_context
+from model_router import get_model_router
+from rate_limiter import PRIORITY_CHIEF_EDITOR, PRIORITY_MANAGER, PRIORITY_WORKER
 
 logger = logging.getLogger(__name__)
 
+# '<label> <rating>', the rating (1-10, optionally written as n/10) being optional
+EVALUATION = re.compile(r"\W*(sure|maybe|impossible)\b\W*(?:(\d+)(?:\s*/\s*10)?)?\W*", re.IGNORECASE)
+# Free-form answers: the first label, then the first number after it
+EVALUATION_LABEL = re.compile(r"\b(sure|maybe|impossible)\b", re.IGNORECASE)
+EVALUATION_NUMBER = re.compile(r"\b(\d+)\b")
+BATCH_EVALUATION_LINE = re.compile(r"^\W*(?:thought\s*)?(\d+)\W+(sure|maybe|impossible)\b\W*(\d+)?", re.IGNORECASE)
+
+EVALUATION_SYSTEM_PROMPT = (
+    "You are an AI tasked with evaluating thoughts as 'sure', 'maybe', or 'impossible' "
+    "and rating how promising they are from 1 to 10."
+)
+
+def _rating(digits: Optional[str]) -> Optional[int]:
+    rating = int(digits) if digits else None
+    return rating if rating is not None and 1 <= rating <= 10 else None
+
+def parse_evaluation(response: str) -> Optional[Tuple[str, Optional[int]]]:
+    """Return the (label, rating) of a single evaluation, or None if the response is not one."""
+    match = EVALUATION.fullmatch(response.strip())
+    if match is None:
+        return None
+    return match.group(1).lower(), _rating(match.group(2))
+
+def is_evaluation(response: str) -> bool:
+    return parse_evaluation(response) is not None
+
+def read_evaluation(response: str) -> Tuple[str, Optional[int]]:
+    """
+    Return the (label, rating) of a single evaluation, reading answers that are not in the requested form leniently.
+
+    The model cascade only escalates a malformed answer a bounded number of times before returning it anyway,
+    so this never fails: an answer with no label at all counts as ('maybe', None).
+    """
+    evaluation = parse_evaluation(response)
+    if evaluation is not None:
+        return evaluation
+    label = EVALUATION_LABEL.search(response)
+    if label is None:
+        logger.warning(f"Unreadable evaluation {response[:80]!r}, counted as 'maybe'")
+        return "maybe", None
+    rating = EVALUATION_NUMBER.search(response, label.end())
+    return label.group(1).lower(), _rating(rating.group(1) if rating else None)
+
 class ChiefEditorAgent(Agent):
+    PRIORITY = PRIORITY_CHIEF_EDITOR
+    CALL_SITE = "chief_editor"
+
     def __init__(self, name: str, tavily_api_key: str):
         super().__init__(name, Config.CHIEF_EDITOR_MODEL, tavily_api_key)
 
-    @sleep_and_retry
-    @limits(calls=20, period=60)
+    def _build_request(self, inputs: List[str]) -> Dict:
+        prompt = f"As the Chief Editor, review and synthesize the following inputs into a final podcast script:\n\n"
+        prompt += "\n\n".join(inputs)
+        return dict(
+            system="You are the Chief Editor AI, tasked with synthesizing inputs into a coherent podcast script.",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=4000
+        )
+
     def process(self, inputs: List[str]) -> str:
         try:
-            prompt = f"As the Chief Editor, review and synthesize the following inputs into a final podcast script:\n\n"
-            prompt += "\n\n".join(inputs)
-            
-            return make_api_call(
-                system="You are the Chief Editor AI, tasked with synthesizing inputs into a coherent podcast script.",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4000
-            )
+            return make_api_call(**self._build_request(inputs), priority=self.PRIORITY, call_site=self.CALL_SITE, model=self.model)
         except AnthropicAPIError as e:
             logger.error(f"Error in ChiefEditorAgent processing: {str(e)}")
             raise AgentError(f"Error in ChiefEditorAgent processing: {str(e)}")
 
+    async def process_async(self, inputs: List[str]) -> str:
+        try:
+            return await make_api_call_async(**self._build_request(inputs), priority=self.PRIORITY, call_site=self.CALL_SITE, model=self.model)
+        except AnthropicAPIError as e:
+            logger.error(f"Error in ChiefEditorAgent processing: {str(e)}")
+            raise AgentError(f"Error in ChiefEditorAgent processing: {str(e)}")
+
+    def process_stream(self, inputs: List[str]) -> Iterator[str]:
+        """Like process, but yields the script in chunks as the model generates it."""
+        try:
+            yield from stream_api_call(**self._build_request(inputs), priority=self.PRIORITY, call_site=self.CALL_SITE, model=self.model)
+        except AnthropicAPIError as e:
+            logger.error(f"Error in ChiefEditorAgent streaming: {str(e)}")
+            raise AgentError(f"Error in ChiefEditorAgent streaming: {str(e)}")
+
+    async def process_stream_async(self, inputs: List[str]) -> AsyncIterator[str]:
+        try:
+            async for chunk in stream_api_call_async(**self._build_request(inputs), priority=self.PRIORITY, call_site=self.CALL_SITE, model=self.model):
+                yield chunk
+        except AnthropicAPIError as e:
+            logger.error(f"Error in ChiefEditorAgent streaming: {str(e)}")
+            raise AgentError(f"Error in ChiefEditorAgent streaming: {str(e)}")
+
 class ManagerAgent(Agent):
-    def __init__(self, name: str, agent_type: str, tavily_api_key: str):
-        super().__init__(name, Config.MANAGER_MODEL, tavily_api_key)
+    PRIORITY = PRIORITY_MANAGER
+    ROLE = "manager"
+    # Whether calls may be duplicated when they run past their call site's latency deadline
+    HEDGE = False
+
+    def __init__(self, name: str, agent_type: str, tavily_api_key: str, model: str = None):
+        super().__init__(name, model or Config.MANAGER_MODEL, tavily_api_key)
         self.agent_type = agent_type
 
-    @sleep_and_retry
-    @limits(calls=20, period=60)
+    def task_spec(self) -> Dict:
+        return {"role": self.ROLE, "name": self.name, "agent_type": self.agent_type, "model": self.model,
+                "max_depth": self.max_depth, "branching_factor": self.branching_factor}
+
+    def _call_options(self, step: str) -> Dict:
+        return dict(priority=self.PRIORITY, call_site=f"{self.ROLE}.{step}", hedge=self.HEDGE, model=self.model)
+
+    def _build_synthesis_request(self, thoughts: List[Thought], input: str) -> Dict:
+        if thoughts:
+            prompt = f"As the {self.agent_type}, synthesize the following thoughts into a coherent output:\n\n"
+            prompt += "\n\n".join([t.content for t in thoughts])
+        else:
+            # The Tree of Thought budget ran out before any thought was developed
+            prompt = f"As the {self.agent_type}, write a coherent output directly from the following input:\n\n{input}"
+        return dict(
+            system=f"You are the {self.agent_type} AI, tasked with synthesizing thoughts into a coherent output.",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=2000
+        )
+
+    def _build_generation_request(self, prompt: str) -> Dict:
+        context = current_shared_context()
+        if context is not None and prompt != context:
+            model = get_model_router().route(self._call_options("generate")["call_site"], self.model)
+            if not is_cacheable_context(context, model):
+                # An uncached context would be paid for in full by every deeper call, so they send only their thought
+                context = None
+        if context is None:
+            full_prompt = f"Generate {self.branching_factor} diverse thoughts on the following prompt:\n\n{prompt}"
+        elif prompt == context:
+            # The root of the tree: the prompt is already sent as the shared context
+            full_prompt = f"Generate {self.branching_factor} diverse thoughts on the material above."
+        else:
+            full_prompt = (f"Generate {self.branching_factor} diverse thoughts on the following prompt, "
+                           f"drawing on the material above:\n\n{prompt}")
+        return dict(
+            system="You are an AI tasked with generating diverse thoughts on a given prompt.",
+            messages=[{"role": "user", "content": full_prompt}],
+            max_tokens=1000,
+            shared_context=context
+        )
+
+    def _parse_thoughts(self, response: str) -> List[Thought]:
+        thoughts = [Thought(t.strip()) for t in response.split('\n') if t.strip()]
+        return thoughts[:self.branching_factor]
+
+    def _is_valid_generation(self, response: str) -> bool:
+        return len(self._parse_thoughts(response)) >= self.branching_factor
+
+    def _build_evaluation_request(self, thought: Thought) -> Dict:
+        prompt = (
+            "Quickly evaluate as 'sure', 'maybe', or 'impossible', and rate how promising it is from 1 to 10.\n"
+            f"Answer in the form '<label> <rating>' and nothing else:\n\n{thought.content}"
+        )
+        return dict(
+            system=EVALUATION_SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=50
+        )
+
+    def _build_batch_evaluation_request(self, thoughts: List[Thought]) -> Dict:
+        numbered = "\n\n".join(f"{i}. {thought.content}" for i, thought in enumerate(thoughts, 1))
+        prompt = (
+            "Quickly evaluate each of the following numbered thoughts as 'sure', 'maybe', or 'impossible', "
+            "and rate how promising it is from 1 to 10.\n"
+            "Answer with exactly one line per thought in the form '<number>: <label> <rating>' and nothing else.\n\n"
+            f"{numbered}"
+        )
+        return dict(
+            system=EVALUATION_SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=20 + 10 * len(thoughts)
+        )
+
+    def _parse_batch_evaluations(self, response: str, count: int) -> Optional[List[Tuple[str, Optional[int]]]]:
+        """Return one (label, rating) per thought, or None if the response does not cover every thought."""
+        evaluations = {}
+        for line in response.splitlines():
+            match = BATCH_EVALUATION_LINE.match(line)
+            if match:
+                evaluations.setdefault(int(match.group(1)), (match.group(2).lower(), _rating(match.group(3))))
+        if count == 1 and not evaluations and is_evaluation(response):
+            return [parse_evaluation(response)]
+        if any(i not in evaluations for i in range(1, count + 1)):
+            return None
+        return [evaluations[i] for i in range(1, count + 1)]
+
+    def _apply_batch_evaluations(self, thoughts: List[Thought], response: str) -> bool:
+        evaluations = self._parse_batch_evaluations(response, len(thoughts))
+        if evaluations is None:
+            logger.warning(f"{self.name} could not parse batched evaluation, falling back to per-thought calls")
+            return False
+        for thought, (label, rating) in zip(thoughts, evaluations):
+            thought.evaluation, thought.rating = label, rating
+        return True
+
     def process(self, input: str) -> str:
         try:
             thoughts = self.tree_of_thought(input)
-            
-            prompt = f"As the {self.agent_type}, synthesize the following thoughts into a coherent output:\n\n"
-            prompt += "\n\n".join([t.content for t in thoughts])
-            
-            return make_api_call(
-                system=f"You are the {self.agent_type} AI, tasked with synthesizing thoughts into a coherent output.",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2000
-            )
+            return make_api_call(**self._build_synthesis_request(thoughts, input), **self._call_options("synthesize"))
+        except AnthropicAPIError as e:
+            logger.error(f"Error in ManagerAgent processing: {str(e)}")
+            raise AgentError(f"Error in ManagerAgent processing: {str(e)}")
+
+    async def process_async(self, input: str) -> str:
+        try:
+            thoughts = await self.tree_of_thought_async(input)
+            return await make_api_call_async(**self._build_synthesis_request(thoughts, input), **self._call_options("synthesize"))
         except AnthropicAPIError as e:
             logger.error(f"Error in ManagerAgent processing: {str(e)}")
             raise AgentError(f"Error in ManagerAgent processing: {str(e)}")
 
-    @sleep_and_retry
-    @limits(calls=20, period=60)
     def generate_thoughts(self, prompt: str, depth: int) -> List[Thought]:
         try:
-            full_prompt = f"Generate {self.branching_factor} diverse thoughts on the following prompt:\n\n{prompt}"
-            
-            response = make_api_call(
-                system="You are an AI tasked with generating diverse thoughts on a given prompt.",
-                messages=[{"role": "user", "content": full_prompt}],
-                max_tokens=1000
-            )
-            
-            thoughts = [Thought(t.strip()) for t in response.split('\n') if t.strip()]
-            return thoughts[:self.branching_factor]
+            response = make_api_call(**self._build_generation_request(prompt), **self._call_options("generate"),
+                                     validate=self._is_valid_generation)
+            return self._parse_thoughts(response)
+        except AnthropicAPIError as e:
+            logger.error(f"Error generating thoughts: {str(e)}")
+            raise AgentError(f"Error generating thoughts: {str(e)}")
+
+    async def generate_thoughts_async(self, prompt: str, depth: int) -> List[Thought]:
+        try:
+            response = await make_api_call_async(**self._build_generation_request(prompt), **self._call_options("generate"),
+                                                 validate=self._is_valid_generation)
+            return self._parse_thoughts(response)
         except AnthropicAPIError as e:
             logger.error(f"Error generating thoughts: {str(e)}")
             raise AgentError(f"Error generating thoughts: {str(e)}")
 
-    @sleep_and_retry
-    @limits(calls=20, period=60)
     def evaluate_thoughts(self, thoughts: List[Thought]) -> List[Thought]:
         try:
+            if Config.TOT_BATCH_EVALUATION and thoughts:
+                response = make_api_call(
+                    **self._build_batch_evaluation_request(thoughts), **self._call_options("evaluate_batch"),
+                    validate=lambda response: self._parse_batch_evaluations(response, len(thoughts)) is not None
+                )
+                if self._apply_batch_evaluations(thoughts, response):
+                    return thoughts
+
             for thought in thoughts:
-                prompt = f"Quickly evaluate as 'sure', 'maybe', or 'impossible':\n\n{thought.content}"
-                
                 evaluation = make_api_call(
-                    system="You are an AI tasked with evaluating thoughts as 'sure', 'maybe', or 'impossible'.",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=50
+                    **self._build_evaluation_request(thought), **self._call_options("evaluate"), validate=is_evaluation
+                )
+                thought.evaluation, thought.rating = read_evaluation(evaluation)
+            return thoughts
+        except AnthropicAPIError as e:
+            logger.error(f"Error evaluating thoughts: {str(e)}")
+            raise AgentError(f"Error evaluating thoughts: {str(e)}")
+
+    async def evaluate_thoughts_async(self, thoughts: List[Thought]) -> List[Thought]:
+        try:
+            if Config.TOT_BATCH_EVALUATION and thoughts:
+                response = await make_api_call_async(
+                    **self._build_batch_evaluation_request(thoughts), **self._call_options("evaluate_batch"),
+                    validate=lambda response: self._parse_batch_evaluations(response, len(thoughts)) is not None
                 )
-                thought.evaluation = evaluation.strip().lower()
+                if self._apply_batch_evaluations(thoughts, response):
+                    return thoughts
+
+            evaluations = await asyncio.gather(
+                *(make_api_call_async(
+                    **self._build_evaluation_request(thought), **self._call_options("evaluate"), validate=is_evaluation
+                ) for thought in thoughts)
+            )
+            for thought, evaluation in zip(thoughts, evaluations):
+                thought.evaluation, thought.rating = read_evaluation(evaluation)
             return thoughts
         except AnthropicAPIError as e:
             logger.error(f"Error evaluating thoughts: {str(e)}")
             raise AgentError(f"Error evaluating thoughts: {str(e)}")
 
 class WorkerAgent(ManagerAgent):
+    PRIORITY = PRIORITY_WORKER
+    ROLE = "worker"
+    HEDGE = True
+
     def __init__(self, name: str, tavily_api_key: str):
-        super().__init__(name, "Worker", tavily_api_key)
+        super().__init__(name, "Worker", tavily_api_key, model=Config.WORKER_MODEL)
+
+    def _build_synthesis_request(self, thoughts: List[Thought], input: str) -> Dict:
+        if thoughts:
+            prompt = f"Synthesize the following thoughts into a concise output:\n\n"
+            prompt += "\n\n".join([t.content for t in thoughts])
+        else:
+            prompt = f"Write a concise output directly from the following input:\n\n{input}"
+        return dict(
+            system="You are a Worker AI, tasked with synthesizing thoughts into a concise output.",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=1000
+        )
 
-    @sleep_and_retry
-    @limits(calls=20, period=60)
     def process(self, input: str) -> str:
         try:
             thoughts = self.tree_of_thought(input)
-            
-            prompt = f"Synthesize the following thoughts into a concise output:\n\n"
-            prompt += "\n\n".join([t.content for t in thoughts])
-            
-            return make_api_call(
-                system="You are a Worker AI, tasked with synthesizing thoughts into a concise output.",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000
-            )
+            return make_api_call(**self._build_synthesis_request(thoughts, input), **self._call_options("synthesize"))
+        except AnthropicAPIError as e:
+            logger.error(f"Error in WorkerAgent processing: {str(e)}")
+            raise AgentError(f"Error in WorkerAgent processing: {str(e)}")
+
+    async def process_async(self, input: str) -> str:
+        try:
+            thoughts = await self.tree_of_thought_async(input)
+            return await make_api_call_async(**self._build_synthesis_request(thoughts, input), **self._call_options("synthesize"))
         except AnthropicAPIError as e:
             logger.error(f"Error in WorkerAgent processing: {str(e)}")
             raise AgentError(f"Error in WorkerAgent processing: {str(e)}")
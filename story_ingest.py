@@ -0,0 +1,287 @@
+"""
+story_ingest.py
+
+This module implements multi-feed ingestion for the AI News Podcast Generation System.
+Several feeds are fetched concurrently and their items normalized into one story record.
+Coverage of the same story from several outlets is then collapsed, by canonical URL and
+by SimHash similarity of title and summary. The merged stories are ranked by how many
+sources covered them, then by recency.
+"""
+
+import concurrent.futures
+import contextvars
+import hashlib
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from config import Config
+from rss_feed_parser import RSSFeedError, RSSFeedParser
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid)$")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+# Title words describe the story itself, summaries add outlet-specific phrasing
+TITLE_WEIGHT = 2
+
+def canonicalize_url(url: Optional[str]) -> str:
+    """
+    Normalize a story link so the same article reached through different URLs compares equal.
+
+    The scheme, 'www.' prefix, fragment, trailing slash and tracking parameters are dropped
+    and the remaining query parameters are sorted.
+
+    Args:
+        url (Optional[str]): The link to normalize.
+
+    Returns:
+        str: The canonical form, or '' if there is no link.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key.lower())
+    ))
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+@lru_cache(maxsize=65536)
+def _token_signs(token: str) -> tuple:
+    value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=SIMHASH_BITS // 8).digest(), "big")
+    return tuple(1 if value >> bit & 1 else -1 for bit in range(SIMHASH_BITS))
+
+def _features(text: str) -> Counter:
+    return Counter(token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS)
+
+def simhash(title: str, summary: str = "") -> int:
+    """
+    Compute the 64-bit SimHash fingerprint of a story.
+
+    Near-identical texts get fingerprints that differ in only a few bits.
+
+    Args:
+        title (str): The story title; its words weigh TITLE_WEIGHT times more than summary words.
+        summary (str, optional): The story summary.
+
+    Returns:
+        int: The fingerprint, or 0 if the story has no usable words.
+    """
+    weights = _features(summary)
+    for token, count in _features(title).items():
+        weights[token] += count * TITLE_WEIGHT
+    if not weights:
+        return 0
+    vector = [0] * SIMHASH_BITS
+    for token, weight in weights.items():
+        vector = [total + weight * sign for total, sign in zip(vector, _token_signs(token))]
+    return sum(1 << bit for bit, total in enumerate(vector) if total > 0)
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+class StoryDeduplicator:
+    """
+    Incremental index that folds duplicate stories into clusters.
+
+    Fingerprints are split into max_distance + 1 bands. Two fingerprints within
+    max_distance bits of each other agree on at least one band, so only stories sharing
+    a band are compared and adding a story stays close to constant time.
+
+    Attributes:
+        max_distance (int): Largest Hamming distance at which two stories count as duplicates.
+        clusters (List[Dict]): One entry per distinct story with its 'story', 'sources' and 'order'.
+    """
+
+    def __init__(self, max_distance: int = None):
+        """
+        Initialize the StoryDeduplicator.
+
+        Args:
+            max_distance (int, optional): Duplicate threshold in bits. Defaults to Config.DEDUP_SIMHASH_MAX_DISTANCE.
+
+        Raises:
+            ValueError: If max_distance is negative or leaves no bits per band.
+        """
+        self.max_distance = Config.DEDUP_SIMHASH_MAX_DISTANCE if max_distance is None else max_distance
+        if not 0 <= self.max_distance < SIMHASH_BITS:
+            raise ValueError(f"max_distance must be between 0 and {SIMHASH_BITS - 1}")
+        self.clusters = []
+        self._by_url = {}
+        num_bands = self.max_distance + 1
+        edges = [SIMHASH_BITS * i // num_bands for i in range(num_bands + 1)]
+        self._band_masks = [((1 << (end - start)) - 1, start) for start, end in zip(edges, edges[1:])]
+        self._bands = [{} for _ in range(num_bands)]
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        return [fingerprint >> shift & mask for mask, shift in self._band_masks]
+
+    def _find(self, canonical_link: str, fingerprint: int) -> Optional[int]:
+        if canonical_link in self._by_url:
+            return self._by_url[canonical_link]
+        if not fingerprint:
+            return None
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for candidate, index in band.get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return index
+        return None
+
+    def add(self, story: Dict, source: str) -> bool:
+        """
+        Add a story, merging it into an existing cluster if it duplicates one.
+
+        Args:
+            story (Dict): The normalized story record.
+            source (str): The feed the story came from.
+
+        Returns:
+            bool: True if the story started a new cluster, False if it was a duplicate.
+        """
+        canonical_link = story['canonical_link']
+        fingerprint = simhash(story['title'], story['summary'])
+        index = self._find(canonical_link, fingerprint)
+        is_new = index is None
+        if is_new:
+            index = len(self.clusters)
+            self.clusters.append({'story': story, 'sources': [], 'order': index})
+        cluster = self.clusters[index]
+        if source not in cluster['sources']:
+            cluster['sources'].append(source)
+
+        if canonical_link:
+            self._by_url.setdefault(canonical_link, index)
+        if fingerprint:
+            for band, key in zip(self._bands, self._band_keys(fingerprint)):
+                band.setdefault(key, []).append((fingerprint, index))
+        return is_new
+
+    def top_stories(self, num_stories: int) -> List[Dict]:
+        """
+        Rank the distinct stories by source coverage, then recency, then feed order.
+
+        Args:
+            num_stories (int): The number of stories to return.
+
+        Returns:
+            List[Dict]: The representative story of each top cluster, with the feeds that
+                        covered it under 'sources'.
+        """
+        ranked = sorted(
+            self.clusters,
+            key=lambda cluster: (-len(cluster['sources']), -_timestamp(cluster['story']['published']), cluster['order'])
+        )
+        return [dict(cluster['story'], sources=list(cluster['sources'])) for cluster in ranked[:num_stories]]
+
+def _timestamp(published: Optional[datetime]) -> float:
+    return published.timestamp() if published else float("-inf")
+
+def normalize_story(item: Dict, source: str) -> Dict:
+    """
+    Convert a parsed feed item into the common story record.
+
+    Args:
+        item (Dict): A story as returned by RSSFeedParser.
+        source (str): The feed URL the item came from.
+
+    Returns:
+        Dict: 'title', 'summary', 'link', 'canonical_link', 'published' and 'source'.
+    """
+    link = item.get('link') or ""
+    return {
+        'title': (item.get('title') or "").strip(),
+        'summary': (item.get('summary') or "").strip(),
+        'link': link,
+        'canonical_link': canonicalize_url(link),
+        'published': item.get('published'),
+        'source': source
+    }
+
+class FeedIngestor:
+    """
+    Fetches several feeds concurrently and merges them into one deduplicated story list.
+
+    Attributes:
+        feed_urls (List[str]): The feeds, in priority order for ties.
+        parsers (List[RSSFeedParser]): One parser per feed.
+        stories_per_feed (int): Fresh stories requested from each feed before deduplication.
+    """
+
+    def __init__(self, feed_urls: Sequence[str], parser_factory: Callable[[str], RSSFeedParser] = RSSFeedParser,
+                 stories_per_feed: int = None, max_distance: int = None):
+        """
+        Initialize the FeedIngestor.
+
+        Args:
+            feed_urls (Sequence[str]): URLs of the feeds to ingest.
+            parser_factory (Callable[[str], RSSFeedParser], optional): Builds the parser for a feed URL.
+            stories_per_feed (int, optional): Stories taken from each feed. Defaults to Config.STORIES_PER_FEED.
+            max_distance (int, optional): SimHash duplicate threshold. Defaults to Config.DEDUP_SIMHASH_MAX_DISTANCE.
+        """
+        self.feed_urls = list(feed_urls)
+        self.parsers = [parser_factory(url) for url in self.feed_urls]
+        self.stories_per_feed = stories_per_feed or Config.STORIES_PER_FEED
+        self.max_distance = max_distance
+
+    def _fetch_all(self, num_stories: int, days: int) -> List[List[Dict]]:
+        per_feed = max(num_stories, self.stories_per_feed)
+        results = [[] for _ in self.parsers]
+        errors = []
+        max_workers = max(1, min(len(self.parsers), Config.FEED_POOL_SIZE))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_index = {
+                executor.submit(contextvars.copy_context().run, parser.get_top_stories, num_stories=per_feed, days=days): i
+                for i, parser in enumerate(self.parsers)
+            }
+            for future in concurrent.futures.as_completed(future_to_index):
+                i = future_to_index[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Feed {self.feed_urls[i]} failed: {str(e)}")
+                    errors.append(str(e))
+
+        if len(errors) == len(self.parsers):
+            raise RSSFeedError(f"All {len(self.parsers)} feeds failed: {'; '.join(errors)}")
+        return results
+
+    def get_top_stories(self, num_stories: int = 10, days: int = 7) -> List[Dict]:
+        """
+        Fetch every feed and return the top distinct stories across all of them.
+
+        A failing feed is logged and skipped; results are merged in feed order, so the
+        outcome does not depend on which feed answered first.
+
+        Args:
+            num_stories (int, optional): The number of stories to return. Defaults to 10.
+            days (int, optional): The number of days to look back for stories. Defaults to 7.
+
+        Returns:
+            List[Dict]: The top stories, each with 'title', 'summary', 'link', 'canonical_link',
+                        'published', 'source' and 'sources' keys.
+
+        Raises:
+            RSSFeedError: If every feed failed.
+        """
+        deduplicator = StoryDeduplicator(self.max_distance)
+        total = 0
+        for url, items in zip(self.feed_urls, self._fetch_all(num_stories, days)):
+            for item in items:
+                deduplicator.add(normalize_story(item, url), url)
+                total += 1
+        logger.info(f"Ingested {total} stories from {len(self.parsers)} feeds, {len(deduplicator.clusters)} distinct")
+        return deduplicator.top_stories(num_stories)
@@ -0,0 +1,143 @@
+"""
+story_store.py
+
+This module provides the persistent story store of the AI News Podcast Generation System.
+It keeps the per-story outputs of the News Editor and Journalist layers in SQLite, keyed by
+the story's canonical link plus a hash of its content. A daily run then only sends new or
+changed stories through the worker layers and reuses the stored analysis for the rest.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from config import Config
+from story_ingest import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+def story_key(story: Dict) -> str:
+    """
+    Build the store key of a story.
+
+    The key combines the canonical link (or the title, for stories without a link) with a
+    hash of the title and summary, so an edited story is treated as new.
+
+    Args:
+        story (Dict): The story record.
+
+    Returns:
+        str: The key.
+    """
+    identity = story.get('canonical_link') or canonicalize_url(story.get('link')) or story.get('title', "")
+    content = f"{story.get('title', '')}\n{story.get('summary', '')}"
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+    return f"{identity}#{content_hash}"
+
+class StoryStore:
+    """
+    A disk-backed store of per-story stage outputs.
+
+    The store is safe to share between threads; every operation is serialized
+    on a single SQLite connection.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+        ttl_seconds (Optional[float]): Age after which a stored output is processed again.
+        hits (int): Number of lookups answered from the store.
+        misses (int): Number of lookups that found nothing (or an expired output).
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the StoryStore.
+
+        Args:
+            path (str): Location of the SQLite database file. Parent directories are created.
+            ttl_seconds (float, optional): Output lifetime in seconds. Defaults to no expiry.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS story_outputs ("
+            "story_key TEXT NOT NULL, stage TEXT NOT NULL, title TEXT, output TEXT NOT NULL, "
+            "created_at REAL NOT NULL, PRIMARY KEY (story_key, stage))"
+        )
+        if ttl_seconds is not None:
+            self._conn.execute("DELETE FROM story_outputs WHERE created_at < ?", (time.time() - ttl_seconds,))
+
+    def get(self, story: Dict, stage: str) -> Optional[str]:
+        """
+        Look up the stored output of a stage for a story.
+
+        Args:
+            story (Dict): The story record.
+            stage (str): The stage name, e.g. 'news_editor'.
+
+        Returns:
+            Optional[str]: The stored output, or None if the story has to be processed.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output, created_at FROM story_outputs WHERE story_key = ? AND stage = ?",
+                (story_key(story), stage)
+            ).fetchone()
+            if row is None or (self.ttl_seconds is not None and time.time() - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, story: Dict, stage: str, output: str):
+        """
+        Store the output of a stage for a story.
+
+        Args:
+            story (Dict): The story record.
+            stage (str): The stage name.
+            output (str): The stage output.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO story_outputs (story_key, stage, title, output, created_at) VALUES (?, ?, ?, ?, ?)",
+                (story_key(story), stage, story.get('title'), output, time.time())
+            )
+
+    def stats(self) -> Dict:
+        """
+        Report store effectiveness.
+
+        Returns:
+            Dict: 'hits', 'misses' and the current number of stored 'entries'.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM story_outputs").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+_story_store = None
+_story_store_lock = threading.Lock()
+
+def get_story_store() -> StoryStore:
+    """Return the process-wide story store, creating it from Config on first use."""
+    global _story_store
+    with _story_store_lock:
+        if _story_store is None:
+            _story_store = StoryStore(Config.STORY_STORE_PATH, ttl_seconds=Config.STORY_STORE_TTL_SECONDS)
+        return _story_store
@@ -0,0 +1,560 @@
+"""
+task_queue.py
+
+This module provides the task queue of the distributed mode of the AI News Podcast
+Generation System. The coordinator submits worker agent runs and Tree of Thought node
+expansions as serializable tasks, task_worker.py processes on any number of nodes
+consume them, and the results flow back to the coordinator as they complete.
+
+Task IDs are derived from the task content and a per-run namespace, so submitting the
+same task again (a retried stage, a resumed run) joins the existing task or reuses its
+result instead of paying for the work twice. Two backends are provided: SQLite, for
+processes sharing a filesystem, and Redis, for nodes on different machines.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+from config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Task kinds: a complete agent run, and one Tree of Thought node expansion
+TASK_PROCESS = "agent.process"
+TASK_EXPAND = "tot.expand"
+
+class TaskQueueError(Exception):
+    """Custom exception class for task queue errors and failed tasks."""
+    pass
+
+def make_task_id(namespace: str, kind: str, payload: Dict) -> str:
+    """
+    Build the idempotent ID of a task.
+
+    Args:
+        namespace (str): Scope of the ID, normally the run ID, so identical work in different runs stays separate.
+        kind (str): The task kind.
+        payload (Dict): The JSON-serializable task arguments.
+
+    Returns:
+        str: A SHA-256 hex digest of the canonical JSON encoding of the task.
+    """
+    canonical = json.dumps({"namespace": namespace, "kind": kind, "payload": payload}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class Task:
+    """
+    A unit of work on the queue.
+
+    Attributes:
+        task_id (str): The idempotent task ID.
+        kind (str): The task kind, which selects the handler on the node.
+        payload (Dict): The JSON-serializable task arguments.
+        status (str): 'pending', 'running', 'done' or 'failed'.
+        attempts (int): Times a node has claimed the task.
+        node (Optional[str]): The node that claimed it last.
+        result (Any): The handler's JSON-serializable return value, once done.
+        error (Optional[str]): The failure message, once failed.
+    """
+
+    def __init__(self, task_id: str, kind: str, payload: Dict, status: str = PENDING, attempts: int = 0,
+                 node: Optional[str] = None, result: Any = None, error: Optional[str] = None):
+        self.task_id = task_id
+        self.kind = kind
+        self.payload = payload
+        self.status = status
+        self.attempts = attempts
+        self.node = node
+        self.result = result
+        self.error = error
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def output(self) -> Any:
+        """
+        Return the result of a finished task.
+
+        Raises:
+            TaskQueueError: If the task failed.
+        """
+        if self.status == FAILED:
+            raise TaskQueueError(f"Task {self.kind} {self.task_id[:12]} failed: {self.error}")
+        return self.result
+
+class TaskQueue:
+    """
+    Interface of the task queue backends.
+
+    A task is claimed under a lease of Config.TASK_LEASE_SECONDS that its node keeps
+    renewing. A task whose lease runs out (its node died) goes to the next node to claim
+    one, up to Config.TASK_MAX_ATTEMPTS claims.
+    """
+
+    def submit(self, task: Task) -> Task:
+        """
+        Add a task unless one with its ID exists; a failed task with the ID is queued again.
+
+        Args:
+            task (Task): The task.
+
+        Returns:
+            Task: The task as stored, which may already be running or done.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    def claim(self, node: str) -> Optional[Task]:
+        """Take the oldest pending task for node, or return None if there is none."""
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    def renew(self, task_id: str, node: str) -> bool:
+        """Extend node's lease on a task; False if node no longer holds it."""
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    def complete(self, task_id: str, node: str, result: Any) -> bool:
+        """Store the result of a running task; False if it had already finished elsewhere."""
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    def fail(self, task_id: str, node: str, error: str) -> bool:
+        """Mark a task held by node as failed; False if node no longer holds it."""
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Task]:
+        """Look up tasks by ID; unknown IDs are left out."""
+        raise NotImplementedError("This method should be implemented by subclasses")
+
+    def close(self):
+        pass
+
+class SQLiteTaskQueue(TaskQueue):
+    """
+    A task queue in a SQLite database.
+
+    Every process opens its own connection to the file, and claims take a write lock,
+    so processes on one machine (or on a shared filesystem with working locks) can
+    consume the queue together.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the SQLiteTaskQueue.
+
+        Args:
+            path (str): Location of the SQLite database file. Parent directories are created.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, node TEXT, lease_expires REAL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created_at)")
+
+    @staticmethod
+    def _task(row) -> Task:
+        task_id, kind, payload, status, attempts, node, result, error = row
+        return Task(task_id, kind, json.loads(payload), status, attempts, node,
+                    json.loads(result) if result is not None else None, error)
+
+    _COLUMNS = "task_id, kind, payload, status, attempts, node, result, error"
+
+    def _get(self, task_id: str) -> Optional[Task]:
+        row = self._conn.execute(f"SELECT {self._COLUMNS} FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return self._task(row) if row is not None else None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def submit(self, task: Task) -> Task:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO tasks (task_id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (task.task_id, task.kind, json.dumps(task.payload), PENDING, time.time())
+            )
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = 0, node = NULL, lease_expires = NULL, error = NULL "
+                "WHERE task_id = ? AND status = ?", (PENDING, task.task_id, FAILED)
+            )
+            return self._get(task.task_id)
+
+    def claim(self, node: str) -> Optional[Task]:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = ? WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, f"lease expired on all {Config.TASK_MAX_ATTEMPTS} attempts", RUNNING, now, Config.TASK_MAX_ATTEMPTS)
+            )
+            row = conn.execute(
+                "SELECT task_id FROM tasks WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY created_at LIMIT 1", (PENDING, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = ?, node = ?, attempts = attempts + 1, lease_expires = ? WHERE task_id = ?",
+                (RUNNING, node, now + Config.TASK_LEASE_SECONDS, row[0])
+            )
+            return self._get(row[0])
+
+    def _update(self, sql: str, params: tuple) -> bool:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount == 1
+
+    def renew(self, task_id: str, node: str) -> bool:
+        return self._update(
+            "UPDATE tasks SET lease_expires = ? WHERE task_id = ? AND status = ? AND node = ?",
+            (time.time() + Config.TASK_LEASE_SECONDS, task_id, RUNNING, node)
+        )
+
+    def complete(self, task_id: str, node: str, result: Any) -> bool:
+        # Whichever node finishes first wins, even one whose lease ran out: the work is already paid for
+        return self._update(
+            "UPDATE tasks SET status = ?, node = ?, result = ?, lease_expires = NULL WHERE task_id = ? AND status = ?",
+            (DONE, node, json.dumps(result), task_id, RUNNING)
+        )
+
+    def fail(self, task_id: str, node: str, error: str) -> bool:
+        return self._update(
+            "UPDATE tasks SET status = ?, error = ?, lease_expires = NULL WHERE task_id = ? AND status = ? AND node = ?",
+            (FAILED, error, task_id, RUNNING, node)
+        )
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Task]:
+        tasks = {}
+        with self._lock:
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(task_ids), 500):
+                batch = task_ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT {self._COLUMNS} FROM tasks WHERE task_id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                tasks.update((row[0], self._task(row)) for row in rows)
+        return tasks
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class RedisTaskQueue(TaskQueue):
+    """
+    A task queue in Redis, or any server speaking its protocol, for nodes on different machines.
+
+    Each task is a hash; pending task IDs wait in a list and the lease deadlines of
+    running tasks are kept in a sorted set.
+
+    Attributes:
+        client: The redis-py client.
+        prefix (str): Prefix of every key the queue uses.
+    """
+
+    def __init__(self, client, prefix: str = "podcast_moa:tasks"):
+        """
+        Initialize the RedisTaskQueue.
+
+        Args:
+            client: A redis-py client created with decode_responses=True.
+            prefix (str, optional): Prefix of every key the queue uses.
+        """
+        self.client = client
+        self.prefix = prefix
+        self._pending = f"{prefix}:pending"
+        self._leases = f"{prefix}:leases"
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisTaskQueue":
+        """
+        Connect to the server at a redis:// URL.
+
+        Raises:
+            ImportError: If the redis package is not installed.
+        """
+        if redis is None:
+            raise ImportError("The Redis task queue requires the redis package")
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.prefix}:task:{task_id}"
+
+    def _get(self, task_id: str) -> Optional[Task]:
+        fields = self.client.hgetall(self._key(task_id))
+        if not fields or "kind" not in fields:
+            return None
+        return Task(task_id, fields["kind"], json.loads(fields["payload"]), fields["status"], int(fields.get("attempts", 0)),
+                    fields.get("node") or None, json.loads(fields["result"]) if "result" in fields else None,
+                    fields.get("error") or None)
+
+    def _transition(self, task_id: str, check: Callable[[Dict[str, str], Optional[float]], bool],
+                    fields: Any, lease: Optional[float] = None) -> bool:
+        """
+        Update a task if check holds, atomically with respect to other writers.
+
+        The task hash is watched, so a concurrent write makes the transition start over
+        and check see the new state. A task moved to PENDING is queued in the same transaction.
+
+        Args:
+            task_id (str): The task.
+            check (Callable[[Dict[str, str], Optional[float]], bool]): Called with the task's current fields
+                and lease deadline; the update is applied only if it returns True.
+            fields (Any): The fields to set, or a function from the current fields to them.
+            lease (Optional[float]): New lease deadline; None removes the lease.
+
+        Returns:
+            bool: Whether the update was applied.
+        """
+        key = self._key(task_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    current = pipe.hgetall(key)
+                    if not check(current, pipe.zscore(self._leases, task_id)):
+                        pipe.unwatch()
+                        return False
+                    update = fields(current) if callable(fields) else fields
+                    pipe.multi()
+                    pipe.hset(key, mapping=update)
+                    if lease is None:
+                        pipe.zrem(self._leases, task_id)
+                    else:
+                        pipe.zadd(self._leases, {task_id: lease})
+                    if update.get("status") == PENDING:
+                        pipe.rpush(self._pending, task_id)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+
+    def submit(self, task: Task) -> Task:
+        # A new task, or a failed one submitted again, is queued; any other existing task is joined
+        self._transition(
+            task.task_id, lambda fields, lease: not fields or fields.get("status") == FAILED,
+            {"status": PENDING, "kind": task.kind, "payload": json.dumps(task.payload), "attempts": 0, "node": "", "error": ""}
+        )
+        return self._get(task.task_id)
+
+    def _reclaim_expired(self):
+        now = time.time()
+        for task_id in self.client.zrangebyscore(self._leases, 0, now):
+            # Checked again inside the transaction: the task may have been renewed or completed since the scan
+            self._transition(
+                task_id, lambda fields, lease: fields.get("status") == RUNNING and lease is not None and lease <= now,
+                lambda fields: (
+                    {"status": FAILED, "error": f"lease expired on all {Config.TASK_MAX_ATTEMPTS} attempts"}
+                    if int(fields.get("attempts") or 0) >= Config.TASK_MAX_ATTEMPTS else {"status": PENDING}
+                )
+            )
+
+    def claim(self, node: str) -> Optional[Task]:
+        self._reclaim_expired()
+        while True:
+            task_id = self.client.lpop(self._pending)
+            if task_id is None:
+                return None
+            claimed = self._transition(
+                task_id, lambda fields, lease: fields.get("status") == PENDING,
+                lambda fields: {"status": RUNNING, "node": node, "attempts": int(fields.get("attempts") or 0) + 1},
+                lease=time.time() + Config.TASK_LEASE_SECONDS
+            )
+            if claimed:
+                return self._get(task_id)
+
+    def renew(self, task_id: str, node: str) -> bool:
+        return self._transition(
+            task_id, lambda fields, lease: fields.get("status") == RUNNING and fields.get("node") == node,
+            {"node": node}, lease=time.time() + Config.TASK_LEASE_SECONDS
+        )
+
+    def complete(self, task_id: str, node: str, result: Any) -> bool:
+        return self._transition(
+            task_id, lambda fields, lease: fields.get("status") == RUNNING,
+            {"status": DONE, "node": node, "result": json.dumps(result)}
+        )
+
+    def fail(self, task_id: str, node: str, error: str) -> bool:
+        return self._transition(
+            task_id, lambda fields, lease: fields.get("status") == RUNNING and fields.get("node") == node,
+            {"status": FAILED, "error": error}
+        )
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Task]:
+        tasks = {task_id: self._get(task_id) for task_id in task_ids}
+        return {task_id: task for task_id, task in tasks.items() if task is not None}
+
+    def close(self):
+        self.client.close()
+
+def open_task_queue(url: str = None) -> TaskQueue:
+    """
+    Open the task queue at a URL.
+
+    Args:
+        url (str, optional): 'sqlite:///<path>' or 'redis://<host>:<port>/<db>'. Defaults to Config.TASK_QUEUE_URL.
+
+    Returns:
+        TaskQueue: The queue.
+
+    Raises:
+        TaskQueueError: If the URL scheme is not supported.
+    """
+    url = url or Config.TASK_QUEUE_URL
+    if url.startswith("sqlite:///"):
+        return SQLiteTaskQueue(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTaskQueue.from_url(url)
+    raise TaskQueueError(f"Unsupported task queue URL: {url}")
+
+class TaskDispatcher:
+    """
+    The coordinator's side of the queue: submits tasks and hands back their results as they finish.
+
+    Attributes:
+        queue (TaskQueue): The task queue.
+        namespace (str): Scope of the task IDs, normally the run ID, so a resumed run reuses
+            the results of the tasks it already completed.
+    """
+
+    def __init__(self, queue: TaskQueue, namespace: str = None):
+        """
+        Initialize the TaskDispatcher.
+
+        Args:
+            queue (TaskQueue): The task queue.
+            namespace (str, optional): Scope of the task IDs. Defaults to a random one.
+        """
+        self.queue = queue
+        self.namespace = namespace or uuid.uuid4().hex
+
+    def submit(self, kind: str, payload: Dict) -> str:
+        """
+        Submit a task, or join the identical task already on the queue.
+
+        Args:
+            kind (str): The task kind.
+            payload (Dict): The JSON-serializable task arguments.
+
+        Returns:
+            str: The task ID.
+        """
+        task = self.queue.submit(Task(make_task_id(self.namespace, kind, payload), kind, payload))
+        if task.status == DONE:
+            logger.debug(f"Reusing the result of completed task {kind} {task.task_id[:12]}")
+        return task.task_id
+
+    def _poll(self, waiting: List[str]) -> List[Task]:
+        tasks = self.queue.get_many(waiting)
+        finished = [tasks[task_id] for task_id in waiting if task_id in tasks and tasks[task_id].finished]
+        for task_id in waiting:
+            if task_id not in tasks:
+                raise TaskQueueError(f"Task {task_id[:12]} is missing from the queue")
+        return finished
+
+    def as_completed(self, task_ids: List[str], timeout: float = None) -> Iterator[Task]:
+        """
+        Yield tasks as they finish, successfully or not.
+
+        Args:
+            task_ids (List[str]): The tasks to wait for.
+            timeout (float, optional): Seconds to wait for all of them. Defaults to Config.TASK_TIMEOUT_SECONDS.
+
+        Yields:
+            Task: Each finished task.
+
+        Raises:
+            TaskQueueError: If tasks are still unfinished at the timeout.
+        """
+        deadline = time.monotonic() + (timeout or Config.TASK_TIMEOUT_SECONDS)
+        waiting = list(dict.fromkeys(task_ids))
+        while waiting:
+            for task in self._poll(waiting):
+                waiting.remove(task.task_id)
+                yield task
+            if waiting:
+                if time.monotonic() >= deadline:
+                    raise TaskQueueError(f"{len(waiting)} tasks did not finish in time")
+                time.sleep(Config.TASK_POLL_INTERVAL)
+
+    async def as_completed_async(self, task_ids: List[str], timeout: float = None) -> AsyncIterator[Task]:
+        """Asynchronous counterpart of as_completed; queue lookups run off the event loop."""
+        deadline = time.monotonic() + (timeout or Config.TASK_TIMEOUT_SECONDS)
+        waiting = list(dict.fromkeys(task_ids))
+        while waiting:
+            for task in await asyncio.to_thread(self._poll, waiting):
+                waiting.remove(task.task_id)
+                yield task
+            if waiting:
+                if time.monotonic() >= deadline:
+                    raise TaskQueueError(f"{len(waiting)} tasks did not finish in time")
+                await asyncio.sleep(Config.TASK_POLL_INTERVAL)
+
+    def run(self, kind: str, payload: Dict) -> Any:
+        """
+        Submit a task and wait for its result.
+
+        Raises:
+            TaskQueueError: If the task fails or times out.
+        """
+        task_id = self.submit(kind, payload)
+        for task in self.as_completed([task_id]):
+            return task.output()
+
+    async def run_async(self, kind: str, payload: Dict) -> Any:
+        task_id = await asyncio.to_thread(self.submit, kind, payload)
+        async for task in self.as_completed_async([task_id]):
+            return task.output()
+
+# The dispatcher of the running pipeline; agents send their Tree of Thought expansions through it
+_task_dispatcher = contextvars.ContextVar("task_dispatcher", default=None)
+
+def current_task_dispatcher() -> Optional[TaskDispatcher]:
+    return _task_dispatcher.get()
+
+@contextmanager
+def use_task_dispatcher(dispatcher: Optional[TaskDispatcher]) -> Iterator[Optional[TaskDispatcher]]:
+    """Route the Tree of Thought expansions of the enclosed block through dispatcher (None runs them locally)."""
+    token = _task_dispatcher.set(dispatcher)
+    try:
+        yield dispatcher
+    finally:
+        try:
+            _task_dispatcher.reset(token)
+        except ValueError:
+            # A generator holding the dispatcher was closed from another context
+            pass
@@ -0,0 +1,203 @@
+"""
+task_worker.py
+
+This module runs a node of the distributed mode of the AI News Podcast Generation System.
+It claims tasks from the shared task queue, runs them with this node's own API keys,
+connection pools and rate limits, and stores their results for the coordinator.
+
+Start one or more on any machine that can reach the queue:
+
+    python task_worker.py --queue redis://queue-host:6379/0 --concurrency 8
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+from base_agent import Agent, using_shared_context
+from config import Config
+from specific_agent_classes import ManagerAgent, WorkerAgent
+from task_queue import TASK_EXPAND, TASK_PROCESS, Task, TaskQueue, TaskQueueError, open_task_queue
+from tracing import span
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def build_agent(spec: Dict) -> Agent:
+    """
+    Rebuild an agent from its task_spec, using this node's Tavily API key.
+
+    Args:
+        spec (Dict): The agent description.
+
+    Returns:
+        Agent: The agent.
+
+    Raises:
+        TaskQueueError: If the agent role is not recognized.
+    """
+    if spec["role"] == WorkerAgent.ROLE:
+        agent = WorkerAgent(spec["name"], Config.TAVILY_API_KEY)
+    elif spec["role"] == ManagerAgent.ROLE:
+        agent = ManagerAgent(spec["name"], spec["agent_type"], Config.TAVILY_API_KEY)
+    else:
+        raise TaskQueueError(f"Unknown agent role: {spec['role']}")
+    agent.model = spec["model"]
+    agent.max_depth = spec["max_depth"]
+    agent.branching_factor = spec["branching_factor"]
+    return agent
+
+def run_process_task(payload: Dict) -> str:
+    """Run an agent over its input."""
+    return build_agent(payload["agent"]).process(payload["input"])
+
+def run_expand_task(payload: Dict) -> List[List]:
+    """Expand one Tree of Thought node; returns the evaluated children as [content, evaluation, rating] lists."""
+    agent = build_agent(payload["agent"])
+    with using_shared_context(payload["shared_context"]):
+        children = agent.evaluate_thoughts(agent.generate_thoughts(payload["content"], payload["depth"]))
+    return [[child.content, child.evaluation, child.rating] for child in children]
+
+TASK_HANDLERS: Dict[str, Callable[[Dict], Any]] = {
+    TASK_PROCESS: run_process_task,
+    TASK_EXPAND: run_expand_task,
+}
+
+class TaskWorker:
+    """
+    Consumes the task queue on this node.
+
+    Attributes:
+        queue (TaskQueue): The task queue.
+        node (str): This node's identifier.
+        concurrency (int): Tasks run at the same time.
+        handlers (Dict[str, Callable[[Dict], Any]]): Handler per task kind.
+        completed (int): Tasks this node finished successfully.
+        failed (int): Tasks this node failed.
+    """
+
+    def __init__(self, queue: TaskQueue, node: str = None, concurrency: int = None,
+                 handlers: Dict[str, Callable[[Dict], Any]] = None):
+        """
+        Initialize the TaskWorker.
+
+        Args:
+            queue (TaskQueue): The task queue.
+            node (str, optional): This node's identifier. Defaults to host name, process ID and a random suffix.
+            concurrency (int, optional): Tasks run at the same time. Defaults to Config.TASK_WORKER_CONCURRENCY.
+            handlers (Dict[str, Callable[[Dict], Any]], optional): Handler per task kind. Defaults to TASK_HANDLERS.
+        """
+        self.queue = queue
+        self.node = node or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency or Config.TASK_WORKER_CONCURRENCY
+        self.handlers = handlers or TASK_HANDLERS
+        self.completed = 0
+        self.failed = 0
+        self._held = set()
+        self._lock = threading.Lock()
+
+    def _execute(self, task: Task):
+        with self._lock:
+            self._held.add(task.task_id)
+        try:
+            with span("task.execute", kind=task.kind, attempt=task.attempts):
+                handler = self.handlers.get(task.kind)
+                if handler is None:
+                    raise TaskQueueError(f"Unknown task kind: {task.kind}")
+                result = handler(task.payload)
+            if not self.queue.complete(task.task_id, self.node, result):
+                logger.info(f"Task {task.kind} {task.task_id[:12]} was already finished by another node")
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            logger.error(f"Task {task.kind} {task.task_id[:12]} failed: {str(e)}")
+            self.queue.fail(task.task_id, self.node, str(e))
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._held.discard(task.task_id)
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one task.
+
+        Returns:
+            bool: False if the queue had no task to claim.
+        """
+        task = self.queue.claim(self.node)
+        if task is None:
+            return False
+        self._execute(task)
+        return True
+
+    def _renew_leases(self, stop: threading.Event):
+        # Renew well before the lease runs out, so slow tasks are not handed to another node
+        while not stop.wait(Config.TASK_LEASE_SECONDS / 3):
+            with self._lock:
+                held = list(self._held)
+            for task_id in held:
+                try:
+                    self.queue.renew(task_id, self.node)
+                except Exception as e:
+                    logger.warning(f"Could not renew the lease on task {task_id[:12]}: {str(e)}")
+
+    def _consume(self, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                logger.error(f"Could not claim a task: {str(e)}")
+                claimed = False
+            if not claimed:
+                stop.wait(Config.TASK_POLL_INTERVAL)
+
+    def serve(self, stop: Optional[threading.Event] = None):
+        """
+        Run tasks until stop is set (or forever).
+
+        Args:
+            stop (Optional[threading.Event]): Set it to finish the running tasks and return.
+        """
+        stop = stop or threading.Event()
+        threads = [threading.Thread(target=self._renew_leases, args=(stop,), name="task-lease", daemon=True)]
+        threads += [
+            threading.Thread(target=self._consume, args=(stop,), name=f"task-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Node {self.node} consuming tasks with {self.concurrency} threads")
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                # Join in short steps so Ctrl-C is handled
+                while thread.is_alive():
+                    thread.join(1)
+        except KeyboardInterrupt:
+            logger.info("Stopping after the running tasks finish")
+            stop.set()
+            for thread in threads:
+                thread.join()
+        logger.info(f"Node {self.node} finished: {self.completed} tasks completed, {self.failed} failed")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a task worker node for distributed podcast generation.")
+    parser.add_argument("--queue", default=None, help="Task queue URL; defaults to Config.TASK_QUEUE_URL")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Tasks run at the same time; defaults to Config.TASK_WORKER_CONCURRENCY")
+    parser.add_argument("--node", default=None, help="Identifier of this node in the queue")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    queue = open_task_queue(args.queue)
+    try:
+        TaskWorker(queue, node=args.node, concurrency=args.concurrency).serve()
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import api_utils
+import anthropic
+import hedging
+import httpx
+from api_utils import make_api_call, make_api_call_async, stream_api_call, stream_api_call_async, track_usage, AnthropicAPIError
+from base_agent import current_shared_context
+from hedging import HedgingPolicy
+from llm_cache import ResponseCache
+from model_router import ModelRouter
+from rate_limiter import RateLimitScheduler
+from specific_agent_classes import WorkerAgent
+
+def unlimited_scheduler():
+    return RateLimitScheduler(10 ** 6, 10 ** 9, 10 ** 9)
+
+class FakeRawResponse:
+    def __init__(self, message, headers):
+        self.message = message
+        self.headers = headers
+
+    def parse(self):
+        return self.message
+
+class FakeAsyncMessages:
+    def __init__(self, text="Fake response", delay=0.01, error=None, headers=None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.headers = headers or {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.with_raw_response = self
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            message = SimpleNamespace(
+                content=[SimpleNamespace(text=f" {self.text} ")],
+                usage=SimpleNamespace(input_tokens=10, output_tokens=5)
+            )
+            return FakeRawResponse(message, self.headers)
+        finally:
+            self.in_flight -= 1
+
+class FakeAsyncClient:
+    def __init__(self, **kwargs):
+        self.messages = FakeAsyncMessages(**kwargs)
+
+class FakeStream:
+    def __init__(self, chunks, error=None, headers=None):
+        self.chunks = chunks
+        self.error = error
+        self.response = SimpleNamespace(headers=headers or {})
+        self.produced = 0
+        self.closed = False
+
+    def _chunks(self):
+        for chunk in self.chunks:
+            self.produced += 1
+            yield chunk
+        if self.error:
+            raise self.error
+
+    @property
+    def text_stream(self):
+        return self._chunks()
+
+    def get_final_message(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=len(self.chunks)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+class FakeAsyncStream(FakeStream):
+    @property
+    def text_stream(self):
+        async def chunks():
+            for chunk in self._chunks():
+                await asyncio.sleep(0)
+                yield chunk
+        return chunks()
+
+    async def get_final_message(self):
+        return FakeStream.get_final_message(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+class FakeStreamingClient:
+    def __init__(self, stream):
+        self.stream_instance = stream
+        self.calls = []
+        self.messages = self
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.stream_instance
+
+class TestStreamApiCall(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache = ResponseCache(os.path.join(self.tmpdir.name, "cache.sqlite"))
+        self.addCleanup(self.cache.close)
+        for patcher in (patch.object(api_utils, '_response_cache', self.cache),
+                        patch.object(api_utils, 'get_rate_limiter', return_value=unlimited_scheduler())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.messages = [{"role": "user", "content": "hi"}]
+
+    def test_yields_chunks_as_they_arrive_and_caches_the_text(self):
+        stream = FakeStream(["  Hello", ", ", "world "])
+        with patch.object(api_utils, 'client', FakeStreamingClient(stream)):
+            chunks = stream_api_call("system", self.messages)
+            self.assertEqual(next(chunks), "Hello")
+            self.assertEqual(stream.produced, 1)
+            self.assertEqual(list(chunks), [", ", "world "])
+        self.assertTrue(stream.closed)
+        with patch.object(api_utils, 'client', None):
+            self.assertEqual(list(stream_api_call("system", self.messages)), ["Hello, world"])
+
+    def test_interrupted_stream_raises_and_is_not_cached(self):
+        error = anthropic.APIConnectionError(request=httpx.Request("POST", "https://api.anthropic.com"))
+        with patch.object(api_utils, 'client', FakeStreamingClient(FakeStream(["partial"], error=error))):
+            chunks = stream_api_call("system", self.messages)
+            self.assertEqual(next(chunks), "partial")
+            with self.assertRaises(AnthropicAPIError):
+                next(chunks)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_async_stream_releases_its_slot_when_consumer_stops(self):
+        stream = FakeAsyncStream(["one", "two", "three"])
+        with patch.object(api_utils, 'async_client', FakeStreamingClient(stream)), \
+             patch.object(api_utils.Config, 'MAX_CONCURRENT_REQUESTS', 1), \
+             patch.object(api_utils, '_async_limiters', api_utils.weakref.WeakKeyDictionary()):
+            chunks = stream_api_call_async("system", self.messages)
+            self.assertEqual(await chunks.__anext__(), "one")
+            self.assertTrue(api_utils.get_async_limiter().locked())
+            await chunks.aclose()
+            self.assertFalse(api_utils.get_async_limiter().locked())
+            self.assertTrue(stream.closed)
+
+            full = [chunk async for chunk in stream_api_call_async("system", [{"role": "user", "content": "again"}])]
+        self.assertEqual(full, ["one", "two", "three"])
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+class TestMakeApiCallAsync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = unlimited_scheduler()
+        for patcher in (patch.object(api_utils.Config, 'LLM_CACHE_ENABLED', False),
+                        patch.object(api_utils, 'get_rate_limiter', return_value=self.scheduler)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_returns_stripped_text(self):
+        fake = FakeAsyncClient(text="Hello")
+        with patch.object(api_utils, 'async_client', fake):
+            result = await make_api_call_async("system", [{"role": "user", "content": "hi"}], max_tokens=10000)
+        self.assertEqual(result, "Hello")
+        self.assertEqual(fake.messages.calls[0]["max_tokens"], 4096)
+
+    async def test_shared_concurrency_limit(self):
+        fake = FakeAsyncClient()
+        with patch.object(api_utils, 'async_client', fake), \
+             patch.object(api_utils.Config, 'MAX_CONCURRENT_REQUESTS', 5), \
+             patch.object(api_utils, '_async_limiters', api_utils.weakref.WeakKeyDictionary()):
+            results = await asyncio.gather(*(make_api_call_async("system", [{"role": "user", "content": str(i)}]) for i in range(50)))
+        self.assertEqual(len(results), 50)
+        self.assertEqual(fake.messages.max_in_flight, 5)
+
+    async def test_scheduler_adapts_to_response_headers(self):
+        fake = FakeAsyncClient(headers={
+            "anthropic-ratelimit-requests-limit": "1000",
+            "anthropic-ratelimit-output-tokens-limit": "20000",
+            "anthropic-ratelimit-output-tokens-remaining": "15000",
+        })
+        with patch.object(api_utils, 'async_client', fake):
+            await make_api_call_async("system", [{"role": "user", "content": "hi"}], max_tokens=100)
+        self.assertEqual(self.scheduler.buckets["requests"].capacity, 1000)
+        self.assertEqual(self.scheduler.buckets["output_tokens"].capacity, 20000)
+        # Reserved 100 output tokens but only 5 were used, so 95 are refunded on top of the header value
+        self.assertAlmostEqual(self.scheduler.buckets["output_tokens"].level, 15095, delta=1)
+
+    def test_rate_limit_wait_is_not_counted_as_latency(self):
+        scheduler = unlimited_scheduler()
+        acquire = scheduler.acquire
+        def slow_acquire(*args):
+            time.sleep(0.2)
+            return acquire(*args)
+        message = SimpleNamespace(content=[SimpleNamespace(text="ok")], usage=SimpleNamespace(input_tokens=1, output_tokens=1))
+        sync_client = SimpleNamespace(messages=SimpleNamespace(with_raw_response=SimpleNamespace(
+            create=lambda **kwargs: FakeRawResponse(message, {}))))
+        policy = HedgingPolicy()
+        with patch.object(api_utils, 'client', sync_client), patch.object(api_utils, 'get_rate_limiter', return_value=scheduler), \
+             patch.object(scheduler, 'acquire', slow_acquire), patch.object(hedging, '_hedging_policy', policy), \
+             patch.object(api_utils.Config, 'LLM_CACHE_ENABLED', False):
+            self.assertEqual(make_api_call("system", [{"role": "user", "content": "hi"}], call_site="worker.synthesize",
+                                           hedge=True), "ok")
+        site = policy.stats()["sites"]["worker.synthesize"]
+        self.assertEqual(site["count"], 1)
+        self.assertLess(site["mean"], 0.1)
+
+    async def test_error_raises_api_error(self):
+        fake = FakeAsyncClient(error=ValueError("boom"))
+        with patch.object(api_utils, 'async_client', fake), \
+             patch.object(api_utils._create_message_async.retry, 'sleep', new=lambda *args: asyncio.sleep(0)):
+            with self.assertRaises(AnthropicAPIError):
+                await make_api_call_async("system", [{"role": "user", "content": "hi"}])
+
+class TestMakeApiCallCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        cache = ResponseCache(os.path.join(self.tmpdir.name, "cache.sqlite"))
+        self.addCleanup(cache.close)
+        for patcher in (patch.object(api_utils, '_response_cache', cache),
+                        patch.object(api_utils, 'get_rate_limiter', return_value=unlimited_scheduler())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = cache
+
+    async def test_identical_request_served_from_cache(self):
+        fake = FakeAsyncClient(text="Cached")
+        messages = [{"role": "user", "content": "hi"}]
+        with patch.object(api_utils, 'async_client', fake):
+            first = await make_api_call_async("system", messages)
+            second = await make_api_call_async("system", messages)
+        self.assertEqual((first, second), ("Cached", "Cached"))
+        self.assertEqual(len(fake.messages.calls), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    async def test_use_cache_false_bypasses_cache(self):
+        fake = FakeAsyncClient()
+        messages = [{"role": "user", "content": "hi"}]
+        with patch.object(api_utils, 'async_client', fake):
+            await make_api_call_async("system", messages, use_cache=False)
+            await make_api_call_async("system", messages, use_cache=False)
+        self.assertEqual(len(fake.messages.calls), 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_unopenable_cache_falls_back_to_uncached_calls(self):
+        blocker = os.path.join(self.tmpdir.name, "not_a_directory")
+        open(blocker, "w").close()
+        fake = FakeAsyncClient(text="Uncached")
+        with patch.object(api_utils, '_response_cache', None), \
+             patch.object(api_utils.Config, 'LLM_CACHE_PATH', os.path.join(blocker, "cache.sqlite")), \
+             patch.object(api_utils, 'async_client', fake), self.assertLogs(api_utils.logger, "WARNING"):
+            self.assertEqual(await make_api_call_async("system", [{"role": "user", "content": "hi"}]), "Uncached")
+            self.assertIsNone(api_utils._response_cache)
+
+class PromptCachingMessages(FakeAsyncMessages):
+    """Echoes the prompt cache usage fields: a marked prefix is written on first use and readable once answered."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cached = set()
+
+    def _usage(self, kwargs):
+        first = kwargs["messages"][0]["content"][0]
+        if "cache_control" not in first:
+            return SimpleNamespace(input_tokens=10, output_tokens=5), None
+        prefix = (kwargs["system"], first["text"])
+        tokens = len(first["text"]) // 4
+        if prefix in self.cached:
+            return SimpleNamespace(input_tokens=10, output_tokens=5, cache_read_input_tokens=tokens,
+                                   cache_creation_input_tokens=0), None
+        return SimpleNamespace(input_tokens=10, output_tokens=5, cache_read_input_tokens=0,
+                               cache_creation_input_tokens=tokens), prefix
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        usage, written = self._usage(kwargs)
+        await asyncio.sleep(self.delay)
+        if written:
+            self.cached.add(written)
+        return FakeRawResponse(SimpleNamespace(content=[SimpleNamespace(text=self.text)], usage=usage), {})
+
+    def create_sync(self, **kwargs):
+        self.calls.append(kwargs)
+        usage, written = self._usage(kwargs)
+        time.sleep(self.delay)
+        if written:
+            self.cached.add(written)
+        return FakeRawResponse(SimpleNamespace(content=[SimpleNamespace(text=self.text)], usage=usage), {})
+
+class TestPromptCaching(unittest.IsolatedAsyncioTestCase):
+    CONTEXT = "Story text. " * 400
+
+    def setUp(self):
+        self.messages = PromptCachingMessages(text="1: sure", delay=0.02)
+        self.router = ModelRouter(routes={}, cascade=[], prices={"m": (1.0, 1.0)})
+        for patcher in (patch.object(api_utils.Config, 'LLM_CACHE_ENABLED', False),
+                        patch.dict(api_utils.Config.PROMPT_CACHE_MIN_TOKENS, {"m": 1024}),
+                        patch.object(api_utils, 'get_rate_limiter', return_value=unlimited_scheduler()),
+                        patch.object(api_utils, 'get_model_router', return_value=self.router),
+                        patch.object(api_utils, 'async_client', SimpleNamespace(messages=self.messages))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def call(self, prompt, context=CONTEXT):
+        return make_api_call_async("system", [{"role": "user", "content": prompt}], call_site="worker.generate",
+                                   model="m", shared_context=context)
+
+    async def test_shared_context_is_sent_first_as_a_cache_breakpoint(self):
+        await self.call("Generate 2 thoughts.")
+        request = self.messages.calls[0]
+        self.assertEqual(request["messages"][0]["content"], [
+            {"type": "text", "text": self.CONTEXT, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "Generate 2 thoughts."}
+        ])
+        self.assertEqual(request["extra_headers"], {"anthropic-beta": api_utils.Config.PROMPT_CACHING_BETA})
+
+    async def test_short_context_is_not_marked(self):
+        await self.call("Generate 2 thoughts.", context="Short story.")
+        request = self.messages.calls[0]
+        self.assertNotIn("cache_control", request["messages"][0]["content"][0])
+        self.assertNotIn("extra_headers", request)
+
+    async def test_minimum_prefix_is_per_model(self):
+        # About 1200 tokens: cacheable on "m", but below Haiku's 2048-token minimum
+        await make_api_call_async("system", [{"role": "user", "content": "hi"}], model=api_utils.Config.WORKER_MODEL,
+                                  shared_context=self.CONTEXT)
+        self.assertNotIn("cache_control", self.messages.calls[0]["messages"][0]["content"][0])
+        self.assertTrue(api_utils.is_cacheable_context(self.CONTEXT, "m"))
+        self.assertFalse(api_utils.is_cacheable_context(self.CONTEXT, "unlisted-model"))
+
+    async def test_deeper_nodes_leave_out_an_uncacheable_context(self):
+        worker = WorkerAgent("worker", "fake_tavily_key")
+        worker.max_depth = 2
+        worker.branching_factor = 1
+        self.messages.text = "1: maybe"
+        await worker.tree_of_thought_async(self.CONTEXT)
+        root, deeper = [call["messages"][0]["content"] for call in self.messages.calls if "diverse thoughts" in str(call["messages"])]
+        self.assertEqual(root[0]["text"], self.CONTEXT)
+        self.assertIsInstance(deeper, str)
+        self.assertNotIn(self.CONTEXT, deeper)
+
+    async def test_concurrent_fan_out_writes_the_prefix_once(self):
+        with track_usage() as usage:
+            await asyncio.gather(*(self.call(f"Generate thoughts, worker {i}.") for i in range(3)))
+        prefix_tokens = len(self.CONTEXT) // 4
+        self.assertEqual(usage.cache_write_tokens, prefix_tokens)
+        self.assertEqual(usage.cache_read_tokens, 2 * prefix_tokens)
+        route = self.router.stats()[("worker.generate", "m")]
+        self.assertEqual((route["cache_write_tokens"], route["cache_read_tokens"]), (prefix_tokens, 2 * prefix_tokens))
+        # 30 uncached input and 15 output tokens, plus the write at 1.25x and the reads at 0.1x the input price
+        self.assertAlmostEqual(route["cost"], (45 + 1.25 * prefix_tokens + 0.2 * prefix_tokens) / 1e6)
+
+    async def test_worker_thought_generation_leads_with_its_input(self):
+        worker = WorkerAgent("worker", "fake_tavily_key")
+        worker.max_depth = 1
+        await worker.tree_of_thought_async(self.CONTEXT)
+        generation = next(call for call in self.messages.calls if "diverse thoughts" in str(call["messages"]))
+        blocks = generation["messages"][0]["content"]
+        self.assertEqual(blocks[0]["text"], self.CONTEXT)
+        self.assertEqual(blocks[1]["text"], f"Generate {worker.branching_factor} diverse thoughts on the material above.")
+        self.assertIsNone(current_shared_context())
+
+    async def test_threaded_fan_out_writes_the_prefix_once(self):
+        sync_client = SimpleNamespace(messages=SimpleNamespace(with_raw_response=SimpleNamespace(create=self.messages.create_sync)))
+        with patch.object(api_utils, 'client', sync_client), track_usage() as usage:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, make_api_call, "system",
+                                    [{"role": "user", "content": f"worker {i}"}], shared_context=self.CONTEXT, model="m")
+                    for i in range(3)
+                ]
+                concurrent.futures.wait(futures)
+        self.assertEqual(usage.cache_write_tokens, len(self.CONTEXT) // 4)
+        self.assertEqual(usage.cache_read_tokens, 2 * (len(self.CONTEXT) // 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import api_utils
+from base_agent import Agent, SearchBudget, Thought
+from config import Config
+
+class StubAgent(Agent):
+    """Agent whose thoughts are derived from the prompt so the search tree is predictable."""
+    def __init__(self, evaluation="maybe", delay=0.0, **kwargs):
+        super().__init__("Stub", "stub-model", "fake_tavily_key", **kwargs)
+        self.evaluation = evaluation
+        self.delay = delay
+        self.expanded = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def generate_thoughts(self, prompt, depth):
+        with self.lock:
+            self.expanded.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return [Thought(f"{prompt}.{i}") for i in range(self.branching_factor)]
+
+    def evaluate_thoughts(self, thoughts):
+        for thought in thoughts:
+            thought.evaluation = self.evaluation
+        return thoughts
+
+    async def generate_thoughts_async(self, prompt, depth):
+        return self.generate_thoughts(prompt, depth)
+
+    async def evaluate_thoughts_async(self, thoughts):
+        return self.evaluate_thoughts(thoughts)
+
+class TestTreeOfThought(unittest.TestCase):
+    def test_returns_first_leaves_in_bfs_order(self):
+        agent = StubAgent(max_depth=2, branching_factor=2)
+        solution = agent.tree_of_thought("root")
+        self.assertEqual([t.content for t in solution], ["root.0.0", "root.0.1"])
+
+    def test_stops_once_enough_sure_solutions(self):
+        agent = StubAgent(evaluation="sure", max_depth=3, branching_factor=2)
+        solution = agent.tree_of_thought("root")
+        self.assertEqual([t.content for t in solution], ["root.0", "root.1"])
+        self.assertEqual(agent.expanded, ["root"])
+
+    def test_impossible_children_are_pruned(self):
+        agent = StubAgent(evaluation="impossible", max_depth=3, branching_factor=2)
+        self.assertEqual(agent.tree_of_thought("root"), [])
+        self.assertEqual(agent.expanded, ["root"])
+
+    def test_level_is_expanded_concurrently(self):
+        agent = StubAgent(delay=0.05, max_depth=3, branching_factor=3)
+        with patch.object(Config, 'TOT_MAX_PARALLEL_EXPANSIONS', 3):
+            agent.tree_of_thought("root")
+        self.assertEqual(agent.max_in_flight, 3)
+        self.assertEqual(len(agent.expanded), 1 + 3 + 9)
+
+class TestTreeOfThoughtAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_matches_sync_search(self):
+        sync_solution = StubAgent(max_depth=3, branching_factor=3).tree_of_thought("root")
+        async_solution = await StubAgent(max_depth=3, branching_factor=3).tree_of_thought_async("root")
+        self.assertEqual([t.content for t in async_solution], [t.content for t in sync_solution])
+
+class MeteredAgent(StubAgent):
+    """StubAgent whose generations and evaluations each record one 10-token API call; thoughts ending in '.1' rate 8, others 5."""
+    def generate_thoughts(self, prompt, depth):
+        api_utils._record_usage(input_tokens=8, output_tokens=2)
+        return super().generate_thoughts(prompt, depth)
+
+    def evaluate_thoughts(self, thoughts):
+        api_utils._record_usage(input_tokens=8, output_tokens=2)
+        for thought in thoughts:
+            thought.evaluation = self.evaluation
+            thought.rating = 8 if thought.content.endswith(".1") else 5
+        return thoughts
+
+class TestBeamSearch(unittest.TestCase):
+    def beam_agent(self, beam_width, **kwargs):
+        agent = MeteredAgent(**kwargs)
+        agent.search_mode = "beam"
+        agent.beam_width = beam_width
+        return agent
+
+    def test_keeps_only_the_best_scored_thoughts(self):
+        agent = self.beam_agent(beam_width=1, max_depth=3, branching_factor=2)
+        solution = agent.tree_of_thought("root")
+        self.assertEqual(agent.expanded, ["root", "root.1", "root.1.1"])
+        self.assertEqual([t.content for t in solution], ["root.1.1.1", "root.1.1.0"])
+        self.assertAlmostEqual(solution[1].score, (0.8 * 2 + 0.5) / 3)
+
+    def test_call_budget_returns_the_best_thoughts_so_far(self):
+        agent = self.beam_agent(beam_width=2, max_depth=3, branching_factor=2)
+        with api_utils.track_usage() as usage:
+            solution = agent.beam_search("root", SearchBudget(max_calls=4))
+        self.assertEqual(usage.calls, 4)
+        self.assertEqual(agent.expanded, ["root", "root.1"])
+        self.assertEqual([t.content for t in solution], ["root.1.1", "root.1.0"])
+
+    def test_token_budget(self):
+        agent = self.beam_agent(beam_width=2, max_depth=3, branching_factor=2)
+        agent.beam_search("root", SearchBudget(max_tokens=30))
+        self.assertEqual(agent.expanded, ["root"])
+
+    def test_deadline_abandons_unfinished_expansions(self):
+        agent = self.beam_agent(beam_width=2, max_depth=3, branching_factor=2, delay=0.2)
+        start = time.monotonic()
+        solution = agent.beam_search("root", SearchBudget(seconds=0.3))
+        self.assertLess(time.monotonic() - start, 0.45)
+        # The second level did not finish in time, so its parents are returned
+        self.assertEqual([t.content for t in solution], ["root.1", "root.0"])
+
+    def test_unrated_thoughts_score_by_label(self):
+        root = Thought("root")
+        child = Thought("child", "maybe", parent=root)
+        rated = Thought("rated", "maybe", parent=child, rating=9)
+        child.rate()
+        self.assertAlmostEqual(rated.rate(), (Config.TOT_EVALUATION_SCORES["maybe"] + 0.9) / 2)
+
+    def test_abandoned_level_stops_before_evaluating(self):
+        agent = self.beam_agent(beam_width=2, max_depth=3, branching_factor=2, delay=0.2)
+        evaluated = []
+        evaluate = agent.evaluate_thoughts
+        def counting_evaluate(thoughts):
+            evaluated.extend(thought.content for thought in thoughts)
+            return evaluate(thoughts)
+        agent.evaluate_thoughts = counting_evaluate
+        agent.beam_search("root", SearchBudget(seconds=0.3))
+        # Let the second level's generations finish in the background
+        time.sleep(0.3)
+        self.assertEqual(evaluated, ["root.0", "root.1"])
+
+    def test_exhausted_budget_returns_no_thoughts(self):
+        solution = self.beam_agent(beam_width=2, max_depth=2, branching_factor=2).beam_search("root", SearchBudget(max_calls=0))
+        self.assertEqual(solution, [])
+
+class TestBeamSearchAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_matches_sync_search(self):
+        agents = [MeteredAgent(max_depth=3, branching_factor=2) for _ in range(2)]
+        for agent in agents:
+            agent.search_mode = "beam"
+            agent.beam_width = 1
+        sync_solution = agents[0].tree_of_thought("root")
+        async_solution = await agents[1].tree_of_thought_async("root")
+        self.assertEqual([t.content for t in async_solution], [t.content for t in sync_solution])
+
+    async def test_deadline_cancels_unfinished_expansions(self):
+        agent = MeteredAgent(max_depth=3, branching_factor=2)
+        async def slow_generate(prompt, depth):
+            await asyncio.sleep(0.2 if depth > 1 else 0)
+            return agent.generate_thoughts(prompt, depth)
+        agent.generate_thoughts_async = slow_generate
+        solution = await agent.beam_search_async("root", SearchBudget(seconds=0.05))
+        self.assertEqual([t.content for t in solution], ["root.1", "root.0"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+import api_utils
+from batch import load_episodes, run_batch, format_report, BatchConfigError
+from config import Config
+
+class TestLoadEpisodes(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, data):
+        path = os.path.join(self.tmpdir.name, "episodes.json")
+        with open(path, "w") as f:
+            json.dump(data, f)
+        return path
+
+    def test_loads_valid_file(self):
+        episodes = [{"name": "ai", "rss_feed_url": "http://a"}, {"name": "robots", "rss_feed_url": "http://b"}]
+        self.assertEqual(load_episodes(self.write(episodes)), episodes)
+
+    def test_rejects_duplicate_names(self):
+        with self.assertRaises(BatchConfigError):
+            load_episodes(self.write([{"name": "ai", "rss_feed_url": "http://a"}] * 2))
+
+    def test_rejects_missing_feed(self):
+        with self.assertRaises(BatchConfigError):
+            load_episodes(self.write([{"name": "ai"}]))
+
+class TestRunBatch(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(Config, 'RUNS_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('batch.MoAFramework')
+    async def test_runs_episodes_concurrently_with_per_episode_usage(self, mock_framework):
+        in_flight = []
+        max_in_flight = []
+
+        def make_framework(rss_feed_url, tavily_api_key):
+            framework = MagicMock()
+
+            async def generate(checkpoint):
+                in_flight.append(rss_feed_url)
+                max_in_flight.append(len(in_flight))
+                calls = 2 if rss_feed_url == "http://a" else 3
+                for _ in range(calls):
+                    await asyncio.sleep(0.01)
+                    api_utils._record_usage(100, 10)
+                in_flight.remove(rss_feed_url)
+                if rss_feed_url == "http://c":
+                    raise Exception("Feed down")
+                return f"Script for {rss_feed_url}"
+
+            framework.generate_podcast_script_async = generate
+            return framework
+
+        mock_framework.side_effect = make_framework
+        completed = []
+        episodes = [
+            {"name": "a", "rss_feed_url": "http://a"},
+            {"name": "b", "rss_feed_url": "http://b"},
+            {"name": "c", "rss_feed_url": "http://c"},
+        ]
+        result = await run_batch(episodes, "fake_tavily_key", on_episode_complete=completed.append)
+
+        self.assertEqual(max(max_in_flight), 3)
+        self.assertEqual([r["status"] for r in result["episodes"]], ["ok", "ok", "failed"])
+        self.assertEqual(result["episodes"][0]["script"], "Script for http://a")
+        self.assertEqual([r["usage"]["calls"] for r in result["episodes"]], [2, 3, 3])
+        self.assertEqual(result["usage"]["calls"], 8)
+        self.assertEqual(result["usage"]["input_tokens"], 800)
+        self.assertEqual(len(completed), 3)
+
+        report = format_report(result)
+        self.assertIn("2/3 episodes", report)
+        self.assertIn("8 calls", report)
+
+if __name__ == '__main__':
+    unittest.main()
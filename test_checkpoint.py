@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from datetime import datetime
+from checkpoint import RunCheckpoint, CheckpointError, compute_input_hash
+
+class TestRunCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_stage_round_trip_across_load(self):
+        checkpoint = RunCheckpoint.create(self.tmpdir.name, "run1")
+        stories = [{"title": "T", "summary": "S", "link": "L", "published": datetime(2024, 7, 1)}]
+        checkpoint.record_input(stories)
+        checkpoint.save_stage("stories", stories)
+        checkpoint.save_stage("news_editor", "edited")
+
+        resumed = RunCheckpoint.load(self.tmpdir.name, "run1")
+        self.assertTrue(resumed.has_stage("news_editor"))
+        self.assertFalse(resumed.has_stage("journalist"))
+        self.assertEqual(resumed.load_stage("stories"), stories)
+        self.assertEqual(resumed.load_stage("news_editor"), "edited")
+        self.assertEqual(resumed.input_hash, compute_input_hash(stories))
+
+    def test_changed_input_is_refused_once_later_stages_are_done(self):
+        checkpoint = RunCheckpoint.create(self.tmpdir.name, "run1")
+        checkpoint.record_input([{"title": "Old"}])
+        with self.assertLogs("checkpoint", "WARNING"):
+            checkpoint.record_input([{"title": "New"}])
+        checkpoint.save_stage("news_editor", "edited")
+        checkpoint.record_input([{"title": "New"}])
+        resumed = RunCheckpoint.load(self.tmpdir.name, "run1")
+        with self.assertRaises(CheckpointError):
+            resumed.record_input([{"title": "Newer"}])
+        self.assertEqual(resumed.input_hash, compute_input_hash([{"title": "New"}]))
+
+    def test_generated_run_ids_are_unique(self):
+        first = RunCheckpoint.create(self.tmpdir.name)
+        second = RunCheckpoint.create(self.tmpdir.name)
+        self.assertNotEqual(first.run_id, second.run_id)
+
+    def test_load_unknown_run_raises(self):
+        with self.assertRaises(CheckpointError):
+            RunCheckpoint.load(self.tmpdir.name, "missing")
+
+    def test_load_incomplete_stage_raises(self):
+        checkpoint = RunCheckpoint.create(self.tmpdir.name, "run1")
+        with self.assertRaises(CheckpointError):
+            checkpoint.load_stage("journalist")
+
+if __name__ == '__main__':
+    unittest.main()
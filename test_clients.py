@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import clients
+from clients import ClientRegistry
+from moa_framework import LazyAgentMap, MoAFramework
+from specific_agent_classes import ManagerAgent, WorkerAgent
+
+class TestClientRegistry(unittest.TestCase):
+    def test_anthropic_pool_is_sized_and_shared(self):
+        registry = ClientRegistry(pool_size=8, keepalive=16)
+        client = registry.anthropic_client()
+        pool = client._client._transport._pool
+        self.assertIs(registry.anthropic_client(), client)
+        self.assertEqual((pool._max_connections, pool._max_keepalive_connections), (8, 8))
+        registry.close()
+
+    def test_tavily_client_is_shared_per_key(self):
+        registry = ClientRegistry()
+        with patch.object(clients, '_client_registry', registry):
+            first = WorkerAgent("a", "key-1")
+            second = ManagerAgent("b", "News Editor", "key-1")
+            other = WorkerAgent("c", "key-2")
+            self.assertIs(first.tavily_client, second.tavily_client)
+            self.assertIsNot(first.tavily_client, other.tavily_client)
+            self.assertEqual(other.tavily_client.api_key, "key-2")
+
+class TestLazyAgents(unittest.TestCase):
+    def test_agents_are_built_once_on_first_use(self):
+        factory = MagicMock(side_effect=lambda: ["worker"])
+        agents = LazyAgentMap({"news_editor": factory, "journalist": factory})
+        self.assertIn("journalist", agents)
+        self.assertEqual(agents.built(), [])
+        self.assertIs(agents["news_editor"], agents["news_editor"])
+        self.assertEqual((factory.call_count, agents.built()), (1, ["news_editor"]))
+
+    def test_assigned_agents_replace_the_factory(self):
+        agents = LazyAgentMap({"news_editor": MagicMock()})
+        agents["news_editor"] = ["stub"]
+        agents["extra"] = ["other"]
+        self.assertEqual(dict(agents), {"news_editor": ["stub"], "extra": ["other"]})
+
+    @patch('moa_framework.WorkerAgent')
+    @patch('moa_framework.ManagerAgent')
+    @patch('moa_framework.ChiefEditorAgent')
+    def test_framework_constructs_no_agents_up_front(self, chief_editor, manager, worker):
+        framework = MoAFramework("fake_rss_url", "fake_tavily_key")
+        self.assertEqual((chief_editor.call_count, manager.call_count, worker.call_count), (0, 0, 0))
+        self.assertEqual(len(framework.worker_agents["journalist"]), clients.Config.MAX_WORKERS)
+        self.assertIs(framework.chief_editor, chief_editor.return_value)
+        self.assertEqual((chief_editor.call_count, manager.call_count), (1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import unittest
+from dataflow import run_pipeline, run_pipeline_async
+
+class TestRunPipeline(unittest.TestCase):
+    def test_outputs_follow_item_order(self):
+        stages = [
+            ("double", lambda index, value: value * 2, 3),
+            ("label", lambda index, value: f"{index}:{value}", 2)
+        ]
+        results = run_pipeline([1, 2, 3, 4, 5], stages, queue_size=2)
+        self.assertEqual(results, [[2, 4, 6, 8, 10], ["0:2", "1:4", "2:6", "3:8", "4:10"]])
+
+    def test_item_advances_while_others_are_still_upstream(self):
+        second_stage_started = threading.Event()
+
+        def first(index, value):
+            if index == 0:
+                # Block the first item until another item has reached the second stage
+                self.assertTrue(second_stage_started.wait(5))
+            return value
+
+        def second(index, value):
+            second_stage_started.set()
+            return value + 1
+
+        results = run_pipeline([10, 20], [("first", first, 2), ("second", second, 1)], queue_size=1)
+        self.assertEqual(results[1], [11, 21])
+
+    def test_bounded_queue_limits_items_ahead_of_slow_stage(self):
+        lock = threading.Lock()
+        state = {"produced": 0, "consumed": 0, "max_ahead": 0}
+        gate = threading.Event()
+
+        def produce(index, value):
+            with lock:
+                state["produced"] += 1
+                state["max_ahead"] = max(state["max_ahead"], state["produced"] - state["consumed"])
+            return value
+
+        def consume(index, value):
+            gate.wait(0.01)
+            with lock:
+                state["consumed"] += 1
+            return value
+
+        run_pipeline(list(range(20)), [("produce", produce, 1), ("consume", consume, 1)], queue_size=2)
+        # One item in the consumer, two queued, one held by the blocked producer
+        self.assertLessEqual(state["max_ahead"], 4)
+
+    def test_first_error_is_raised_and_rest_skipped(self):
+        calls = []
+
+        def fail(index, value):
+            calls.append(index)
+            raise RuntimeError(f"bad item {index}")
+
+        with self.assertRaisesRegex(RuntimeError, "bad item 0"):
+            run_pipeline(list(range(50)), [("fail", fail, 1), ("never", lambda i, v: v, 1)], queue_size=1)
+        self.assertLess(len(calls), 50)
+
+    def test_empty_input(self):
+        self.assertEqual(run_pipeline([], [("a", lambda i, v: v, 2), ("b", lambda i, v: v, 2)], 1), [[], []])
+
+class TestRunPipelineAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_outputs_follow_item_order(self):
+        async def slow_first(index, value):
+            await asyncio.sleep(0.05 if index == 0 else 0)
+            return value * 2
+
+        async def label(index, value):
+            return f"{index}:{value}"
+
+        results = await run_pipeline_async([1, 2, 3], [("double", slow_first, 3), ("label", label, 1)], queue_size=1)
+        self.assertEqual(results, [[2, 4, 6], ["0:2", "1:4", "2:6"]])
+
+    async def test_error_is_raised(self):
+        async def fail(index, value):
+            raise ValueError("broken")
+
+        with self.assertRaises(ValueError):
+            await run_pipeline_async([1, 2, 3], [("fail", fail, 2)], queue_size=1)
+
+if __name__ == '__main__':
+    unittest.main()
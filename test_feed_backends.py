@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import feed_backends
+from feed_backends import (XMLFeedBackend, HTMLFeedBackend, detect_backend, get_backend,
+                           select_fresh_stories)
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>AI News</title>
+<item><title>First &amp; best</title><link>https://example.com/1</link>
+<description>&lt;b&gt;Bold&lt;/b&gt; summary</description><pubDate>Mon, 01 Jul 2024 10:00:00 GMT</pubDate></item>
+<item><title>Undated</title><link>https://example.com/2</link><description>No date</description></item>
+<item><title>Second</title><guid>https://example.com/3</guid><description>Two</description>
+<pubDate>Sun, 30 Jun 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>AI News</title>
+<entry><title>Atom story</title><link rel="self" href="https://example.com/self"/>
+<link href="https://example.com/atom"/><summary>Atom summary</summary>
+<updated>2024-07-01T10:00:00Z</updated></entry>
+</feed>"""
+
+HTML = b"""<html><body><div class="header">Site</div>
+<div class="news-item"><h3 class="news-title"> HTML story </h3><p class="news-summary">HTML summary</p>
+<a class="news-link" href="https://example.com/html">Read</a><span class="news-date">July 01, 2024</span></div>
+</body></html>"""
+
+class TestBackends(unittest.TestCase):
+    def test_rss_items(self):
+        stories = list(XMLFeedBackend().iter_stories(RSS))
+        self.assertEqual([s['title'] for s in stories], ["First & best", "Second"])
+        self.assertEqual(stories[0]['summary'], "Bold summary")
+        self.assertEqual(stories[1]['link'], "https://example.com/3")
+        self.assertIsNone(stories[0]['published'].tzinfo)
+
+    def test_atom_entries(self):
+        stories = list(XMLFeedBackend().iter_stories(ATOM))
+        self.assertEqual(len(stories), 1)
+        self.assertEqual(stories[0]['link'], "https://example.com/atom")
+        self.assertEqual(stories[0]['summary'], "Atom summary")
+
+    def test_html_items_with_lxml_and_soup(self):
+        lxml_stories = list(HTMLFeedBackend().iter_stories(HTML))
+        with patch.object(feed_backends, 'lxml', None):
+            soup_stories = list(HTMLFeedBackend().iter_stories(HTML))
+        expected = [{'title': "HTML story", 'summary': "HTML summary", 'link': "https://example.com/html",
+                     'published': datetime(2024, 7, 1)}]
+        self.assertEqual(soup_stories, expected)
+        if feed_backends.lxml is not None:
+            self.assertEqual(lxml_stories, expected)
+
+    def test_detect_backend(self):
+        self.assertIsInstance(detect_backend(RSS), XMLFeedBackend)
+        self.assertIsInstance(detect_backend(b"\n" + ATOM), XMLFeedBackend)
+        self.assertIsInstance(detect_backend(HTML), HTMLFeedBackend)
+        self.assertIsInstance(get_backend("html", RSS), HTMLFeedBackend)
+        with self.assertRaises(ValueError):
+            get_backend("json", RSS)
+
+class TestSelectFreshStories(unittest.TestCase):
+    def test_filters_before_truncating_and_stops_early(self):
+        now = datetime.now()
+        consumed = []
+
+        def stories():
+            for i, age in enumerate([30, 1, 40, 2, 3, 4]):
+                consumed.append(i)
+                yield {'title': str(i), 'published': now - timedelta(days=age)}
+
+        selected = select_fresh_stories(stories(), 2, now - timedelta(days=7))
+        self.assertEqual([s['title'] for s in selected], ["1", "3"])
+        self.assertEqual(consumed, [0, 1, 2, 3])
+
+if __name__ == '__main__':
+    unittest.main()
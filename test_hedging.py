@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+import hedging
+from hedging import HedgingPolicy, LatencyHistogram, format_latency_report, hedged_call, hedged_call_async
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_quantiles_within_bucket_resolution(self):
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 100)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.5, delta=0.05)
+        self.assertAlmostEqual(histogram.quantile(0.95), 0.95, delta=0.1)
+
+    def test_empty_histogram_has_no_quantile(self):
+        self.assertIsNone(LatencyHistogram().quantile(0.95))
+
+    def test_latencies_beyond_last_bucket_are_clamped(self):
+        histogram = LatencyHistogram()
+        histogram.record(10 ** 6)
+        self.assertEqual(histogram.quantile(0.5), LatencyHistogram.BOUNDS[-1])
+
+class TestHedgingPolicy(unittest.TestCase):
+    def test_deadline_needs_min_samples(self):
+        policy = HedgingPolicy(quantile=0.95, min_samples=3, budget_ratio=0.1)
+        policy.record("worker.generate", 0.2)
+        policy.record("worker.generate", 0.2)
+        self.assertIsNone(policy.deadline("worker.generate"))
+        policy.record("worker.generate", 0.2)
+        self.assertAlmostEqual(policy.deadline("worker.generate"), 0.2, delta=0.02)
+
+    def test_budget_caps_hedges(self):
+        policy = HedgingPolicy(min_samples=1, budget_ratio=0.1)
+        for _ in range(20):
+            policy.start_call()
+        self.assertTrue(policy.try_hedge())
+        self.assertTrue(policy.try_hedge())
+        self.assertFalse(policy.try_hedge())
+        self.assertEqual(policy.stats()["hedges"], 2)
+
+class HedgedCallTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.policy = HedgingPolicy(quantile=0.95, min_samples=5, budget_ratio=1.0)
+        for _ in range(5):
+            self.policy.record("worker.synthesize", 0.02)
+        patcher = patch.object(hedging, '_hedging_policy', self.policy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+class TestHedgedCall(HedgedCallTestCase):
+    def straggler_then_fast(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def call(value):
+            calls.append(value)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+        return call, calls, release
+
+    def test_straggler_is_hedged_and_duplicate_wins(self):
+        call, calls, release = self.straggler_then_fast()
+        self.assertEqual(hedged_call("worker.synthesize", True, call, "x"), "fast")
+        self.assertEqual(calls, ["x", "x"])
+        self.assertFalse(release.is_set())
+        stats = self.policy.stats()
+        self.assertEqual((stats["hedges"], stats["hedge_wins"]), (1, 1))
+
+    def test_duplicate_waits_for_its_budget_outside_its_latency(self):
+        call, calls, release = self.straggler_then_fast()
+        prepared = []
+        def prepare():
+            prepared.append(True)
+            threading.Event().wait(0.2)
+        self.assertEqual(hedged_call("worker.synthesize", True, call, "x", prepare=prepare), "fast")
+        self.assertEqual(prepared, [True])
+        site = self.policy.stats()["sites"]["worker.synthesize"]
+        # Five 20ms samples plus the duplicate's round trip, not its 200ms wait
+        self.assertEqual(site["count"], 6)
+        self.assertLess(site["mean"], 0.05)
+
+    def test_no_hedge_when_budget_is_spent(self):
+        self.policy.budget_ratio = 0
+        call, calls, release = self.straggler_then_fast()
+        threading.Timer(0.1, release.set).start()
+        self.assertEqual(hedged_call("worker.synthesize", True, call, "x"), "slow")
+        self.assertEqual(len(calls), 1)
+
+    def test_non_hedgeable_call_is_only_timed(self):
+        call, calls, release = self.straggler_then_fast()
+        threading.Timer(0.1, release.set).start()
+        self.assertEqual(hedged_call("worker.synthesize", False, call, "x"), "slow")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.policy.stats()["sites"]["worker.synthesize"]["count"], 6)
+
+    def test_failed_attempt_falls_back_to_the_other(self):
+        calls = []
+        def slow_failure(value):
+            calls.append(value)
+            if len(calls) == 1:
+                threading.Event().wait(0.1)
+                raise RuntimeError("primary failed late")
+            threading.Event().wait(0.2)
+            return "backup"
+
+        self.assertEqual(hedged_call("worker.synthesize", True, slow_failure, "x"), "backup")
+
+    def test_all_attempts_failing_raises(self):
+        def fail(value):
+            threading.Event().wait(0.1)
+            raise RuntimeError("down")
+
+        with self.assertRaisesRegex(RuntimeError, "down"):
+            hedged_call("worker.synthesize", True, fail, "x")
+
+    def test_report_lists_call_sites(self):
+        report = format_latency_report(self.policy.stats())
+        self.assertIn("worker.synthesize", report)
+        self.assertIn("Hedged 0 of 0", report)
+
+class TestHedgedCallAsync(HedgedCallTestCase):
+    async def test_straggler_is_cancelled_when_duplicate_wins(self):
+        cancelled = asyncio.Event()
+        calls = []
+
+        async def call(value):
+            calls.append(value)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return "fast"
+
+        result = await asyncio.wait_for(hedged_call_async("worker.synthesize", True, call, "x"), 1)
+        self.assertEqual(result, "fast")
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertEqual(self.policy.stats()["hedge_wins"], 1)
+
+    async def test_fast_call_is_not_hedged(self):
+        async def call(value):
+            return value.upper()
+
+        self.assertEqual(await hedged_call_async("worker.synthesize", True, call, "x"), "X")
+        self.assertEqual(self.policy.stats()["hedges"], 0)
+
+    async def test_untracked_call_site(self):
+        async def call(value):
+            return value
+
+        self.assertEqual(await hedged_call_async(None, True, call, "x"), "x")
+        self.assertEqual(list(self.policy.stats()["sites"]), ["worker.synthesize"])
+
+if __name__ == '__main__':
+    unittest.main()
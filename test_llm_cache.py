@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from llm_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "nested", "cache.sqlite")
+
+    def make_cache(self, **kwargs):
+        cache = ResponseCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_make_key_is_order_independent(self):
+        key_a = ResponseCache.make_key(model="m", system="s", max_tokens=10)
+        key_b = ResponseCache.make_key(max_tokens=10, system="s", model="m")
+        self.assertEqual(key_a, key_b)
+        self.assertNotEqual(key_a, ResponseCache.make_key(model="m", system="s", max_tokens=11))
+
+    def test_hit_and_miss_counters(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", "value")
+        self.assertEqual(cache.get("k"), "value")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1})
+
+    def test_entries_persist_across_instances(self):
+        self.make_cache().set("k", "value")
+        self.assertEqual(self.make_cache().get("k"), "value")
+
+    def test_expired_entries_are_misses(self):
+        cache = self.make_cache(ttl_seconds=60)
+        with patch('llm_cache.time.time', return_value=1000.0):
+            cache.set("k", "value")
+        with patch('llm_cache.time.time', return_value=1061.0):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        with patch('llm_cache.time.time', side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.get("a")
+            cache.set("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.get("c"), "3")
+
+if __name__ == '__main__':
+    unittest.main()
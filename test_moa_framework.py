@@ -1,6 +1,13 @@
+import asyncio
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from moa_framework import MoAFramework
+from checkpoint import RunCheckpoint
+from story_store import StoryStore
+import tokenizer
+from test_tokenizer import BYTE_ENCODING
 from config import Config
 
 class TestMoAFramework(unittest.TestCase):
@@ -9,6 +16,9 @@ class TestMoAFramework(unittest.TestCase):
     @patch('moa_framework.ManagerAgent')
     @patch('moa_framework.WorkerAgent')
     def setUp(self, mock_worker, mock_manager, mock_chief_editor, mock_rss_parser):
+        research_patcher = patch.object(Config, 'RESEARCH_ENABLED', False)
+        research_patcher.start()
+        self.addCleanup(research_patcher.stop)
         self.mock_rss_parser = mock_rss_parser.return_value
         self.mock_chief_editor = mock_chief_editor.return_value
         self.mock_manager = mock_manager.return_value
@@ -60,5 +70,283 @@ class TestMoAFramework(unittest.TestCase):
             self.framework.generate_podcast_script()
         self.assertIn("RSS Error", str(context.exception))
 
+    def test_generate_podcast_script_resumes_completed_stages(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.mock_rss_parser.get_top_stories.return_value = [
+            {"title": "Test Title", "summary": "Test Summary", "link": "http://example.com/1"}
+        ]
+        self.mock_worker.process.return_value = "Processed worker output"
+        self.mock_manager.process.side_effect = ["News editor output", Exception("Journalist failed")]
+
+        checkpoint = RunCheckpoint.create(tmpdir.name)
+        with self.assertRaises(Exception):
+            self.framework.generate_podcast_script(checkpoint)
+
+        self.mock_manager.process.side_effect = ["Journalist output", "Script writer output"]
+        self.mock_chief_editor.process.return_value = "Final script"
+        resumed = RunCheckpoint.load(tmpdir.name, checkpoint.run_id)
+        result = self.framework.generate_podcast_script(resumed)
+
+        self.assertEqual(result, "Final script")
+        self.assertEqual(self.mock_rss_parser.get_top_stories.call_count, 1)
+        self.mock_chief_editor.process.assert_called_once_with(
+            ["News editor output", "Journalist output", "Script writer output"]
+        )
+        self.assertTrue(resumed.has_stage("chief_editor"))
+
+    def test_generate_podcast_script_stream_checkpoints_the_streamed_script(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.mock_rss_parser.get_top_stories.return_value = [{"title": "Test Title", "summary": "Test Summary"}]
+        self.mock_worker.process.return_value = "Processed worker output"
+        self.mock_manager.process.return_value = "Processed manager output"
+        self.mock_chief_editor.process_stream.return_value = iter(["Final ", "script "])
+
+        checkpoint = RunCheckpoint.create(tmpdir.name)
+        chunks = self.framework.generate_podcast_script_stream(checkpoint)
+        self.assertEqual(next(chunks), "Final ")
+        self.assertFalse(checkpoint.has_stage("chief_editor"))
+        self.assertEqual(list(chunks), ["script "])
+        self.assertEqual(checkpoint.load_stage("chief_editor"), "Final script")
+
+        resumed = RunCheckpoint.load(tmpdir.name, checkpoint.run_id)
+        self.assertEqual(list(self.framework.generate_podcast_script_stream(resumed)), ["Final script"])
+        self.mock_chief_editor.process_stream.assert_called_once()
+
+    def test_process_worker_layer_quorum_skips_stragglers(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        straggler = MagicMock()
+        straggler.process.side_effect = lambda text: (release.wait(5), "Late output")[1]
+        self.mock_worker.process.return_value = "Processed worker output"
+        self.framework.worker_agents["news_editor"] = [straggler, self.mock_worker]
+        self.mock_manager.process.return_value = "Processed manager output"
+
+        with patch.object(Config, 'WORKER_QUORUM', 1):
+            result = self.framework.process_worker_layer("news_editor", "Test input")
+        self.assertEqual(result, "Processed manager output")
+        self.mock_manager.process.assert_called_once_with("Processed worker output")
+        self.assertFalse(release.is_set())
+
+class TestMoAFrameworkIncremental(unittest.IsolatedAsyncioTestCase):
+    @patch('moa_framework.get_story_store')
+    @patch('moa_framework.RSSFeedParser')
+    @patch('moa_framework.ChiefEditorAgent')
+    @patch('moa_framework.ManagerAgent')
+    @patch('moa_framework.WorkerAgent')
+    def setUp(self, mock_worker, mock_manager, mock_chief_editor, mock_rss_parser, mock_get_store):
+        research_patcher = patch.object(Config, 'RESEARCH_ENABLED', False)
+        research_patcher.start()
+        self.addCleanup(research_patcher.stop)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.store = StoryStore(f"{tmpdir.name}/stories.sqlite")
+        self.addCleanup(self.store.close)
+        mock_get_store.return_value = self.store
+
+        self.mock_rss_parser = mock_rss_parser.return_value
+        self.mock_chief_editor = mock_chief_editor.return_value
+        self.mock_chief_editor.process.return_value = "Final script"
+        self.mock_chief_editor.process_async = AsyncMock(return_value="Final script")
+        self.mock_manager = MagicMock()
+        self.mock_manager.process.side_effect = lambda text: f"[{text}]"
+        self.mock_manager.process_async = AsyncMock(side_effect=lambda text: f"[{text}]")
+        self.mock_worker = MagicMock()
+        self.mock_worker.process.side_effect = lambda text: text
+        self.mock_worker.process_async = AsyncMock(side_effect=lambda text: text)
+
+        self.framework = MoAFramework("fake_rss_url", "fake_tavily_key", incremental=True)
+        self.framework.worker_agents = {name: [self.mock_worker] for name in ("news_editor", "journalist", "script_writer")}
+        self.framework.manager_agents = {name: self.mock_manager for name in ("news_editor", "journalist", "script_writer")}
+        self.day_one = [
+            {"title": "Old", "summary": "Seen yesterday", "link": "http://example.com/old"},
+            {"title": "Other", "summary": "Also seen", "link": "http://example.com/other"},
+        ]
+        self.day_two = [self.day_one[0], {"title": "New", "summary": "Fresh today", "link": "http://example.com/new"}]
+
+    def test_only_new_stories_reach_the_workers(self):
+        self.mock_rss_parser.get_top_stories.return_value = self.day_one
+        self.framework.generate_podcast_script()
+        self.mock_worker.process.reset_mock()
+
+        self.mock_rss_parser.get_top_stories.return_value = self.day_two
+        self.assertEqual(self.framework.generate_podcast_script(), "Final script")
+
+        worker_inputs = [call.args[0] for call in self.mock_worker.process.call_args_list]
+        self.assertEqual(worker_inputs[:2], ["Title: New\nSummary: Fresh today", "[Title: New\nSummary: Fresh today]"])
+        self.assertEqual(len(worker_inputs), 3)
+        news_editor_output, journalist_output, _ = self.mock_chief_editor.process.call_args.args[0]
+        self.assertEqual(news_editor_output, "[Title: Old\nSummary: Seen yesterday]\n\n[Title: New\nSummary: Fresh today]")
+        self.assertEqual(journalist_output, "[[Title: Old\nSummary: Seen yesterday]]\n\n[[Title: New\nSummary: Fresh today]]")
+
+    async def test_async_mode_reuses_stored_outputs(self):
+        self.mock_rss_parser.get_top_stories.return_value = self.day_one
+        await self.framework.generate_podcast_script_async()
+        self.mock_worker.process_async.reset_mock()
+
+        self.mock_rss_parser.get_top_stories.return_value = self.day_two
+        self.assertEqual(await self.framework.generate_podcast_script_async(), "Final script")
+        worker_inputs = [call.args[0] for call in self.mock_worker.process_async.call_args_list]
+        self.assertEqual(len(worker_inputs), 3)
+        self.assertNotIn("Title: Old\nSummary: Seen yesterday", worker_inputs)
+        self.assertEqual(self.store.stats()["hits"], 2)
+
+class TestMoAFrameworkMapReduce(unittest.IsolatedAsyncioTestCase):
+    @patch('moa_framework.RSSFeedParser')
+    @patch('moa_framework.ChiefEditorAgent')
+    @patch('moa_framework.ManagerAgent')
+    @patch('moa_framework.WorkerAgent')
+    def setUp(self, mock_worker, mock_manager, mock_chief_editor, mock_rss_parser):
+        for patcher in (patch.object(tokenizer, 'get_encoder', return_value=BYTE_ENCODING),
+                        patch.object(Config, 'REDUCE_MAX_INPUT_TOKENS', 100),
+                        patch.object(Config, 'RESEARCH_ENABLED', False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.mock_rss_parser = mock_rss_parser.return_value
+        self.mock_rss_parser.get_top_stories.return_value = [
+            {"title": f"S{i}", "summary": "x" * 30, "link": f"http://example.com/{i}"} for i in range(4)
+        ]
+        self.mock_chief_editor = mock_chief_editor.return_value
+        self.mock_chief_editor.process.return_value = "Final script"
+        self.mock_chief_editor.process_async = AsyncMock(return_value="Final script")
+
+        # Workers echo their input; managers echo a single input and condense a group of them
+        def manage(text):
+            return f"R{text.count(chr(10) * 2) + 1}" if "\n\n" in text else text
+        self.mock_manager = MagicMock()
+        self.mock_manager.process.side_effect = manage
+        self.mock_manager.process_async = AsyncMock(side_effect=manage)
+        self.mock_worker = MagicMock()
+        self.mock_worker.process.side_effect = lambda text: text
+        self.mock_worker.process_async = AsyncMock(side_effect=lambda text: text)
+
+        self.framework = MoAFramework("fake_rss_url", "fake_tavily_key", pipeline_mode="map_reduce")
+        self.framework.worker_agents = {name: [self.mock_worker] for name in ("news_editor", "journalist", "script_writer")}
+        self.framework.manager_agents = {name: self.mock_manager for name in ("news_editor", "journalist", "script_writer")}
+
+    def reduce_groups(self, calls):
+        return [call.args[0] for call in calls if "\n\n" in call.args[0] and call.args[0].startswith("Title")]
+
+    def test_stories_are_processed_in_parallel_and_reduced_in_groups(self):
+        barrier = threading.Barrier(4, timeout=5)
+        news_worker = MagicMock()
+        news_worker.process.side_effect = lambda text: (barrier.wait(), text)[1]
+        self.framework.worker_agents["news_editor"] = [news_worker]
+
+        self.assertEqual(self.framework.generate_podcast_script(), "Final script")
+
+        self.assertEqual(news_worker.process.call_count, 4)
+        story = "Title: S{}\nSummary: " + "x" * 30
+        # Both layers are reduced side by side, so their manager calls interleave
+        self.assertEqual(sorted(self.reduce_groups(self.mock_manager.process.call_args_list)), sorted([
+            f"{story.format(0)}\n\n{story.format(1)}", f"{story.format(2)}\n\n{story.format(3)}"
+        ] * 2))
+        news_editor_output, journalist_output, _ = self.mock_chief_editor.process.call_args.args[0]
+        self.assertEqual(news_editor_output, "R2\n\nR2")
+        self.assertEqual(journalist_output, "R2\n\nR2")
+
+    def test_oversized_output_is_split_before_grouping(self):
+        groups = self.framework._group_by_tokens(["a" * 30, "b. " * 60, "c" * 30])
+        self.assertEqual(len(groups), 4)
+        self.assertEqual(groups[0], ["a" * 30])
+        self.assertTrue(all(len("\n\n".join(group)) <= 100 for group in groups))
+
+    def test_reduce_stops_after_max_levels(self):
+        self.mock_manager.process.side_effect = lambda text: text
+        with patch.object(Config, 'REDUCE_MAX_LEVELS', 2):
+            result = self.framework.reduce_outputs("news_editor", ["a" * 60, "b" * 60, "c" * 60])
+        self.assertEqual(result, "\n\n".join(["a" * 60, "b" * 60, "c" * 60]))
+        self.assertEqual(self.mock_manager.process.call_count, 6)
+
+    async def test_async_map_reduce(self):
+        self.assertEqual(await self.framework.generate_podcast_script_async(), "Final script")
+        self.assertEqual(len(self.reduce_groups(self.mock_manager.process_async.call_args_list)), 4)
+        news_editor_output, journalist_output, _ = self.mock_chief_editor.process_async.call_args.args[0]
+        self.assertEqual((news_editor_output, journalist_output), ("R2\n\nR2", "R2\n\nR2"))
+
+    def test_unknown_pipeline_mode(self):
+        with self.assertRaises(ValueError):
+            MoAFramework("fake_rss_url", "fake_tavily_key", pipeline_mode="streaming")
+
+class TestMoAFrameworkAsync(unittest.IsolatedAsyncioTestCase):
+    @patch('moa_framework.RSSFeedParser')
+    @patch('moa_framework.ChiefEditorAgent')
+    @patch('moa_framework.ManagerAgent')
+    @patch('moa_framework.WorkerAgent')
+    def setUp(self, mock_worker, mock_manager, mock_chief_editor, mock_rss_parser):
+        research_patcher = patch.object(Config, 'RESEARCH_ENABLED', False)
+        research_patcher.start()
+        self.addCleanup(research_patcher.stop)
+        self.mock_rss_parser = mock_rss_parser.return_value
+        self.mock_chief_editor = mock_chief_editor.return_value
+        self.mock_manager = mock_manager.return_value
+        self.failing_worker = MagicMock()
+        self.failing_worker.process_async = AsyncMock(side_effect=Exception("Worker failed"))
+        self.mock_worker = MagicMock()
+        self.mock_worker.process_async = AsyncMock(return_value="Processed worker output")
+        self.mock_manager.process_async = AsyncMock(return_value="Processed manager output")
+        self.mock_chief_editor.process_async = AsyncMock(return_value="Final script")
+
+        self.framework = MoAFramework("fake_rss_url", "fake_tavily_key")
+        self.framework.worker_agents = {
+            "news_editor": [self.mock_worker, self.failing_worker],
+            "journalist": [self.mock_worker],
+            "script_writer": [self.mock_worker]
+        }
+        self.framework.manager_agents = {
+            "news_editor": self.mock_manager,
+            "journalist": self.mock_manager,
+            "script_writer": self.mock_manager
+        }
+
+    async def test_process_worker_layer_async_skips_failed_workers(self):
+        result = await self.framework.process_worker_layer_async("news_editor", "Test input")
+        self.assertEqual(result, "Processed manager output")
+        self.mock_manager.process_async.assert_awaited_once_with("Processed worker output")
+
+    async def test_process_worker_layer_async_quorum_cancels_stragglers(self):
+        cancelled = asyncio.Event()
+        async def slow(text):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        straggler = MagicMock()
+        straggler.process_async = slow
+        self.framework.worker_agents["news_editor"] = [straggler, self.failing_worker, self.mock_worker]
+
+        with patch.object(Config, 'WORKER_QUORUM', 1):
+            result = await asyncio.wait_for(self.framework.process_worker_layer_async("news_editor", "Test input"), 1)
+        self.assertEqual(result, "Processed manager output")
+        self.mock_manager.process_async.assert_awaited_once_with("Processed worker output")
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    async def test_process_worker_layer_async_unknown_type(self):
+        with self.assertRaises(ValueError):
+            await self.framework.process_worker_layer_async("unknown_type", "Test input")
+
+    async def test_generate_podcast_script_async(self):
+        self.mock_rss_parser.get_top_stories.return_value = [
+            {"title": "Test Title", "summary": "Test Summary"}
+        ]
+        result = await self.framework.generate_podcast_script_async()
+        self.assertEqual(result, "Final script")
+        self.mock_chief_editor.process_async.assert_awaited_once()
+
+    async def test_generate_podcast_script_stream_async(self):
+        self.mock_rss_parser.get_top_stories.return_value = [
+            {"title": "Test Title", "summary": "Test Summary"}
+        ]
+
+        async def stream(inputs):
+            for chunk in ("Final ", "script"):
+                yield chunk
+        self.mock_chief_editor.process_stream_async = stream
+        chunks = [chunk async for chunk in self.framework.generate_podcast_script_stream_async()]
+        self.assertEqual(chunks, ["Final ", "script"])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+import api_utils
+from api_utils import make_api_call_async
+from model_router import ModelRouter, format_route_report
+from test_api_utils import FakeAsyncClient, unlimited_scheduler
+
+ROUTES = {"worker.evaluate": "fast", "*.evaluate*": "mid", "chief_editor": "large"}
+CASCADE = ["fast", "mid", "mid", "large"]
+PRICES = {"fast": (1.0, 2.0), "large": (10.0, 20.0)}
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = ModelRouter(routes=ROUTES, cascade=CASCADE, prices=PRICES)
+
+    def test_exact_route_beats_pattern(self):
+        self.assertEqual(self.router.route("worker.evaluate", "default"), "fast")
+        self.assertEqual(self.router.route("manager.evaluate_batch", "default"), "mid")
+
+    def test_unrouted_call_site_uses_agent_model(self):
+        self.assertEqual(self.router.route("manager.generate", "manager-model"), "manager-model")
+        self.assertEqual(self.router.route(None, "manager-model"), "manager-model")
+
+    def test_escalation_follows_distinct_cascade(self):
+        self.assertEqual(self.router.escalate("fast"), "mid")
+        self.assertEqual(self.router.escalate("mid"), "large")
+        self.assertIsNone(self.router.escalate("large"))
+        self.assertIsNone(self.router.escalate("unknown"))
+
+    def test_cost_and_stats_per_route(self):
+        usage = {"cached_calls": 0, "input_tokens": 1000, "output_tokens": 500}
+        self.router.record("chief_editor", "large", 2.0, usage)
+        self.router.record("chief_editor", "large", 4.0, usage)
+        self.router.record("worker.evaluate", "unpriced", 1.0, usage)
+        stats = self.router.stats()
+        self.assertEqual(stats[("chief_editor", "large")]["calls"], 2)
+        self.assertAlmostEqual(stats[("chief_editor", "large")]["mean_seconds"], 3.0)
+        self.assertAlmostEqual(stats[("chief_editor", "large")]["cost"], 2 * (1000 * 10 + 500 * 20) / 1e6)
+        self.assertEqual(stats[("worker.evaluate", "unpriced")]["cost"], 0.0)
+        self.assertIn("Total cost: $0.0400", format_route_report(stats))
+
+class TestRoutedApiCalls(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.router = ModelRouter(routes=ROUTES, cascade=CASCADE, prices=PRICES)
+        for patcher in (patch.object(api_utils.Config, 'LLM_CACHE_ENABLED', False),
+                        patch.object(api_utils.Config, 'MAX_MODEL_ESCALATIONS', 1),
+                        patch.object(api_utils, 'get_rate_limiter', return_value=unlimited_scheduler()),
+                        patch.object(api_utils, 'get_model_router', return_value=self.router)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_call_uses_routed_model(self):
+        fake = FakeAsyncClient(text="sure")
+        with patch.object(api_utils, 'async_client', fake):
+            await make_api_call_async("system", [{"role": "user", "content": "hi"}], call_site="worker.evaluate", model="agent")
+        self.assertEqual([call["model"] for call in fake.messages.calls], ["fast"])
+        self.assertEqual(self.router.stats()[("worker.evaluate", "fast")]["input_tokens"], 10)
+
+    async def test_invalid_output_escalates_up_to_the_limit(self):
+        fake = FakeAsyncClient(text="unsure")
+        with patch.object(api_utils, 'async_client', fake):
+            result = await make_api_call_async("system", [{"role": "user", "content": "hi"}], call_site="worker.evaluate",
+                                               validate=lambda text: text == "sure")
+        self.assertEqual(result, "unsure")
+        self.assertEqual([call["model"] for call in fake.messages.calls], ["fast", "mid"])
+        self.assertEqual(self.router.stats()[("worker.evaluate", "fast")]["escalations"], 1)
+
+    async def test_valid_output_is_not_escalated(self):
+        fake = FakeAsyncClient(text="sure")
+        with patch.object(api_utils, 'async_client', fake):
+            await make_api_call_async("system", [{"role": "user", "content": "hi"}], call_site="worker.evaluate",
+                                      validate=lambda text: text == "sure")
+        self.assertEqual(len(fake.messages.calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+import unittest
+from rate_limiter import RateLimitScheduler, TokenBucket, PRIORITY_CHIEF_EDITOR, PRIORITY_WORKER
+
+class TestTokenBucket(unittest.TestCase):
+    def test_wait_time_reflects_refill_rate(self):
+        bucket = TokenBucket(60)
+        bucket.consume(60)
+        self.assertAlmostEqual(bucket.wait_time(6, time.monotonic()), 6.0, delta=0.1)
+
+    def test_oversized_request_waits_for_full_bucket_only(self):
+        bucket = TokenBucket(100)
+        self.assertEqual(bucket.wait_time(500, time.monotonic()), 0.0)
+
+class TestRateLimitScheduler(unittest.TestCase):
+    def test_acquire_consumes_requests_and_tokens(self):
+        scheduler = RateLimitScheduler(10, 1000, 500)
+        scheduler.acquire(PRIORITY_WORKER, input_tokens=100, output_tokens=50)
+        self.assertAlmostEqual(scheduler.buckets["requests"].level, 9, delta=0.01)
+        self.assertAlmostEqual(scheduler.buckets["input_tokens"].level, 900, delta=1)
+        self.assertAlmostEqual(scheduler.buckets["output_tokens"].level, 450, delta=1)
+
+    def test_record_usage_refunds_overestimate(self):
+        scheduler = RateLimitScheduler(10, 1000, 500)
+        scheduler.acquire(PRIORITY_WORKER, input_tokens=100, output_tokens=400)
+        scheduler.record_usage(100, 400, 120, 50)
+        self.assertAlmostEqual(scheduler.buckets["input_tokens"].level, 880, delta=1)
+        self.assertAlmostEqual(scheduler.buckets["output_tokens"].level, 450, delta=1)
+
+    def test_retry_after_pauses_requests(self):
+        scheduler = RateLimitScheduler(1000, 10 ** 6, 10 ** 6)
+        scheduler.update_from_headers({"retry-after": "0.2"})
+        waited = scheduler.acquire()
+        self.assertGreaterEqual(waited, 0.15)
+
+    def test_higher_priority_is_served_first(self):
+        # 6000 RPM refills one request every 10ms
+        scheduler = RateLimitScheduler(6000, 10 ** 6, 10 ** 6)
+        scheduler.buckets["requests"].level = 0
+        order = []
+
+        def call(priority, label):
+            scheduler.acquire(priority)
+            order.append(label)
+
+        workers = [threading.Thread(target=call, args=(PRIORITY_WORKER, f"worker{i}")) for i in range(3)]
+        for thread in workers:
+            thread.start()
+        time.sleep(0.002)
+        chief = threading.Thread(target=call, args=(PRIORITY_CHIEF_EDITOR, "chief"))
+        chief.start()
+        for thread in workers + [chief]:
+            thread.join()
+        self.assertLessEqual(order.index("chief"), 1)
+
+class TestRateLimitSchedulerAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_async_waits_for_refill(self):
+        scheduler = RateLimitScheduler(600, 10 ** 6, 10 ** 6)
+        scheduler.buckets["requests"].level = 0
+        start = time.monotonic()
+        await asyncio.gather(scheduler.acquire_async(), scheduler.acquire_async())
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = RateLimitScheduler(1, 10 ** 6, 10 ** 6)
+        scheduler.buckets["requests"].level = 0
+        task = asyncio.create_task(scheduler.acquire_async())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(scheduler._waiting, [])
+
+if __name__ == '__main__':
+    unittest.main()
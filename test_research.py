@@ -0,0 +1,203 @@
+import asyncio
+import concurrent.futures
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import research
+from research import ResearchError, ResearchRun, ResearchStage, extract_queries, format_search_results, normalize_query
+from checkpoint import RunCheckpoint
+from config import Config
+from llm_cache import ResponseCache
+from moa_framework import MoAFramework
+import tokenizer
+from test_tokenizer import BYTE_ENCODING
+
+class FakeSearch:
+    """Search backend with a fixed latency that records calls and peak concurrency."""
+
+    def __init__(self, latency: float = 0.02, fail: str = None):
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str) -> str:
+        with self._lock:
+            self.calls.append(query)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.latency)
+            if self.fail and self.fail in query:
+                raise Exception("search unavailable")
+            return f"- results for {query}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def stories(*titles):
+    return [{"title": title, "summary": f"Summary of {title}."} for title in titles]
+
+class TestQueries(unittest.TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  OpenAI's   NEW Model: GPT-5!  "), "openai s new model gpt-5")
+        with patch.object(Config, 'RESEARCH_MAX_QUERY_WORDS', 3):
+            self.assertEqual(normalize_query("one two three four"), "one two three")
+
+    def test_extract_queries_falls_back_to_summary(self):
+        self.assertEqual(extract_queries({"title": "AI Act passes", "summary": "x"}), ["ai act passes"])
+        self.assertEqual(extract_queries({"title": "", "summary": "Chips get faster. More text."}), ["chips get faster"])
+        self.assertEqual(extract_queries({"title": "", "summary": ""}), [])
+
+    def test_format_search_results(self):
+        response = {"results": [{"title": "A", "url": "http://a", "content": "alpha"},
+                                {"title": "B", "url": "http://b", "content": "beta"}]}
+        self.assertEqual(format_search_results(response, 1), "- A (http://a): alpha")
+
+class TestResearchStage(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.cache = ResponseCache(f"{tmpdir.name}/research.sqlite", ttl_seconds=60)
+        self.addCleanup(self.cache.close)
+
+    def test_duplicate_queries_are_searched_once(self):
+        search = FakeSearch()
+        stage = ResearchStage(search, pool_size=4)
+        run = stage.start(stories("AI Act passes", "AI act passes!", "Chips get faster"))
+        self.assertEqual(run.all_notes(), ["- results for ai act passes", "- results for ai act passes",
+                                           "- results for chips get faster"])
+        self.assertEqual(sorted(search.calls), ["ai act passes", "chips get faster"])
+
+    def test_searches_run_concurrently_within_the_pool(self):
+        search = FakeSearch(latency=0.05)
+        stage = ResearchStage(search, pool_size=3)
+        start = time.monotonic()
+        stage.start(stories(*[f"story {index}" for index in range(9)])).all_notes()
+        self.assertEqual(search.peak, 3)
+        self.assertLess(time.monotonic() - start, 9 * 0.05)
+
+    def test_cache_is_shared_across_stages(self):
+        first, second = FakeSearch(), FakeSearch()
+        ResearchStage(first, self.cache).start(stories("AI Act passes")).all_notes()
+        notes = ResearchStage(second, self.cache).start(stories("AI Act passes", "Chips get faster")).all_notes()
+        self.assertEqual(notes[0], "- results for ai act passes")
+        self.assertEqual(second.calls, ["chips get faster"])
+
+    def test_failed_search_gives_empty_notes(self):
+        stage = ResearchStage(FakeSearch(fail="chips"), self.cache)
+        run = stage.start(stories("AI Act passes", "Chips get faster"))
+        self.assertEqual(run.all_notes(), ["- results for ai act passes", ""])
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        with self.assertRaises(ResearchError):
+            stage.search("chips again")
+
+    def test_search_finished_before_submit_returns_does_not_deadlock(self):
+        class InlineExecutor:
+            """Runs each search to completion inside submit, like an instant cache hit winning the race."""
+            def submit(self, func, *args):
+                future = concurrent.futures.Future()
+                future.set_result(func(*args))
+                return future
+
+        cache = MagicMock()
+        cache.get.return_value = "- cached results"
+        stage = ResearchStage(FakeSearch(), cache)
+        stage._executor = InlineExecutor()
+        results = []
+        def submit_many():
+            for index in range(10):
+                results.append(stage.submit(f"query {index % 3}").result())
+        thread = threading.Thread(target=submit_many, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(results, ["- cached results"] * 10)
+        self.assertEqual(stage._in_flight, {})
+
+    def test_unopenable_cache_gives_an_uncached_stage(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        blocker = os.path.join(tmpdir.name, "not_a_directory")
+        open(blocker, "w").close()
+        with patch.object(research, '_research_stages', {}), patch.object(research, '_research_cache', None), \
+             patch.object(Config, 'RESEARCH_CACHE_PATH', os.path.join(blocker, "research.sqlite")), \
+             self.assertLogs(research.logger, "WARNING"):
+            stage = research.get_research_stage("fake_tavily_key")
+        self.assertIsNone(stage.cache)
+
+    def test_notes_async(self):
+        run = ResearchStage(FakeSearch()).start(stories("AI Act passes"))
+        self.assertEqual(asyncio.run(run.notes_async(0)), "- results for ai act passes")
+        self.assertEqual(ResearchRun.completed(["a", ""]).all_notes(), ["a", ""])
+
+class TestResearchInPipeline(unittest.IsolatedAsyncioTestCase):
+    @patch('moa_framework.RSSFeedParser')
+    @patch('moa_framework.ChiefEditorAgent')
+    @patch('moa_framework.ManagerAgent')
+    @patch('moa_framework.WorkerAgent')
+    def setUp(self, mock_worker, mock_manager, mock_chief_editor, mock_rss_parser):
+        self.search = FakeSearch()
+        self.stage = ResearchStage(self.search)
+        patcher = patch.object(research, '_research_stages', {"fake_tavily_key": self.stage})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        mock_rss_parser.return_value.get_top_stories.return_value = stories("AI Act passes", "Chips get faster")
+        mock_chief_editor.return_value.process.return_value = "Final script"
+        mock_chief_editor.return_value.process_async = AsyncMock(return_value="Final script")
+
+        self.inputs = {}
+        def agent(agent_type):
+            def process(text):
+                self.inputs.setdefault(agent_type, []).append(text)
+                return f"{agent_type} output"
+            worker = MagicMock()
+            worker.process.side_effect = process
+            worker.process_async = AsyncMock(side_effect=process)
+            return worker
+        self.framework = MoAFramework("fake_rss_url", "fake_tavily_key")
+        self.framework.worker_agents = {agent_type: [agent(agent_type)] for agent_type in ("news_editor", "journalist", "script_writer")}
+        self.framework.manager_agents = {agent_type: agent(f"{agent_type}_manager") for agent_type in ("news_editor", "journalist", "script_writer")}
+
+    def test_journalist_input_includes_research(self):
+        self.framework.generate_podcast_script()
+        self.assertEqual(self.inputs["journalist"], [
+            "news_editor_manager output\n\nBackground research:\n"
+            "- results for ai act passes\n- results for chips get faster"
+        ])
+        self.assertNotIn("Background research", self.inputs["news_editor"][0])
+
+    async def test_story_layers_get_their_own_research_async(self):
+        self.framework.pipeline_mode = "map_reduce"
+        with patch.object(tokenizer, 'get_encoder', return_value=BYTE_ENCODING):
+            await self.framework.generate_podcast_script_async()
+        self.assertEqual(sorted(self.inputs["journalist"]), [
+            "news_editor_manager output\n\nBackground research:\n- results for ai act passes",
+            "news_editor_manager output\n\nBackground research:\n- results for chips get faster"
+        ])
+
+    def test_resumed_run_reuses_checkpointed_research(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint = RunCheckpoint.create(tmpdir, "run")
+            self.framework.generate_podcast_script(checkpoint)
+            self.assertEqual(checkpoint.load_stage("research"), ["- results for ai act passes", "- results for chips get faster"])
+            # Resume as if the run had failed in the Journalist layer
+            for stage in ("journalist", "script_writer", "chief_editor"):
+                checkpoint.manifest["completed_stages"].remove(stage)
+            self.framework.generate_podcast_script(checkpoint)
+        self.assertEqual(len(self.search.calls), 2)
+        self.assertEqual(self.inputs["journalist"][0], self.inputs["journalist"][1])
+
+    def test_disabled(self):
+        with patch.object(Config, 'RESEARCH_ENABLED', False):
+            self.framework.generate_podcast_script()
+        self.assertEqual(self.inputs["journalist"], ["news_editor_manager output"])
+        self.assertEqual(self.search.calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
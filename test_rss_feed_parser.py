@@ -0,0 +1,100 @@
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from feed_fetcher import FeedFetcher
+from rss_feed_parser import RSSFeedParser, RSSFeedError
+
+def news_item(title, days_ago):
+    date = (datetime.now() - timedelta(days=days_ago)).strftime("%B %d, %Y")
+    return (
+        f'<div class="news-item"><h3 class="news-title">{title}</h3>'
+        f'<p class="news-summary">Summary of {title}</p>'
+        f'<a class="news-link" href="https://example.com/{title}">Read</a>'
+        f'<span class="news-date">{date}</span></div>'
+    )
+
+class FeedStubHandler(BaseHTTPRequestHandler):
+    """Serves self.server.body with an ETag and answers 304 to a matching If-None-Match."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = f'"{hash(self.server.body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.server.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestRSSFeedParserFetching(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FeedStubHandler)
+        self.server.requests = []
+        self.server.body = "<html>" + news_item("alpha", 1) + news_item("beta", 2) + news_item("old", 30) + "</html>"
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.fetcher = FeedFetcher(cache_dir=self.tmpdir.name, timeout=5)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/news"
+
+    def test_unchanged_feed_uses_conditional_get_and_skips_parsing(self):
+        parser = RSSFeedParser(self.url, fetcher=self.fetcher)
+        first = parser.get_top_stories(num_stories=10, days=7)
+        self.assertEqual([story["title"] for story in first], ["alpha", "beta"])
+
+        with patch('rss_feed_parser.get_backend') as mock_backend:
+            second = RSSFeedParser(self.url, fetcher=self.fetcher).get_top_stories(num_stories=10, days=7)
+        mock_backend.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertIn("If-None-Match", self.server.requests[1])
+        self.assertIn("gzip", self.server.requests[0]["Accept-Encoding"])
+
+    def test_changed_feed_is_parsed_again(self):
+        parser = RSSFeedParser(self.url, fetcher=self.fetcher)
+        parser.get_top_stories(num_stories=10, days=7)
+        self.server.body = "<html>" + news_item("gamma", 0) + "</html>"
+        stories = parser.get_top_stories(num_stories=10, days=7)
+        self.assertEqual([story["title"] for story in stories], ["gamma"])
+
+    def test_date_filter_applies_before_truncation(self):
+        self.server.body = "<html>" + news_item("old", 30) + news_item("alpha", 1) + news_item("beta", 2) + "</html>"
+        stories = RSSFeedParser(self.url, fetcher=self.fetcher).get_top_stories(num_stories=2, days=7)
+        self.assertEqual([story["title"] for story in stories], ["alpha", "beta"])
+
+    def test_rss_feed_is_detected(self):
+        date = (datetime.now() - timedelta(days=1)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        self.server.body = (
+            '<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>'
+            f'<item><title>rss story</title><link>https://example.com/rss</link>'
+            f'<description>&lt;p&gt;Hello&lt;/p&gt;</description><pubDate>{date}</pubDate></item>'
+            '</channel></rss>'
+        )
+        stories = RSSFeedParser(self.url, fetcher=self.fetcher).get_top_stories()
+        self.assertEqual([(story["title"], story["summary"]) for story in stories], [("rss story", "Hello")])
+
+    def test_http_error_raises_feed_error(self):
+        parser = RSSFeedParser(self.url.replace("/news", "/missing"), fetcher=self.fetcher)
+        with self.assertRaises(RSSFeedError):
+            parser.get_top_stories()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
+import re
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from specific_agent_classes import ChiefEditorAgent, ManagerAgent, WorkerAgent
 from base_agent import Thought, AgentError
 from config import Config
@@ -71,5 +72,113 @@ class TestWorkerAgent(unittest.TestCase):
         evaluated_thoughts = self.agent.evaluate_thoughts(thoughts)
         self.assertEqual(evaluated_thoughts[0].evaluation, "sure")
 
+class TestBatchedEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.agent = ManagerAgent("TestManager", "TestType", "fake_tavily_key")
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_evaluate_thoughts_single_batched_call(self, mock_call):
+        mock_call.return_value = "1: sure\n2. Impossible\n**3** - maybe"
+        thoughts = [Thought("A"), Thought("B"), Thought("C")]
+        evaluated = self.agent.evaluate_thoughts(thoughts)
+        self.assertEqual([t.evaluation for t in evaluated], ["sure", "impossible", "maybe"])
+        self.assertEqual(mock_call.call_count, 1)
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_evaluate_thoughts_falls_back_when_unparseable(self, mock_call):
+        mock_call.side_effect = ["1: sure", "maybe", "sure"]
+        thoughts = [Thought("A"), Thought("B")]
+        evaluated = self.agent.evaluate_thoughts(thoughts)
+        self.assertEqual([t.evaluation for t in evaluated], ["maybe", "sure"])
+        self.assertEqual(mock_call.call_count, 3)
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_evaluate_thoughts_reads_ratings(self, mock_call):
+        mock_call.return_value = "1: maybe 3\n2: sure (9/10)\n3: maybe"
+        evaluated = self.agent.evaluate_thoughts([Thought("A"), Thought("B"), Thought("C")])
+        self.assertEqual([(t.evaluation, t.rating) for t in evaluated], [("maybe", 3), ("sure", 9), ("maybe", None)])
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_single_evaluation_reads_rating(self, mock_call):
+        mock_call.side_effect = ["unparseable", "Maybe 7", "impossible 42"]
+        evaluated = self.agent.evaluate_thoughts([Thought("A"), Thought("B")])
+        self.assertEqual([(t.evaluation, t.rating) for t in evaluated], [("maybe", 7), ("impossible", None)])
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_free_form_evaluation_is_read_leniently(self, mock_call):
+        mock_call.side_effect = ["unparseable", "Maybe - plausible, 6/10", "I can't judge this one."]
+        evaluated = self.agent.evaluate_thoughts([Thought("A"), Thought("B")])
+        self.assertEqual([(t.evaluation, t.rating) for t in evaluated], [("maybe", 6), ("maybe", None)])
+
+    def test_parse_batch_evaluations_bare_label_for_single_thought(self):
+        self.assertEqual(self.agent._parse_batch_evaluations("Sure.", 1), [("sure", None)])
+        self.assertEqual(self.agent._parse_batch_evaluations("sure 8", 1), [("sure", 8)])
+        self.assertIsNone(self.agent._parse_batch_evaluations("Sure.", 2))
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_synthesis_without_thoughts_works_from_the_input(self, mock_call):
+        mock_call.return_value = "Output"
+        self.agent.search_mode = "beam"
+        with patch.object(Config, 'TOT_BUDGET_MAX_CALLS', 0):
+            self.assertEqual(self.agent.process("Topic"), "Output")
+        mock_call.assert_called_once()
+        prompt = mock_call.call_args.kwargs["messages"][0]["content"]
+        self.assertNotIn("synthesize the following thoughts", prompt)
+        self.assertTrue(prompt.endswith("directly from the following input:\n\nTopic"))
+
+    @patch('specific_agent_classes.make_api_call')
+    def test_beam_search_keeps_the_best_rated_thoughts(self, mock_call):
+        def respond(system, messages, max_tokens, **kwargs):
+            prompt = messages[0]["content"]
+            if "evaluating" in system:
+                thoughts = re.findall(r"^(\d+)\. (.*)$", prompt, re.MULTILINE)
+                return "\n".join(f"{i}: maybe {8 if thought.endswith('B') else 3}" for i, thought in thoughts)
+            # The root prompt is sent as the shared context, deeper prompts inline
+            topic = prompt.split("\n\n", 1)[1] if "\n\n" in prompt else "Topic"
+            return f"{topic} A\n{topic} B"
+        mock_call.side_effect = respond
+        self.agent.search_mode = "beam"
+        self.agent.beam_width = 1
+        solution = self.agent.tree_of_thought("Topic")
+        generated = [call.kwargs["messages"][0]["content"] for call in mock_call.call_args_list
+                     if "generating" in call.kwargs["system"]]
+        # The first-generated but lower-rated 'Topic A' is pruned
+        self.assertEqual(len(generated), 2)
+        self.assertTrue(generated[1].endswith("\n\nTopic B"))
+        self.assertEqual([t.content for t in solution], ["Topic B B", "Topic B A"])
+        self.assertAlmostEqual(solution[0].score, 0.8)
+
+class TestManagerAgentAsync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.agent = ManagerAgent("TestManager", "TestType", "fake_tavily_key")
+
+    @patch('specific_agent_classes.make_api_call_async', new_callable=AsyncMock)
+    async def test_generate_thoughts_async(self, mock_call):
+        mock_call.return_value = "Thought 1\nThought 2\nThought 3"
+        thoughts = await self.agent.generate_thoughts_async("Test prompt", 1)
+        self.assertEqual([t.content for t in thoughts], ["Thought 1", "Thought 2"])
+
+    @patch('specific_agent_classes.make_api_call_async', new_callable=AsyncMock)
+    async def test_evaluate_thoughts_async_batched(self, mock_call):
+        mock_call.return_value = "1: maybe\n2: sure"
+        thoughts = await self.agent.evaluate_thoughts_async([Thought("A"), Thought("B")])
+        self.assertEqual([t.evaluation for t in thoughts], ["maybe", "sure"])
+        mock_call.assert_awaited_once()
+
+    @patch('specific_agent_classes.make_api_call_async', new_callable=AsyncMock)
+    async def test_free_form_evaluation_is_read_leniently_async(self, mock_call):
+        mock_call.side_effect = ["unparseable", "Impossible: contradicts the source (2/10).", "Sure, 9"]
+        thoughts = await self.agent.evaluate_thoughts_async([Thought("A"), Thought("B")])
+        self.assertEqual([(t.evaluation, t.rating) for t in thoughts], [("impossible", 2), ("sure", 9)])
+
+    @patch('specific_agent_classes.make_api_call_async', new_callable=AsyncMock)
+    async def test_tree_of_thought_async(self, mock_call):
+        async def respond(system, messages, max_tokens, **kwargs):
+            return "sure" if "evaluating" in system else "Idea A\nIdea B"
+        mock_call.side_effect = respond
+        solution = await self.agent.tree_of_thought_async("Test prompt")
+        self.assertEqual([t.content for t in solution], ["Idea A", "Idea B"])
+        self.assertTrue(all(t.evaluation == "sure" for t in solution))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import random
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from rss_feed_parser import RSSFeedError
+from story_ingest import (FeedIngestor, StoryDeduplicator, canonicalize_url, hamming_distance,
+                          normalize_story, simhash)
+
+NOW = datetime(2024, 7, 1, 12, 0)
+
+def item(title, summary, link, hours_ago=0):
+    return {'title': title, 'summary': summary, 'link': link, 'published': NOW - timedelta(hours=hours_ago)}
+
+class TestCanonicalizeUrl(unittest.TestCase):
+    def test_equivalent_links_match(self):
+        links = [
+            "https://www.example.com/ai/launch/?utm_source=rss&utm_medium=feed",
+            "http://example.com/ai/launch#comments",
+            "https://EXAMPLE.com/ai/launch?fbclid=abc",
+        ]
+        self.assertEqual({canonicalize_url(link) for link in links}, {"example.com/ai/launch"})
+
+    def test_meaningful_query_is_kept_and_sorted(self):
+        self.assertEqual(canonicalize_url("https://example.com/a?b=2&a=1&utm_campaign=x"), "example.com/a?a=1&b=2")
+        self.assertNotEqual(canonicalize_url("https://example.com/a?id=1"), canonicalize_url("https://example.com/a?id=2"))
+        self.assertEqual(canonicalize_url(None), "")
+
+class TestSimHash(unittest.TestCase):
+    def test_near_duplicates_are_close(self):
+        a = simhash("OpenAI launches GPT-5 with longer context",
+                    "OpenAI today released GPT-5, its newest model, with a much longer context window and better reasoning.")
+        b = simhash("OpenAI launches GPT-5 with longer context",
+                    "OpenAI released GPT-5, its newest model, with a much longer context window and better reasoning today.")
+        c = simhash("Robotics startup raises Series B",
+                    "A warehouse robotics company closed a new funding round led by venture investors.")
+        self.assertLessEqual(hamming_distance(a, b), 3)
+        self.assertGreater(hamming_distance(a, c), 10)
+        self.assertEqual(simhash("", ""), 0)
+
+class TestStoryDeduplicator(unittest.TestCase):
+    def test_merges_by_url_and_similarity_and_ranks_by_coverage(self):
+        dedup = StoryDeduplicator(max_distance=3)
+        launch = "Anthropic releases new Claude model with faster responses and lower prices for developers"
+        self.assertTrue(dedup.add(normalize_story(item("Solo story", "Only one outlet covers this", "https://a.com/solo", 0), "feed-a"), "feed-a"))
+        self.assertTrue(dedup.add(normalize_story(item("Claude update", launch, "https://a.com/claude", 2), "feed-a"), "feed-a"))
+        self.assertFalse(dedup.add(normalize_story(item("Claude update", launch, "https://b.com/other-path", 1), "feed-b"), "feed-b"))
+        self.assertFalse(dedup.add(normalize_story(item("Different title", "Different text", "https://www.a.com/claude/?utm_source=x", 1), "feed-c"), "feed-c"))
+
+        top = dedup.top_stories(10)
+        self.assertEqual([story['title'] for story in top], ["Claude update", "Solo story"])
+        self.assertEqual(top[0]['sources'], ["feed-a", "feed-b", "feed-c"])
+        self.assertEqual(top[0]['link'], "https://a.com/claude")
+
+    def test_recency_breaks_coverage_ties(self):
+        dedup = StoryDeduplicator()
+        dedup.add(normalize_story(item("Older robotics news", "Warehouse robots", "https://a.com/1", 5), "a"), "a")
+        dedup.add(normalize_story(item("Newer chip news", "GPU shipments", "https://a.com/2", 1), "a"), "a")
+        dedup.add(normalize_story({'title': "Undated quantum news", 'summary': "Qubits"}, "a"), "a")
+        self.assertEqual([story['title'] for story in dedup.top_stories(2)], ["Newer chip news", "Older robotics news"])
+
+    def test_index_scales_to_many_stories(self):
+        rng = random.Random(0)
+        vocabulary = [f"word{i}" for i in range(5000)]
+        texts = [(" ".join(rng.sample(vocabulary, 8)), " ".join(rng.sample(vocabulary, 20))) for _ in range(20000)]
+        dedup = StoryDeduplicator()
+        start = time.monotonic()
+        for i, (title, summary) in enumerate(texts):
+            dedup.add(normalize_story(item(title, summary, f"https://example.com/{i}"), "feed"), "feed")
+        for i in range(0, 20000, 10):
+            dedup.add(normalize_story(item(*texts[i], f"https://mirror.com/{i}"), "mirror"), "mirror")
+        self.assertEqual(len(dedup.clusters), 20000)
+        self.assertEqual(len(dedup.top_stories(3000)[-1]['sources']), 1)
+        self.assertLess(time.monotonic() - start, 30)
+
+    def test_rejects_invalid_distance(self):
+        with self.assertRaises(ValueError):
+            StoryDeduplicator(max_distance=64)
+
+class TestFeedIngestor(unittest.TestCase):
+    def make_ingestor(self, feeds):
+        parsers = {}
+        for url, result in feeds.items():
+            parsers[url] = MagicMock()
+            if isinstance(result, Exception):
+                parsers[url].get_top_stories.side_effect = result
+            else:
+                parsers[url].get_top_stories.return_value = result
+        return FeedIngestor(list(feeds), parser_factory=parsers.__getitem__, stories_per_feed=20), parsers
+
+    def test_merges_feeds_and_skips_failures(self):
+        shared = item("Big launch", "A big model launch covered everywhere", "https://a.com/launch", 3)
+        ingestor, parsers = self.make_ingestor({
+            "http://feed-a": [item("A only", "Local news", "https://a.com/local", 1), shared],
+            "http://feed-b": [dict(shared, link="https://a.com/launch?utm_source=b")],
+            "http://feed-c": RSSFeedError("down"),
+        })
+        stories = ingestor.get_top_stories(num_stories=1, days=7)
+
+        self.assertEqual(len(stories), 1)
+        self.assertEqual(stories[0]['title'], "Big launch")
+        self.assertEqual(stories[0]['sources'], ["http://feed-a", "http://feed-b"])
+        parsers["http://feed-a"].get_top_stories.assert_called_once_with(num_stories=20, days=7)
+
+    def test_all_feeds_failing_raises(self):
+        ingestor, _ = self.make_ingestor({"http://a": Exception("boom"), "http://b": Exception("bang")})
+        with self.assertRaises(RSSFeedError) as context:
+            ingestor.get_top_stories()
+        self.assertIn("boom", str(context.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from story_store import StoryStore, story_key
+
+STORY = {"title": "Model launch", "summary": "A new model", "link": "https://www.example.com/launch?utm_source=rss"}
+
+class TestStoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "nested", "stories.sqlite")
+
+    def make_store(self, **kwargs):
+        store = StoryStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_key_uses_canonical_link_and_content(self):
+        same_article = dict(STORY, link="http://example.com/launch/")
+        edited = dict(STORY, summary="A new model, now with benchmarks")
+        self.assertEqual(story_key(STORY), story_key(same_article))
+        self.assertNotEqual(story_key(STORY), story_key(edited))
+        self.assertNotEqual(story_key({"title": "a", "summary": "b"}), story_key({"title": "c", "summary": "b"}))
+
+    def test_outputs_persist_per_stage(self):
+        self.make_store().put(STORY, "news_editor", "analysis")
+        store = self.make_store()
+        self.assertEqual(store.get(STORY, "news_editor"), "analysis")
+        self.assertIsNone(store.get(STORY, "journalist"))
+        self.assertIsNone(store.get(dict(STORY, title="Model launch delayed"), "news_editor"))
+        self.assertEqual(store.stats(), {"hits": 1, "misses": 2, "entries": 1})
+
+    def test_expired_outputs_are_reprocessed_and_pruned(self):
+        with patch('story_store.time.time', return_value=1000.0):
+            self.make_store(ttl_seconds=60).put(STORY, "news_editor", "analysis")
+        with patch('story_store.time.time', return_value=1061.0):
+            self.assertIsNone(self.make_store(ttl_seconds=60).get(STORY, "news_editor"))
+        self.assertEqual(self.make_store().stats()["entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
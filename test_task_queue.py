@@ -0,0 +1,364 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from base_agent import Agent
+from config import Config
+from moa_framework import MoAFramework
+from task_queue import (DONE, FAILED, PENDING, RUNNING, TASK_EXPAND, TASK_PROCESS, RedisTaskQueue, SQLiteTaskQueue, Task,
+                        TaskDispatcher, TaskQueueError, make_task_id, open_task_queue, use_task_dispatcher)
+from task_worker import TaskWorker, build_agent
+import task_queue
+
+def new_task(kind="echo", payload=None):
+    payload = payload if payload is not None else {"text": "hello"}
+    return Task(make_task_id("run", kind, payload), kind, payload)
+
+class QueueTestCase(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = f"{tmpdir.name}/tasks.sqlite"
+        self.queue = SQLiteTaskQueue(self.path)
+        self.addCleanup(self.queue.close)
+        for name, value in (("TASK_POLL_INTERVAL", 0.01), ("TASK_LEASE_SECONDS", 60)):
+            patcher = patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+class TestSQLiteTaskQueue(QueueTestCase):
+    def test_task_ids_are_idempotent(self):
+        self.assertEqual(make_task_id("run", "echo", {"a": 1, "b": 2}), make_task_id("run", "echo", {"b": 2, "a": 1}))
+        self.assertNotEqual(make_task_id("run", "echo", {"a": 1}), make_task_id("other_run", "echo", {"a": 1}))
+        self.queue.submit(new_task())
+        self.queue.submit(new_task())
+        self.assertIsNotNone(self.queue.claim("node-1"))
+        self.assertIsNone(self.queue.claim("node-1"))
+
+    def test_completed_task_is_not_run_again(self):
+        task = self.queue.submit(new_task())
+        self.queue.complete(self.queue.claim("node-1").task_id, "node-1", {"answer": 42})
+        resubmitted = self.queue.submit(new_task())
+        self.assertEqual((resubmitted.status, resubmitted.result), (DONE, {"answer": 42}))
+        self.assertIsNone(self.queue.claim("node-2"))
+        self.assertEqual(self.queue.get_many([task.task_id])[task.task_id].attempts, 1)
+
+    def test_failed_task_is_queued_again_on_resubmit(self):
+        self.queue.submit(new_task())
+        claimed = self.queue.claim("node-1")
+        self.assertTrue(self.queue.fail(claimed.task_id, "node-1", "boom"))
+        self.assertEqual(self.queue.get_many([claimed.task_id])[claimed.task_id].error, "boom")
+        self.assertEqual(self.queue.submit(new_task()).status, PENDING)
+        self.assertEqual(self.queue.claim("node-2").task_id, claimed.task_id)
+
+    def test_expired_lease_goes_to_another_node(self):
+        self.queue.submit(new_task())
+        with patch.object(Config, 'TASK_LEASE_SECONDS', -1):
+            first = self.queue.claim("node-1")
+        second = self.queue.claim("node-2")
+        self.assertEqual((second.task_id, second.status, second.attempts), (first.task_id, RUNNING, 2))
+        self.assertFalse(self.queue.fail(first.task_id, "node-1", "late failure"))
+        self.assertFalse(self.queue.renew(first.task_id, "node-1"))
+        # A late result from the first node is still accepted: the work is already paid for
+        self.assertTrue(self.queue.complete(first.task_id, "node-1", "late result"))
+        self.assertFalse(self.queue.complete(first.task_id, "node-2", "second result"))
+        self.assertEqual(self.queue.get_many([first.task_id])[first.task_id].result, "late result")
+
+    def test_task_fails_after_max_attempts(self):
+        task = self.queue.submit(new_task())
+        with patch.object(Config, 'TASK_LEASE_SECONDS', -1), patch.object(Config, 'TASK_MAX_ATTEMPTS', 2):
+            self.queue.claim("node-1")
+            self.queue.claim("node-2")
+            self.assertIsNone(self.queue.claim("node-3"))
+        stored = self.queue.get_many([task.task_id])[task.task_id]
+        self.assertEqual(stored.status, FAILED)
+        self.assertIn("lease expired", stored.error)
+
+    def test_concurrent_claims_from_separate_connections(self):
+        for index in range(40):
+            self.queue.submit(new_task(payload={"index": index}))
+        claimed = []
+        def consume(node):
+            queue = SQLiteTaskQueue(self.path)
+            while (task := queue.claim(node)) is not None:
+                claimed.append(task.task_id)
+            queue.close()
+        threads = [threading.Thread(target=consume, args=(f"node-{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(claimed), len(set(claimed))), (40, 40))
+
+    def test_open_task_queue(self):
+        queue = open_task_queue(f"sqlite:///{self.path}")
+        self.assertIsInstance(queue, SQLiteTaskQueue)
+        queue.close()
+        with self.assertRaises(TaskQueueError):
+            open_task_queue("ftp://example.com/tasks")
+
+    @unittest.skipIf(task_queue.redis is not None, "redis is installed")
+    def test_redis_requires_the_package(self):
+        with self.assertRaises(ImportError):
+            open_task_queue("redis://localhost:6379/0")
+
+class FakeWatchError(Exception):
+    pass
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py commands RedisTaskQueue uses, with WATCH/MULTI/EXEC semantics."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.lists = {}
+        self.zsets = {}
+        self.versions = {}
+        # Run once just before the next transaction commits, to interleave another writer
+        self.before_execute = None
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        self.hashes.setdefault(key, {}).update({name: str(item) for name, item in items.items()})
+        self._touch(key)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def lpop(self, key):
+        values = self.lists.get(key)
+        return values.pop(0) if values else None
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zrangebyscore(self, key, low, high):
+        return [member for member, score in sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1]) if low <= score <= high]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def close(self):
+        pass
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.watched = {}
+        self.commands = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.watched, self.commands = {}, None
+
+    def watch(self, key):
+        self.watched[key] = self.client.versions.get(key, 0)
+
+    def unwatch(self):
+        self.watched = {}
+
+    def multi(self):
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+        if self.commands is None:
+            return command
+        return lambda *args, **kwargs: self.commands.append((command, args, kwargs))
+
+    def execute(self):
+        hook, self.client.before_execute = self.client.before_execute, None
+        if hook is not None:
+            hook()
+        commands, watched = self.commands, self.watched
+        self.commands, self.watched = None, {}
+        if any(self.client.versions.get(key, 0) != version for key, version in watched.items()):
+            raise FakeWatchError()
+        return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+class TestRedisTaskQueue(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeRedis()
+        self.queue = RedisTaskQueue(self.client, prefix="test")
+        for patcher in (patch.object(task_queue, 'redis', SimpleNamespace(WatchError=FakeWatchError)),
+                        patch.object(Config, 'TASK_LEASE_SECONDS', 60)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_submit_claim_renew_complete(self):
+        task = self.queue.submit(new_task())
+        self.assertEqual(self.queue.submit(new_task()).status, PENDING)
+        self.assertEqual(self.client.lists["test:pending"], [task.task_id])
+        claimed = self.queue.claim("node-1")
+        self.assertEqual((claimed.task_id, claimed.status, claimed.node, claimed.attempts), (task.task_id, RUNNING, "node-1", 1))
+        self.assertIsNone(self.queue.claim("node-2"))
+        self.assertFalse(self.queue.renew(task.task_id, "node-2"))
+        self.assertTrue(self.queue.renew(task.task_id, "node-1"))
+        self.assertTrue(self.queue.complete(task.task_id, "node-1", {"answer": 42}))
+        self.assertFalse(self.queue.complete(task.task_id, "node-1", "again"))
+        self.assertEqual(self.client.zsets["test:leases"], {})
+        resubmitted = self.queue.submit(new_task())
+        self.assertEqual((resubmitted.status, resubmitted.result), (DONE, {"answer": 42}))
+        self.assertIsNone(self.queue.claim("node-2"))
+
+    def test_failed_task_is_queued_again_on_resubmit(self):
+        task = self.queue.submit(new_task())
+        self.queue.claim("node-1")
+        self.assertFalse(self.queue.fail(task.task_id, "node-2", "not mine"))
+        self.assertTrue(self.queue.fail(task.task_id, "node-1", "boom"))
+        self.assertEqual(self.queue.get_many([task.task_id])[task.task_id].error, "boom")
+        self.assertEqual(self.queue.submit(new_task()).status, PENDING)
+        self.assertEqual(self.queue.claim("node-2").attempts, 1)
+
+    def test_expired_lease_goes_to_another_node_until_attempts_run_out(self):
+        task = self.queue.submit(new_task())
+        with patch.object(Config, 'TASK_LEASE_SECONDS', -1), patch.object(Config, 'TASK_MAX_ATTEMPTS', 2):
+            self.queue.claim("node-1")
+            second = self.queue.claim("node-2")
+            self.assertEqual((second.node, second.attempts), ("node-2", 2))
+            self.assertIsNone(self.queue.claim("node-3"))
+        stored = self.queue.get_many([task.task_id])[task.task_id]
+        self.assertEqual(stored.status, FAILED)
+        self.assertIn("lease expired", stored.error)
+
+    def test_completion_racing_the_reclaim_is_not_run_again(self):
+        task = self.queue.submit(new_task())
+        with patch.object(Config, 'TASK_LEASE_SECONDS', -1):
+            self.queue.claim("node-1")
+        # The late node completes the task after the reclaim has seen its expired lease, before it commits
+        self.client.before_execute = lambda: self.queue.complete(task.task_id, "node-1", "late result")
+        self.assertIsNone(self.queue.claim("node-2"))
+        stored = self.queue.get_many([task.task_id])[task.task_id]
+        self.assertEqual((stored.status, stored.result, stored.attempts), (DONE, "late result", 1))
+        self.assertEqual(self.client.lists["test:pending"], [])
+
+class TestTaskDispatcher(QueueTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dispatcher = TaskDispatcher(self.queue, namespace="run")
+
+    def test_results_stream_back_in_completion_order(self):
+        ids = [self.dispatcher.submit("echo", {"index": index}) for index in range(3)]
+        for _ in ids:
+            self.queue.claim("node")
+        self.queue.complete(ids[2], "node", "third")
+        stream = self.dispatcher.as_completed(ids)
+        self.assertEqual(next(stream).result, "third")
+        self.queue.complete(ids[0], "node", "first")
+        self.queue.fail(ids[1], "node", "boom")
+        self.assertEqual([task.status for task in stream], [DONE, FAILED])
+
+    def test_run_raises_for_failed_and_late_tasks(self):
+        worker = TaskWorker(self.queue, "node", handlers={"boom": MagicMock(side_effect=ValueError("bad input"))})
+        threading.Timer(0.05, worker.run_once).start()
+        with self.assertRaises(TaskQueueError) as context:
+            self.dispatcher.run("boom", {})
+        self.assertIn("bad input", str(context.exception))
+        with self.assertRaises(TaskQueueError):
+            list(self.dispatcher.as_completed([self.dispatcher.submit("never", {})], timeout=0.05))
+
+    def test_run_async(self):
+        worker = TaskWorker(self.queue, "node", handlers={"echo": lambda payload: payload["text"].upper()})
+        threading.Timer(0.05, worker.run_once).start()
+        self.assertEqual(asyncio.run(self.dispatcher.run_async("echo", {"text": "hi"})), "HI")
+
+class TestTaskWorker(QueueTestCase):
+    def test_run_once(self):
+        handler = MagicMock(return_value=["ok"])
+        worker = TaskWorker(self.queue, "node", handlers={"echo": handler})
+        self.assertFalse(worker.run_once())
+        task = self.queue.submit(new_task())
+        self.queue.submit(new_task(kind="unknown"))
+        self.assertTrue(worker.run_once())
+        self.assertTrue(worker.run_once())
+        handler.assert_called_once_with({"text": "hello"})
+        self.assertEqual(self.queue.get_many([task.task_id])[task.task_id].result, ["ok"])
+        self.assertEqual((worker.completed, worker.failed), (1, 1))
+
+    def test_serve_until_stopped(self):
+        worker = TaskWorker(self.queue, "node", concurrency=2, handlers={"echo": lambda payload: payload["index"]})
+        stop = threading.Event()
+        thread = threading.Thread(target=worker.serve, args=(stop,))
+        thread.start()
+        try:
+            dispatcher = TaskDispatcher(self.queue)
+            ids = [dispatcher.submit("echo", {"index": index}) for index in range(5)]
+            self.assertEqual(sorted(task.result for task in dispatcher.as_completed(ids, timeout=5)), list(range(5)))
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_build_agent(self):
+        spec = {"role": "manager", "name": "Journalist", "agent_type": "Journalist", "model": "model-x",
+                "max_depth": 3, "branching_factor": 4}
+        agent = build_agent(spec)
+        self.assertEqual(agent.task_spec(), spec)
+        with self.assertRaises(TaskQueueError):
+            build_agent(dict(spec, role="chief_editor"))
+
+class RemoteAgent(Agent):
+    def task_spec(self):
+        return {"name": self.name}
+
+class TestDistributedPipeline(QueueTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dispatcher = TaskDispatcher(self.queue, namespace="run")
+        self.handlers = {
+            TASK_PROCESS: lambda payload: f"{payload['agent']['name']}: {payload['input']}",
+            TASK_EXPAND: lambda payload: [[f"{payload['content']} / {payload['shared_context']}", "sure", 9]],
+        }
+        stop = threading.Event()
+        thread = threading.Thread(target=TaskWorker(self.queue, "node", concurrency=2, handlers=self.handlers).serve, args=(stop,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(stop.set)
+
+    def test_tree_of_thought_expansions_run_on_nodes(self):
+        agent = RemoteAgent("Manager", "model", "key", max_depth=2, branching_factor=1)
+        with use_task_dispatcher(self.dispatcher):
+            thoughts = agent.tree_of_thought("root")
+        self.assertEqual([(thought.content, thought.evaluation, thought.rating) for thought in thoughts], [("root / root", "sure", 9)])
+
+    @patch('moa_framework.RSSFeedParser')
+    @patch('moa_framework.ChiefEditorAgent')
+    @patch('moa_framework.ManagerAgent')
+    @patch('moa_framework.WorkerAgent')
+    def test_worker_layer_runs_on_nodes(self, mock_worker, mock_manager, mock_chief_editor, mock_rss_parser):
+        framework = MoAFramework("fake_rss_url", "fake_tavily_key", task_dispatcher=self.dispatcher)
+        workers = []
+        for index in range(2):
+            worker = MagicMock()
+            worker.name = f"Worker_{index}"
+            worker.task_spec.return_value = {"name": worker.name}
+            workers.append(worker)
+        manager = MagicMock()
+        manager.process.side_effect = lambda text: "\n".join(sorted(text.split("\n\n")))
+        framework.worker_agents = {"news_editor": workers}
+        framework.manager_agents = {"news_editor": manager}
+        self.assertEqual(framework.process_worker_layer("news_editor", "stories"), "Worker_0: stories\nWorker_1: stories")
+        for worker in workers:
+            worker.process.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
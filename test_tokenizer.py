@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+import tiktoken
+import tokenizer
+from tokenizer import count_tokens, count_tokens_batch, chunk_text
+
+# Byte-level encoding with no merges: one token per byte, and no download needed
+BYTE_ENCODING = tiktoken.Encoding(
+    name="test_bytes",
+    pat_str=r"[\s\S]",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={}
+)
+
+class TestTokenizer(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(tokenizer, 'get_encoder', return_value=BYTE_ENCODING)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_count_tokens(self):
+        self.assertEqual(count_tokens("hello"), 5)
+        self.assertEqual(count_tokens_batch(["a", "abc", ""]), [1, 3, 0])
+
+    def test_sentence_chunks_respect_budget_and_boundaries(self):
+        text = "aaaa. bbbb. cccc. dddd"
+        self.assertEqual(chunk_text(text, max_tokens=11), ["aaaa. bbbb.", "cccc. dddd"])
+        self.assertEqual(chunk_text(text, max_tokens=10), ["aaaa.", "bbbb.", "cccc.", "dddd"])
+
+    def test_sentence_chunks_with_overlap(self):
+        text = "aaaa. bbbb. cccc. dddd"
+        chunks = chunk_text(text, max_tokens=17, overlap=6)
+        self.assertEqual(chunks, ["aaaa. bbbb. cccc.", "cccc. dddd"])
+
+    def test_oversized_sentence_is_split_on_tokens(self):
+        chunks = chunk_text("ab. " + "x" * 25 + ". cd", max_tokens=10)
+        self.assertEqual(chunks, ["ab.", "x" * 9, "x" * 10, "x" * 6 + ". cd"])
+
+    def test_multibyte_text_is_covered_exactly(self):
+        text = "Café launch in Zürich — 東京 next"
+        chunks = chunk_text(text, max_tokens=5, respect_sentences=False)
+        self.assertEqual("".join(chunks), text)
+
+    def test_token_chunks_with_overlap(self):
+        chunks = chunk_text("abcdefghij", max_tokens=4, overlap=1, respect_sentences=False)
+        self.assertEqual(chunks, ["abcd", "defg", "ghij"])
+
+    def test_token_chunks_cover_text_exactly_without_overlap(self):
+        text = "The quick brown fox. Jumps over. The lazy dog"
+        chunks = chunk_text(text, max_tokens=7, respect_sentences=False)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(count_tokens(chunk) <= 7 for chunk in chunks))
+
+    def test_invalid_overlap(self):
+        with self.assertRaises(ValueError):
+            chunk_text("abc", max_tokens=4, overlap=4)
+
+class TestGetEncoder(unittest.TestCase):
+    def test_encoder_is_built_once_per_model(self):
+        tokenizer.get_encoder.cache_clear()
+        with patch('tokenizer.tiktoken.encoding_for_model', return_value=BYTE_ENCODING) as mock_for_model:
+            for _ in range(3):
+                tokenizer.count_tokens("abc", model="m1")
+            tokenizer.count_tokens("abc", model="m2")
+        tokenizer.get_encoder.cache_clear()
+        self.assertEqual(mock_for_model.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
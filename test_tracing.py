@@ -0,0 +1,218 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import api_utils
+import tracing
+from api_utils import make_api_call_async
+from tracing import JsonlSpanExporter, OTelSpanExporter, Tracer, add_to_span, configure_tracing, format_trace_summary, span
+from test_api_utils import FakeAsyncClient, unlimited_scheduler
+
+class RecordingExporter:
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_start(self, span):
+        self.started.append(span.name)
+
+    def on_end(self, span):
+        self.ended.append(span.as_dict())
+
+    def close(self):
+        pass
+
+class FakeOTelSpan:
+    def __init__(self, name, start_time):
+        self.name = name
+        self.start_time = start_time
+        self.attributes = {}
+        self.end_time = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+class FakeOTelTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, context=None, start_time=None):
+        otel_span = FakeOTelSpan(name, start_time)
+        self.spans.append(otel_span)
+        return otel_span
+
+class FakeTracerProvider:
+    """Stands in for the OpenTelemetry SDK TracerProvider."""
+    def __init__(self):
+        self.processors = []
+        self.tracer = FakeOTelTracer()
+        self.flushes = 0
+
+    def add_span_processor(self, processor):
+        self.processors.append(processor)
+
+    def get_tracer(self, name):
+        return self.tracer
+
+    def force_flush(self):
+        self.flushes += 1
+
+class TracingTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.exporter = RecordingExporter()
+        self.tracer = Tracer([self.exporter])
+        patcher = patch.object(tracing, '_tracer', self.tracer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ended(self, name):
+        return [data for data in self.exporter.ended if data["name"] == name]
+
+class TestSpans(TracingTestCase):
+    def test_nested_spans_share_trace_and_roll_up_counters(self):
+        with span("pipeline.run", run_id="r1"):
+            with span("layer.news_editor") as layer:
+                add_to_span("input_tokens", 10)
+                layer.set(worker_outputs=2)
+            add_to_span("input_tokens", 5)
+
+        layer, run = self.exporter.ended
+        self.assertEqual(layer["parent_id"], run["span_id"])
+        self.assertEqual(layer["trace_id"], run["trace_id"])
+        self.assertEqual(layer["attributes"], {"worker_outputs": 2})
+        self.assertEqual(layer["counters"], {"input_tokens": 10})
+        self.assertEqual(run["counters"], {"input_tokens": 15})
+        self.assertEqual(run["attributes"], {"run_id": "r1"})
+
+    def test_error_is_recorded_and_raised(self):
+        with self.assertRaises(ValueError):
+            with span("stage.news_editor"):
+                raise ValueError("boom")
+        self.assertEqual(self.exporter.ended[0]["status"], "error")
+        self.assertIn("boom", self.exporter.ended[0]["error"])
+        self.assertEqual(self.tracer.summary.as_dict()["stage.news_editor"]["errors"], 1)
+
+    def test_spans_follow_context_into_threads(self):
+        with span("layer.journalist") as layer:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(contextvars.copy_context().run, self.worker_call) for _ in range(2)]
+                concurrent.futures.wait(futures)
+        children = self.ended("tot.expand")
+        self.assertEqual([child["parent_id"] for child in children], [layer.span_id] * 2)
+        self.assertEqual(self.ended("layer.journalist")[0]["counters"], {"output_tokens": 6})
+
+    def worker_call(self):
+        with span("tot.expand"):
+            add_to_span("output_tokens", 3)
+
+    async def test_spans_follow_context_into_tasks(self):
+        async def expand(depth):
+            with span("tot.expand", depth=depth):
+                await asyncio.sleep(0)
+
+        with span("layer.script_writer") as layer:
+            await asyncio.gather(expand(1), expand(2))
+        self.assertEqual({child["parent_id"] for child in self.ended("tot.expand")}, {layer.span_id})
+
+    def test_add_without_span_is_ignored(self):
+        add_to_span("retries")
+        self.assertEqual(self.exporter.ended, [])
+
+    def test_summary_table(self):
+        for _ in range(3):
+            with span("llm.call"):
+                add_to_span("retries")
+        summary = self.tracer.summary.as_dict()
+        self.assertEqual((summary["llm.call"]["count"], summary["llm.call"]["retries"]), (3, 3))
+        self.assertIn("llm.call", format_trace_summary(summary))
+
+class TestExporters(unittest.TestCase):
+    def test_jsonl_exporter_writes_one_line_per_span(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "traces", "run.jsonl")
+            tracer = configure_tracing(path, otel=False)
+            try:
+                with span("pipeline.run"):
+                    with span("stage.stories"):
+                        pass
+            finally:
+                configure_tracing(None, otel=False)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual([line["name"] for line in lines], ["stage.stories", "pipeline.run"])
+        self.assertIsInstance(tracer.exporters[0], JsonlSpanExporter)
+
+    def test_otel_exporter_mirrors_spans(self):
+        fake = FakeOTelTracer()
+        tracer = Tracer([OTelSpanExporter(fake)])
+        with patch.object(tracing, '_tracer', tracer):
+            with span("llm.call", model="m") as llm_span:
+                add_to_span("input_tokens", 7)
+        otel_span, = fake.spans
+        self.assertEqual(otel_span.name, "llm.call")
+        self.assertEqual(otel_span.attributes, {"model": "m", "input_tokens": 7})
+        self.assertEqual(otel_span.end_time, int((llm_span.start_time + llm_span.duration) * 1e9))
+
+class TestOTelSetup(unittest.TestCase):
+    def setUp(self):
+        self.otel_trace = SimpleNamespace(get_tracer_provider=MagicMock(return_value=object()),
+                                          set_tracer_provider=MagicMock(), set_span_in_context=lambda span: None)
+        for patcher in (patch.object(tracing, '_otel_provider', None), patch.object(tracing, 'otel_trace', self.otel_trace),
+                        patch.object(tracing, 'OTelTracerProvider', FakeTracerProvider),
+                        patch.object(tracing, 'BatchSpanProcessor', lambda exporter: ("batch", exporter)),
+                        patch.object(tracing, 'OTLPSpanExporter', lambda: "otlp")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(configure_tracing, None, False)
+
+    def test_sdk_provider_with_otlp_exporter_is_installed(self):
+        tracer = configure_tracing(None, otel=True)
+        exporter, = tracer.exporters
+        provider = exporter.provider
+        self.assertEqual(provider.processors, [("batch", "otlp")])
+        self.otel_trace.set_tracer_provider.assert_called_once_with(provider)
+        with span("llm.call"):
+            pass
+        self.assertEqual([otel_span.name for otel_span in provider.tracer.spans], ["llm.call"])
+        configure_tracing(None, otel=False)
+        self.assertEqual(provider.flushes, 1)
+
+    def test_configured_provider_is_reused(self):
+        provider = FakeTracerProvider()
+        self.otel_trace.get_tracer_provider.return_value = provider
+        self.assertIs(configure_tracing(None, otel=True).exporters[0].provider, provider)
+        self.assertEqual(provider.processors, [])
+        self.otel_trace.set_tracer_provider.assert_not_called()
+
+    def test_missing_sdk_is_reported(self):
+        with patch.object(tracing, 'OTelTracerProvider', None), self.assertLogs(tracing.logger, "WARNING"):
+            self.assertEqual(configure_tracing(None, otel=True).exporters, [])
+
+class TestApiCallSpans(TracingTestCase):
+    def setUp(self):
+        super().setUp()
+        for patcher in (patch.object(api_utils.Config, 'LLM_CACHE_ENABLED', False),
+                        patch.object(api_utils, 'get_rate_limiter', return_value=unlimited_scheduler())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_llm_call_span_records_usage_and_waits(self):
+        fake = FakeAsyncClient(text="Hello")
+        with patch.object(api_utils, 'async_client', fake):
+            await make_api_call_async("system", [{"role": "user", "content": "hi"}], call_site="worker.generate", model="m")
+        llm_span, = self.ended("llm.call")
+        self.assertEqual(llm_span["attributes"], {"call_site": "worker.generate", "model": "m", "priority": 2})
+        self.assertEqual((llm_span["counters"]["input_tokens"], llm_span["counters"]["output_tokens"]), (10, 5))
+        self.assertIn("rate_limit_wait", llm_span["counters"])
+        self.assertIn("queue_wait", llm_span["counters"])
+
+if __name__ == '__main__':
+    unittest.main()
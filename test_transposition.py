@@ -0,0 +1,132 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+from base_agent import Thought
+from test_base_agent import StubAgent
+from transposition import TranspositionTable, current_transposition_table, normalize_thought, use_transposition_table
+
+class CountingAgent(StubAgent):
+    """StubAgent that also counts evaluated thoughts."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.evaluated = []
+
+    def evaluate_thoughts(self, thoughts):
+        with self.lock:
+            self.evaluated.extend(thought.content for thought in thoughts)
+        return super().evaluate_thoughts(thoughts)
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_normalize_thought(self):
+        self.assertEqual(normalize_thought("  The  Model\nimproves "), "the model improves")
+
+    def test_concurrent_lookups_compute_once(self):
+        table = TranspositionTable()
+        compute = MagicMock(side_effect=lambda: time.sleep(0.05) or ["a", "b"])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: table.memoize("key", compute), range(4)))
+        self.assertEqual(results, [["a", "b"]] * 4)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual((table.stats()["hits"], table.stats()["misses"]), (3, 1))
+
+    def test_failures_are_not_memoized(self):
+        table = TranspositionTable()
+        with self.assertRaises(ValueError):
+            table.memoize("key", MagicMock(side_effect=ValueError("boom")))
+        self.assertEqual(table.memoize("key", lambda: "ok"), "ok")
+
+    def test_least_recently_used_entries_are_evicted(self):
+        table = TranspositionTable(max_entries=2)
+        table.put("a", 1)
+        table.put("b", 2)
+        table.get("a")
+        table.put("c", 3)
+        self.assertEqual((table.get("a"), table.get("b"), table.get("c")), (1, None, 3))
+
+    def test_memoize_async(self):
+        table = TranspositionTable()
+        calls = []
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+        async def lookups():
+            return await asyncio.gather(*(table.memoize_async("key", compute) for _ in range(3)))
+        self.assertEqual(asyncio.run(lookups()), ["value"] * 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_cancelled_owner_does_not_cancel_its_waiters(self):
+        table = TranspositionTable()
+        started = []
+        async def compute():
+            started.append(1)
+            await asyncio.sleep(0.05 if len(started) == 1 else 0)
+            return "value"
+        async def lookups():
+            owner = asyncio.ensure_future(table.memoize_async("key", compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(table.memoize_async("key", compute))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            await asyncio.gather(owner, return_exceptions=True)
+            return owner.cancelled(), await waiter
+        self.assertEqual(asyncio.run(lookups()), (True, "value"))
+        self.assertEqual(len(started), 2)
+        self.assertEqual(table.get("key"), "value")
+
+class TestThought(unittest.TestCase):
+    def test_parent_links_and_path(self):
+        root = Thought("root")
+        child = Thought("child", parent=root)
+        grandchild = Thought("grandchild")
+        grandchild.adopt(child)
+        self.assertEqual([thought.content for thought in grandchild.path()], ["root", "child", "grandchild"])
+        self.assertEqual(grandchild.depth, 2)
+        self.assertFalse(hasattr(root, "__dict__"))
+        self.assertLess(sys.getsizeof(root), 100)
+
+class TestMemoizedTreeOfThought(unittest.TestCase):
+    def test_solutions_link_back_to_the_root(self):
+        solution = StubAgent(max_depth=2, branching_factor=2).tree_of_thought("root")
+        self.assertEqual([thought.content for thought in solution[0].path()], ["root", "root.0", "root.0.0"])
+
+    def test_workers_with_the_same_input_share_expansions(self):
+        agents = [CountingAgent(delay=0.02, max_depth=2, branching_factor=2) for _ in range(3)]
+        with use_transposition_table(TranspositionTable()) as table:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [executor.submit(contextvars.copy_context().run, agent.tree_of_thought, "root") for agent in agents]
+                solutions = [future.result() for future in futures]
+        self.assertEqual({tuple(thought.content for thought in solution) for solution in solutions}, {("root.0.0", "root.0.1")})
+        self.assertEqual(sum(len(agent.expanded) for agent in agents), 3)
+        self.assertEqual(sum(len(agent.evaluated) for agent in agents), 6)
+        self.assertGreater(table.stats()["hits"], 0)
+
+    def test_same_thought_on_different_branches_reuses_its_verdict(self):
+        agent = CountingAgent(max_depth=1, branching_factor=2)
+        agent.generate_thoughts = lambda prompt, depth: [Thought("Same idea"), Thought("same  IDEA")]
+        with use_transposition_table(TranspositionTable()):
+            solution = agent.tree_of_thought("root")
+        self.assertEqual([thought.evaluation for thought in solution], ["maybe", "maybe"])
+        self.assertEqual(agent.evaluated, ["Same idea"])
+
+    def test_without_a_table_nothing_is_shared(self):
+        self.assertIsNone(current_transposition_table())
+        agents = [StubAgent(max_depth=2, branching_factor=2) for _ in range(2)]
+        for agent in agents:
+            agent.tree_of_thought("root")
+        self.assertEqual(sum(len(agent.expanded) for agent in agents), 6)
+
+class TestMemoizedTreeOfThoughtAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_async_searches_share_expansions(self):
+        agents = [CountingAgent(max_depth=2, branching_factor=2) for _ in range(2)]
+        with use_transposition_table(TranspositionTable()):
+            solutions = await asyncio.gather(*(agent.tree_of_thought_async("root") for agent in agents))
+        self.assertEqual([thought.content for thought in solutions[1]], ["root.0.0", "root.0.1"])
+        self.assertEqual(sum(len(agent.expanded) for agent in agents), 3)
+
+if __name__ == '__main__':
+    unittest.main()
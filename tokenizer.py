@@ -0,0 +1,146 @@
+"""
+tokenizer.py
+
+This module provides token counting and text chunking for the AI News Podcast Generation System.
+Encoders are built once per model and cached, batches of texts are encoded in one call, and
+chunking encodes its input once and splits on token offsets instead of re-counting per sentence.
+"""
+
+import bisect
+import functools
+import itertools
+import logging
+import re
+from typing import List, Optional, Tuple
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+FALLBACK_ENCODING = "cl100k_base"
+SENTENCE_BOUNDARY = re.compile(r"\. ")
+
+@functools.lru_cache(maxsize=None)
+def get_encoder(model: str = DEFAULT_MODEL) -> tiktoken.Encoding:
+    """
+    Return the cached encoder for a model.
+
+    Models tiktoken does not know (such as Claude models) use the cl100k_base encoding,
+    which is close enough for budgeting purposes.
+
+    Args:
+        model (str, optional): The model name. Defaults to DEFAULT_MODEL.
+
+    Returns:
+        tiktoken.Encoding: The encoder.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.debug(f"No tiktoken encoding for {model}, using {FALLBACK_ENCODING}")
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Count the tokens in a text.
+
+    Args:
+        text (str): The text to count.
+        model (str, optional): The model whose encoding is used. Defaults to DEFAULT_MODEL.
+
+    Returns:
+        int: The number of tokens.
+    """
+    return len(get_encoder(model).encode_ordinary(text))
+
+def count_tokens_batch(texts: List[str], model: str = DEFAULT_MODEL) -> List[int]:
+    """
+    Count the tokens of many texts with a single batched encode.
+
+    Args:
+        texts (List[str]): The texts to count.
+        model (str, optional): The model whose encoding is used. Defaults to DEFAULT_MODEL.
+
+    Returns:
+        List[int]: The number of tokens of each text, in input order.
+    """
+    return [len(tokens) for tokens in get_encoder(model).encode_ordinary_batch(texts)]
+
+def chunk_text(text: str, max_tokens: int = 4000, overlap: int = 0, respect_sentences: bool = True,
+               model: str = DEFAULT_MODEL) -> List[str]:
+    """
+    Split a text into chunks of at most max_tokens tokens.
+
+    The text is encoded once; chunks are cut on token offsets and returned as slices
+    of the original text.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int, optional): Maximum tokens per chunk. Defaults to 4000.
+        overlap (int, optional): Tokens repeated from the end of one chunk at the start of
+            the next. In sentence mode only whole sentences are repeated. Defaults to 0.
+        respect_sentences (bool, optional): Only cut between sentences ('. ' separated),
+            unless a single sentence is longer than max_tokens. Defaults to True.
+        model (str, optional): The model whose encoding is used. Defaults to DEFAULT_MODEL.
+
+    Returns:
+        List[str]: The chunks, in order.
+
+    Raises:
+        ValueError: If overlap is negative or not smaller than max_tokens.
+    """
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be at least 0 and smaller than max_tokens")
+    encoder = get_encoder(model)
+    tokens = encoder.encode_ordinary(text)
+    if not tokens:
+        return []
+    offsets = _char_offsets(encoder, tokens)
+
+    if respect_sentences:
+        # Cut right after the period so the following space stays with the next sentence
+        cuts = {bisect.bisect_left(offsets, match.start() + 1) for match in SENTENCE_BOUNDARY.finditer(text)}
+        boundaries = sorted(cuts | {0, len(tokens)})
+        spans = _plan_spans(len(tokens), max_tokens, overlap, boundaries)
+        chunks = [text[offsets[start]:offsets[end]].strip() for start, end in spans]
+        return [chunk for chunk in chunks if chunk]
+    return [text[offsets[start]:offsets[end]] for start, end in _plan_spans(len(tokens), max_tokens, overlap)]
+
+def _char_offsets(encoder: tiktoken.Encoding, tokens: List[int]) -> List[int]:
+    """Character offset at which each token starts, followed by the length of the text."""
+    lengths = [
+        len(token) if token.isascii() else sum(1 for byte in token if not 0x80 <= byte < 0xC0)
+        for token in encoder.decode_tokens_bytes(tokens)
+    ]
+    return list(itertools.accumulate(lengths, initial=0))
+
+def _plan_spans(num_tokens: int, max_tokens: int, overlap: int, boundaries: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+    """
+    Greedily plan (start, end) token spans of at most max_tokens.
+
+    With boundaries, spans start and end on boundary indices whenever a boundary fits;
+    without them any token index is a valid cut.
+    """
+    spans = []
+    start = 0
+    while start < num_tokens:
+        end = min(start + max_tokens, num_tokens)
+        if boundaries is not None and end < num_tokens:
+            best = boundaries[bisect.bisect_right(boundaries, end) - 1]
+            # Only cut mid-sentence when a single sentence does not fit on its own
+            if best > start:
+                end = best
+        spans.append((start, end))
+        if end >= num_tokens:
+            break
+
+        next_start = end
+        if overlap:
+            if boundaries is None:
+                next_start = end - overlap
+            else:
+                candidate = boundaries[bisect.bisect_left(boundaries, end - overlap)]
+                if start < candidate < end:
+                    next_start = candidate
+        start = next_start
+    return spans
@@ -0,0 +1,364 @@
+"""
+tracing.py
+
+This module provides pipeline tracing for the AI News Podcast Generation System.
+Pipeline runs, stages, worker layers, Tree of Thought expansions and LLM calls are
+recorded as nested spans with their latency, rate limit and queue waits, retries and
+token counts. Finished spans are written to a JSONL trace file and, when the
+OpenTelemetry SDK and OTLP exporter are installed, exported over OTLP. Every span also feeds an
+in-memory summary that is printed as a table at the end of a run.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from config import Config
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+try:
+    from opentelemetry.sdk.trace import TracerProvider as OTelTracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+except ImportError:
+    OTelTracerProvider = None
+    BatchSpanProcessor = None
+
+try:
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+except ImportError:
+    OTLPSpanExporter = None
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """
+    One timed operation.
+
+    Attributes set with set() describe the operation; counters incremented with add()
+    (tokens, retries, waits) are also added to the parent span when this span ends, so
+    every span reports the totals of the work done beneath it.
+
+    Attributes:
+        name (str): Operation name, e.g. 'llm.call' or 'layer.news_editor'.
+        trace_id (str): Identifier shared by every span of one trace.
+        span_id (str): Identifier of this span.
+        parent (Optional[Span]): The enclosing span.
+        attributes (Dict[str, Any]): Descriptive attributes.
+        counters (Dict[str, float]): Accumulated counters.
+        start_time (float): Wall clock start, seconds since the epoch.
+        duration (Optional[float]): Seconds from start to end, once ended.
+        error (Optional[str]): The error that ended the span, if any.
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Dict[str, Any] = None):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = dict(attributes or {})
+        self.counters = {}
+        self.start_time = time.time()
+        self.duration = None
+        self.error = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def set(self, **attributes):
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def add(self, counter: str, amount: float = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def end(self, error: Exception = None):
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self.parent is not None:
+            with self._lock:
+                counters = dict(self.counters)
+            for counter, amount in counters.items():
+                self.parent.add(counter, amount)
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent.span_id if self.parent else None,
+                "start_time": self.start_time,
+                "duration": self.duration,
+                "status": "error" if self.error else "ok",
+                "error": self.error,
+                "attributes": dict(self.attributes),
+                "counters": dict(self.counters)
+            }
+
+class JsonlSpanExporter:
+    """Appends every finished span to a JSONL file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        line = json.dumps(span.as_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+_otel_provider = None
+_otel_provider_lock = threading.Lock()
+
+def get_otel_tracer_provider() -> Any:
+    """
+    Return the OpenTelemetry tracer provider spans are exported through.
+
+    A provider the process already has, e.g. from running under opentelemetry-instrument,
+    is used as is. Otherwise an SDK provider exporting over OTLP is installed as the global
+    provider; the exporter reads OTEL_EXPORTER_OTLP_ENDPOINT and the other OTEL_* variables.
+
+    Returns:
+        Any: The SDK tracer provider.
+
+    Raises:
+        ImportError: If no SDK provider is configured and the SDK or OTLP exporter is not installed.
+    """
+    global _otel_provider
+    if otel_trace is None or OTelTracerProvider is None:
+        raise ImportError("OpenTelemetry export requires the opentelemetry-sdk package")
+    with _otel_provider_lock:
+        if _otel_provider is None:
+            provider = otel_trace.get_tracer_provider()
+            if not isinstance(provider, OTelTracerProvider):
+                if OTLPSpanExporter is None:
+                    raise ImportError("OpenTelemetry export requires the opentelemetry-exporter-otlp-proto-http package")
+                provider = OTelTracerProvider()
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+                otel_trace.set_tracer_provider(provider)
+            _otel_provider = provider
+        return _otel_provider
+
+class OTelSpanExporter:
+    """
+    Mirrors spans to OpenTelemetry.
+
+    OpenTelemetry spans are started alongside ours so parent links are preserved;
+    attributes and counters are copied onto them when they end.
+    """
+
+    def __init__(self, tracer: Any = None):
+        """
+        Initialize the OTelSpanExporter.
+
+        Args:
+            tracer (Any, optional): An OpenTelemetry tracer. Defaults to a tracer of get_otel_tracer_provider().
+
+        Raises:
+            ImportError: If no tracer is given and the OpenTelemetry SDK cannot be set up.
+        """
+        self.provider = None
+        if tracer is None:
+            self.provider = get_otel_tracer_provider()
+            tracer = self.provider.get_tracer(__name__)
+        self.tracer = tracer
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        with self._lock:
+            parent = self._spans.get(span.parent.span_id) if span.parent else None
+        context = otel_trace.set_span_in_context(parent) if parent is not None and otel_trace is not None else None
+        otel_span = self.tracer.start_span(span.name, context=context, start_time=int(span.start_time * 1e9))
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def on_end(self, span: Span):
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        data = span.as_dict()
+        for key, value in data["attributes"].items():
+            otel_span.set_attribute(key, value if isinstance(value, (bool, int, float, str)) else str(value))
+        for key, value in data["counters"].items():
+            otel_span.set_attribute(key, value)
+        if span.error:
+            otel_span.set_attribute("error", span.error)
+        otel_span.end(end_time=int((span.start_time + span.duration) * 1e9))
+
+    def close(self):
+        # The provider is shared by later runs, so its batched spans are flushed rather than shut down
+        if self.provider is not None:
+            self.provider.force_flush()
+
+class SpanSummary:
+    """Per-span-name totals for the end-of-run summary table."""
+
+    COUNTERS = ("rate_limit_wait", "queue_wait", "retries", "input_tokens", "output_tokens")
+
+    def __init__(self):
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def record(self, span: Span):
+        data = span.as_dict()
+        with self._lock:
+            row = self.rows.setdefault(span.name, dict(
+                count=0, errors=0, total=0.0, max=0.0, **{counter: 0 for counter in self.COUNTERS}
+            ))
+            row["count"] += 1
+            row["errors"] += int(bool(span.error))
+            row["total"] += span.duration
+            row["max"] = max(row["max"], span.duration)
+            for counter in self.COUNTERS:
+                row[counter] += data["counters"].get(counter, 0)
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Return the rows keyed by span name, slowest total first."""
+        with self._lock:
+            return {name: dict(row) for name, row in sorted(self.rows.items(), key=lambda item: -item[1]["total"])}
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to the exporters and the summary.
+
+    Attributes:
+        exporters (List): Objects with on_start(span), on_end(span) and close().
+        summary (SpanSummary): Totals of every finished span.
+    """
+
+    def __init__(self, exporters: List = None):
+        self.exporters = list(exporters or [])
+        self.summary = SpanSummary()
+
+    def start(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Span:
+        span = Span(name, parent, attributes)
+        for exporter in self.exporters:
+            try:
+                exporter.on_start(span)
+            except Exception as e:
+                logger.warning(f"Span exporter failed on start: {str(e)}")
+        return span
+
+    def finish(self, span: Span, error: Exception = None):
+        span.end(error)
+        self.summary.record(span)
+        for exporter in self.exporters:
+            try:
+                exporter.on_end(span)
+            except Exception as e:
+                logger.warning(f"Span exporter failed on end: {str(e)}")
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_tracer = Tracer()
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+def configure_tracing(trace_path: Optional[str] = None, otel: bool = None) -> Tracer:
+    """
+    Replace the process-wide tracer.
+
+    Args:
+        trace_path (Optional[str]): JSONL file to append spans to; None disables the file.
+        otel (bool, optional): Mirror spans to OpenTelemetry. Defaults to Config.TRACE_OTEL_ENABLED.
+
+    Returns:
+        Tracer: The new tracer. The previous one is closed.
+    """
+    global _tracer
+    otel = Config.TRACE_OTEL_ENABLED if otel is None else otel
+    exporters = [JsonlSpanExporter(trace_path)] if trace_path else []
+    if otel:
+        try:
+            exporters.append(OTelSpanExporter())
+        except ImportError as e:
+            logger.warning(f"{str(e)}; spans are only written to the trace file "
+                           f"(or run under opentelemetry-instrument to export them)")
+    with _tracer_lock:
+        previous, _tracer = _tracer, Tracer(exporters)
+    previous.close()
+    return _tracer
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    The span follows contextvars, so work handed to asyncio tasks or to threads started
+    with contextvars.copy_context() is nested under it.
+
+    Args:
+        name (str): The operation name.
+        **attributes: Descriptive attributes of the span.
+
+    Yields:
+        Span: The open span.
+    """
+    tracer = get_tracer()
+    current = tracer.start(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        tracer.finish(current, e)
+        raise
+    else:
+        tracer.finish(current)
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # A generator holding the span was closed from another context
+            pass
+
+def add_to_span(counter: str, amount: float = 1):
+    """Increment a counter on the current span, if there is one."""
+    current = _current_span.get()
+    if current is not None:
+        current.add(counter, amount)
+
+def format_trace_summary(summary: Dict[str, Dict]) -> str:
+    """Render SpanSummary.as_dict() as a table, slowest total first."""
+    lines = [
+        f"{'Span':<28} {'Count':>6} {'Errors':>6} {'Total s':>9} {'Mean s':>7} {'Max s':>7} "
+        f"{'RL wait s':>9} {'Queue s':>8} {'Retries':>7} {'In tok':>9} {'Out tok':>8}"
+    ]
+    for name, row in summary.items():
+        lines.append(
+            f"{name[:28]:<28} {row['count']:>6} {row['errors']:>6} {row['total']:>9.2f} {row['total'] / row['count']:>7.2f} "
+            f"{row['max']:>7.2f} {row['rate_limit_wait']:>9.2f} {row['queue_wait']:>8.2f} {row['retries']:>7} "
+            f"{row['input_tokens']:>9} {row['output_tokens']:>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+"""
+transposition.py
+
+This module provides the run-scoped transposition table of the Tree of Thought search in
+the AI News Podcast Generation System. Every worker in a layer receives the same input,
+so their trees, and different branches of one tree, keep reaching the same thoughts. The
+table memoizes the children generated for a thought at a depth and the verdict given to a
+thought, keyed on normalized content, so each is paid for once per run. Concurrent
+requests for the same children wait for the first one instead of duplicating it.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class _Abandoned(Exception):
+    """Set on an entry whose owner was cancelled before computing it; its waiters look it up again."""
+
+def normalize_thought(content: str) -> str:
+    """Lowercase content and collapse its whitespace, so trivially different thoughts share an entry."""
+    return " ".join(content.lower().split())
+
+class TranspositionTable:
+    """
+    Thread-safe memo of Tree of Thought expansions and evaluations.
+
+    Children are stored by (agent key, normalized content, depth) and verdicts by
+    (agent key, normalized content). The least recently used entries are evicted beyond
+    max_entries.
+
+    Attributes:
+        max_entries (Optional[int]): Entries kept before eviction; None keeps all.
+        hits (int): Lookups answered from the table, including waits on an in-flight entry.
+        misses (int): Lookups that had to be computed.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize the TranspositionTable.
+
+        Args:
+            max_entries (int, optional): Entries kept before eviction. Defaults to Config.TOT_TRANSPOSITION_MAX_ENTRIES.
+        """
+        self.max_entries = max_entries or Config.TOT_TRANSPOSITION_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, concurrent.futures.Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: Hashable) -> str:
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def _reserve(self, key: str) -> Tuple[concurrent.futures.Future, bool]:
+        """Return the entry for key and whether the caller must compute it."""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return future, False
+            future = self._entries[key] = concurrent.futures.Future()
+            self.misses += 1
+            self._evict()
+            return future, True
+
+    def _evict(self):
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            # In-flight entries stay, so their waiters are not orphaned
+            for key, future in self._entries.items():
+                if future.done():
+                    del self._entries[key]
+                    break
+            else:
+                return
+
+    def _resolve(self, key: str, future: concurrent.futures.Future, result: Any = None, error: BaseException = None):
+        if error is None:
+            future.set_result(result)
+            return
+        # Failures are not memoized; the next lookup tries again
+        with self._lock:
+            if self._entries.get(key) is future:
+                del self._entries[key]
+        # A cancelled (or interrupted) owner says nothing about the value, so its waiters compute it themselves
+        future.set_exception(error if isinstance(error, Exception) else _Abandoned())
+
+    def memoize(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the value stored under key, computing and storing it on a miss.
+
+        Args:
+            key (str): The entry key from key().
+            compute (Callable[[], Any]): Produces the value.
+
+        Returns:
+            Any: The value.
+        """
+        while True:
+            future, owner = self._reserve(key)
+            if owner:
+                break
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
+        try:
+            result = compute()
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    async def memoize_async(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Asynchronous counterpart of memoize."""
+        while True:
+            future, owner = self._reserve(key)
+            if owner:
+                break
+            try:
+                return await asyncio.wrap_future(future)
+            except _Abandoned:
+                continue
+        try:
+            result = await compute()
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the completed value stored under key, or None."""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is None or not future.done() or future.exception() is not None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return future.result()
+
+    def put(self, key: str, value: Any):
+        future = concurrent.futures.Future()
+        future.set_result(value)
+        with self._lock:
+            self._entries[key] = future
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def stats(self) -> Dict:
+        """
+        Report table effectiveness.
+
+        Returns:
+            Dict: 'hits', 'misses', 'hit_rate' and the current number of 'entries'.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries)}
+
+# The table of the running pipeline; Tree of Thought searches outside a pipeline run are not memoized
+_transposition_table = contextvars.ContextVar("transposition_table", default=None)
+
+def current_transposition_table() -> Optional[TranspositionTable]:
+    return _transposition_table.get()
+
+@contextmanager
+def use_transposition_table(table: Optional[TranspositionTable]) -> Iterator[Optional[TranspositionTable]]:
+    """Memoize the Tree of Thought searches of the enclosed block in table (None disables memoization)."""
+    token = _transposition_table.set(table)
+    try:
+        yield table
+    finally:
+        try:
+            _transposition_table.reset(token)
+        except ValueError:
+            # A generator holding the table was closed from another context
+            pass